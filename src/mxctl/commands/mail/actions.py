@@ -379,53 +379,52 @@ def cmd_junk(args) -> None:
     )
 
 
-def _try_not_junk_in_mailbox(
+def _build_not_junk_script(
     acct_escaped: str, junk_escaped: str, inbox_escaped: str, message_id: int, subject: str = "", sender: str = ""
-) -> str | None:
-    """Try to mark a message as not-junk from a specific mailbox.
+) -> str:
+    """Build the AppleScript that moves one message out of a junk mailbox.
 
-    Uses subprocess directly so that individual mailbox attempts can fail silently
-    (returning None) without calling sys.exit. The module-level run() always exits
-    on error, which would prevent trying fallback mailboxes.
-
-    When subject and sender are provided, searches by subject+sender in the junk
-    mailbox (because AppleScript message IDs are mailbox-specific and become invalid
+    When subject and sender are provided, the message is found by subject+sender
+    (because AppleScript message IDs are mailbox-specific and become invalid
     after a cross-mailbox move). Falls back to ID-based lookup only when no
     subject/sender context is available.
-
-    Returns the message subject string on success, None if the message or mailbox
-    was not found.
     """
     if subject and sender:
         # Search by subject + sender — avoids stale-ID problem after cross-mailbox moves
-        subj_esc = escape(subject)
-        sender_esc = escape(sender)
-        script = f"""
-        tell application "Mail"
-            set acct to account "{acct_escaped}"
-            set junkMb to mailbox "{junk_escaped}" of acct
-            set inboxMb to mailbox "{inbox_escaped}" of acct
-            set theMsg to first message of junkMb whose (subject is "{subj_esc}" and sender is "{sender_esc}")
-            set msgSubject to subject of theMsg
-            set junk mail status of theMsg to false
-            move theMsg to inboxMb
-            return msgSubject
-        end tell
-        """
+        whose_clause = f'(subject is "{escape(subject)}" and sender is "{escape(sender)}")'
     else:
         # Fallback: look up by numeric ID (works if the message hasn't moved mailboxes)
-        script = f"""
+        whose_clause = f"id is {message_id}"
+    return f"""
         tell application "Mail"
             set acct to account "{acct_escaped}"
             set junkMb to mailbox "{junk_escaped}" of acct
             set inboxMb to mailbox "{inbox_escaped}" of acct
-            set theMsg to first message of junkMb whose id is {message_id}
+            set theMsg to first message of junkMb whose {whose_clause}
             set msgSubject to subject of theMsg
             set junk mail status of theMsg to false
             move theMsg to inboxMb
             return msgSubject
         end tell
         """
+
+
+def _try_not_junk_in_mailbox(
+    acct_escaped: str, junk_escaped: str, inbox_escaped: str, message_id: int, subject: str = "", sender: str = ""
+) -> str | None:
+    """Try to mark a message as not-junk from a specific mailbox.
+
+    Uses subprocess directly so that individual mailbox attempts can fail silently
+    (returning None) without calling sys.exit. The module-level run() always exits
+    on error, which would prevent trying fallback mailboxes.
+
+    See _build_not_junk_script() for how the message is located (subject+sender
+    when available, otherwise by ID).
+
+    Returns the message subject string on success, None if the message or mailbox
+    was not found.
+    """
+    script = _build_not_junk_script(acct_escaped, junk_escaped, inbox_escaped, message_id, subject, sender)
     result = subprocess.run(
         ["osascript", "-e", script],
         capture_output=True,
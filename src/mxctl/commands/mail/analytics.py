@@ -2,6 +2,7 @@
 
 from collections import Counter, defaultdict
 from datetime import datetime, timedelta
+from string import Template
 
 from mxctl.config import (
     APPLESCRIPT_TIMEOUT_LONG,
@@ -183,6 +184,60 @@ def cmd_digest(args) -> None:
 # ---------------------------------------------------------------------------
 
 
+# AppleScript shells for get_stats, built once at import. $sep is
+# FIELD_SEPARATOR; account and mailbox names arrive already escaped. The
+# all-accounts script has no per-call inputs, so it is fully rendered here.
+_STATS_ACCOUNT_SCRIPT = Template("""
+tell application "Mail"
+    set acct to account "$account"
+    set acctName to name of acct
+    set output to ""
+    set grandTotal to 0
+    set grandUnread to 0
+    repeat with mb in (every mailbox of acct)
+        set mbName to name of mb
+        set totalCount to count of messages of mb
+        set unreadCount to unread count of mb
+        set grandTotal to grandTotal + totalCount
+        set grandUnread to grandUnread + unreadCount
+        set output to output & acctName & "$sep" & mbName & "$sep" & (totalCount as text) & "$sep" & (unreadCount as text) & linefeed
+    end repeat
+    return (grandTotal as text) & "$sep" & (grandUnread as text) & linefeed & output
+end tell
+""")
+
+_STATS_ALL_ACCOUNTS_SCRIPT = Template("""
+tell application "Mail"
+    set output to ""
+    set grandTotal to 0
+    set grandUnread to 0
+    repeat with acct in (every account)
+        if enabled of acct then
+            set acctName to name of acct
+            repeat with mb in (every mailbox of acct)
+                set mbName to name of mb
+                set totalCount to count of messages of mb
+                set unreadCount to unread count of mb
+                set grandTotal to grandTotal + totalCount
+                set grandUnread to grandUnread + unreadCount
+                set output to output & acctName & "$sep" & mbName & "$sep" & (totalCount as text) & "$sep" & (unreadCount as text) & linefeed
+            end repeat
+        end if
+    end repeat
+    return (grandTotal as text) & "$sep" & (grandUnread as text) & linefeed & output
+end tell
+""").substitute(sep=FIELD_SEPARATOR)
+
+_STATS_MAILBOX_SCRIPT = Template("""
+tell application "Mail"
+    set mb to mailbox "$mailbox" of account "$account"
+    set totalCount to count of messages of mb
+    set unreadCount to unread count of mb
+    return (totalCount as text) & "$sep" & (unreadCount as text)
+end tell
+""")
+
+
 def get_stats(
     show_all: bool = False,
     account: str | None = None,
@@ -197,71 +252,28 @@ def get_stats(
     """
     if show_all:
         if explicit_account:
-            acct_escaped = escape(account)
-            script = f"""
-            tell application "Mail"
-                set acct to account "{acct_escaped}"
-                set acctName to name of acct
-                set output to ""
-                set grandTotal to 0
-                set grandUnread to 0
-                repeat with mb in (every mailbox of acct)
-                    set mbName to name of mb
-                    set totalCount to count of messages of mb
-                    set unreadCount to unread count of mb
-                    set grandTotal to grandTotal + totalCount
-                    set grandUnread to grandUnread + unreadCount
-                    set output to output & acctName & "{FIELD_SEPARATOR}" & mbName & "{FIELD_SEPARATOR}" & (totalCount as text) & "{FIELD_SEPARATOR}" & (unreadCount as text) & linefeed
-                end repeat
-                return (grandTotal as text) & "{FIELD_SEPARATOR}" & (grandUnread as text) & linefeed & output
-            end tell
-            """
+            script = _STATS_ACCOUNT_SCRIPT.substitute(account=escape(account), sep=FIELD_SEPARATOR)
         else:
-            script = f"""
-            tell application "Mail"
-                set output to ""
-                set grandTotal to 0
-                set grandUnread to 0
-                repeat with acct in (every account)
-                    if enabled of acct then
-                        set acctName to name of acct
-                        repeat with mb in (every mailbox of acct)
-                            set mbName to name of mb
-                            set totalCount to count of messages of mb
-                            set unreadCount to unread count of mb
-                            set grandTotal to grandTotal + totalCount
-                            set grandUnread to grandUnread + unreadCount
-                            set output to output & acctName & "{FIELD_SEPARATOR}" & mbName & "{FIELD_SEPARATOR}" & (totalCount as text) & "{FIELD_SEPARATOR}" & (unreadCount as text) & linefeed
-                        end repeat
-                    end if
-                end repeat
-                return (grandTotal as text) & "{FIELD_SEPARATOR}" & (grandUnread as text) & linefeed & output
-            end tell
-            """
+            script = _STATS_ALL_ACCOUNTS_SCRIPT
 
         result = run(script, timeout=APPLESCRIPT_TIMEOUT_LONG)
-        lines = result.strip().split("\n")
-        if not lines:  # pragma: no cover — str.split() always returns at least [""]
-            return {"scope": account if explicit_account else "all", "total_messages": 0, "total_unread": 0, "mailboxes": []}
-
-        totals_parts = lines[0].split(FIELD_SEPARATOR)
-        grand_total = int(totals_parts[0]) if len(totals_parts) >= 1 and totals_parts[0].isdigit() else 0
+        # First line holds the grand totals; the rest are per-mailbox rows
+        head, _, rest = result.strip().partition("\n")
+        totals_parts = head.split(FIELD_SEPARATOR)
+        grand_total = int(totals_parts[0]) if totals_parts[0].isdigit() else 0
         grand_unread = int(totals_parts[1]) if len(totals_parts) >= 2 and totals_parts[1].isdigit() else 0
 
-        mailboxes = []
-        for line in lines[1:]:
-            if not line.strip():
-                continue
-            parts = line.split(FIELD_SEPARATOR)
-            if len(parts) >= 4:
-                mailboxes.append(
-                    {
-                        "account": parts[0],
-                        "name": parts[1],
-                        "total": int(parts[2]) if parts[2].isdigit() else 0,
-                        "unread": int(parts[3]) if parts[3].isdigit() else 0,
-                    }
-                )
+        # Blank or short lines split into fewer than 4 fields and are dropped here
+        mailboxes = [
+            {
+                "account": parts[0],
+                "name": parts[1],
+                "total": int(parts[2]) if parts[2].isdigit() else 0,
+                "unread": int(parts[3]) if parts[3].isdigit() else 0,
+            }
+            for parts in (line.split(FIELD_SEPARATOR) for line in rest.splitlines())
+            if len(parts) >= 4
+        ]
 
         return {
             "scope": account if explicit_account else "all",
@@ -270,17 +282,7 @@ def get_stats(
             "mailboxes": mailboxes,
         }
     else:
-        acct_escaped = escape(account)
-        mb_escaped = escape(mailbox)
-
-        script = f"""
-        tell application "Mail"
-            set mb to mailbox "{mb_escaped}" of account "{acct_escaped}"
-            set totalCount to count of messages of mb
-            set unreadCount to unread count of mb
-            return (totalCount as text) & "{FIELD_SEPARATOR}" & (unreadCount as text)
-        end tell
-        """
+        script = _STATS_MAILBOX_SCRIPT.substitute(account=escape(account), mailbox=escape(mailbox), sep=FIELD_SEPARATOR)
 
         result = run(script)
         parts = result.split(FIELD_SEPARATOR)
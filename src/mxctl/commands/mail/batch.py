@@ -2,6 +2,7 @@
 
 import sys
 from datetime import datetime, timedelta
+from string import Template
 
 from mxctl.commands.mail.undo import log_batch_operation, log_fence_operation
 from mxctl.config import (
@@ -14,11 +15,88 @@ from mxctl.util.dates import to_applescript_date
 from mxctl.util.formatting import die, format_output
 from mxctl.util.mail_helpers import resolve_mailbox
 
+# AppleScript shells for batch_delete, built once at import. $where is the
+# whose-clause and $limit_check an optional early-exit line.
+_COUNT_IN_MAILBOX_SCRIPT = Template("""
+tell application "Mail"
+    set mb to mailbox "$mailbox" of account "$account"
+    set targetMsgs to (every message of mb whose $where)
+    return count of targetMsgs
+end tell
+""")
+
+_COUNT_ALL_MAILBOXES_SCRIPT = Template("""
+tell application "Mail"
+    set total to 0
+    repeat with mbox in (mailboxes of account "$account")
+        set targetMsgs to (every message of mbox whose $where)
+        set total to total + (count of targetMsgs)
+    end repeat
+    return total
+end tell
+""")
+
+_DELETE_IN_MAILBOX_SCRIPT = Template("""
+tell application "Mail"
+    set mb to mailbox "$mailbox" of account "$account"
+    set targetMsgs to (every message of mb whose $where)
+    set deleteCount to 0
+    set deletedIds to {}
+    repeat with m in targetMsgs
+        $limit_check
+        try
+            set msgId to id of m
+            delete m
+            set end of deletedIds to msgId
+            set deleteCount to deleteCount + 1
+        end try
+    end repeat
+    set output to (deleteCount as text)
+    repeat with msgId in deletedIds
+        set output to output & linefeed & (msgId as text)
+    end repeat
+    return output
+end tell
+""")
+
+_DELETE_ALL_MAILBOXES_SCRIPT = Template("""
+tell application "Mail"
+    set deleteCount to 0
+    set deletedIds to {}
+    repeat with mbox in (mailboxes of account "$account")
+        $limit_check
+        set targetMsgs to (every message of mbox whose $where)
+        repeat with m in targetMsgs
+            $limit_check
+            try
+                set msgId to id of m
+                delete m
+                set end of deletedIds to msgId
+                set deleteCount to deleteCount + 1
+            end try
+        end repeat
+    end repeat
+    set output to (deleteCount as text)
+    repeat with msgId in deletedIds
+        set output to output & linefeed & (msgId as text)
+    end repeat
+    return output
+end tell
+""")
+
+
 # ---------------------------------------------------------------------------
 # Data functions (plain args, return dicts, no printing)
 # ---------------------------------------------------------------------------
 
 
+def _parse_count_and_ids(result: str) -> tuple[int, list[int]]:
+    """Split move/delete script output into the leading count and the message IDs after it."""
+    head, _, rest = result.strip().partition("\n")
+    count = int(head) if head.isdigit() else 0
+    return count, [int(line) for line in rest.split("\n") if line.isdigit()]
+
+
 def batch_read(account: str, mailbox: str, limit: int) -> dict:
     """Mark up to `limit` unread messages as read in a mailbox. Returns result dict."""
     acct_escaped = escape(account)
@@ -136,9 +214,7 @@ def batch_move(account: str, sender: str, dest_mailbox: str, dry_run: bool = Fal
     """
 
     result = run(move_script, timeout=APPLESCRIPT_TIMEOUT_LONG)
-    lines = result.strip().split("\n")
-    moved = int(lines[0]) if lines and lines[0].isdigit() else 0
-    message_ids = [int(line) for line in lines[1:] if line.isdigit()]
+    moved, message_ids = _parse_count_and_ids(result)
 
     if moved > 0:
         log_batch_operation(
@@ -185,115 +261,47 @@ def batch_delete(
         filter_parts.append(f"older than {older_than_days} days")
     filter_desc = " and ".join(filter_parts)
 
-    # Count matching messages
-    if mailbox:
-        mb_escaped = escape(mailbox)
-        count_script = f"""
-        tell application "Mail"
-            set mb to mailbox "{mb_escaped}" of account "{acct_escaped}"
-            set targetMsgs to (every message of mb whose {where_clause})
-            return count of targetMsgs
-        end tell
-        """
-    else:
-        count_script = f"""
-        tell application "Mail"
-            set total to 0
-            repeat with mbox in (mailboxes of account "{acct_escaped}")
-                set targetMsgs to (every message of mbox whose {where_clause})
-                set total to total + (count of targetMsgs)
-            end repeat
-            return total
-        end tell
-        """
+    empty_result = {
+        "account": account,
+        "mailbox": mailbox,
+        "sender": sender,
+        "older_than_days": older_than_days,
+        "deleted": 0,
+        "filter_desc": filter_desc,
+        "scope_desc": scope_desc,
+    }
 
-    count_result = run(count_script)
-    total_count = int(count_result) if count_result.isdigit() else 0
+    # Count matching messages first, unless --force lets us go straight to the
+    # delete script (which reports its own count) in a single osascript call.
+    if dry_run or not force:
+        if mailbox:
+            count_script = _COUNT_IN_MAILBOX_SCRIPT.substitute(account=acct_escaped, mailbox=escape(mailbox), where=where_clause)
+        else:
+            count_script = _COUNT_ALL_MAILBOXES_SCRIPT.substitute(account=acct_escaped, where=where_clause)
 
-    if total_count == 0:
-        return {
-            "account": account,
-            "mailbox": mailbox,
-            "sender": sender,
-            "older_than_days": older_than_days,
-            "deleted": 0,
-            "filter_desc": filter_desc,
-            "scope_desc": scope_desc,
-        }
+        count_result = run(count_script)
+        total_count = int(count_result) if count_result.isdigit() else 0
 
-    if dry_run:
-        effective_count = min(total_count, limit) if limit else total_count
-        return {
-            "account": account,
-            "mailbox": mailbox,
-            "sender": sender,
-            "older_than_days": older_than_days,
-            "would_delete": effective_count,
-            "total_matching": total_count,
-            "dry_run": True,
-            "filter_desc": filter_desc,
-            "scope_desc": scope_desc,
-        }
+        if total_count == 0:
+            return empty_result
+
+        if dry_run:
+            effective_count = min(total_count, limit) if limit else total_count
+            return {**empty_result, "would_delete": effective_count, "total_matching": total_count, "dry_run": True}
 
-    if not force:
         die(f"This will delete {total_count} messages {filter_desc} from {scope_desc}. Use --force to confirm.")
 
     # Build delete script
     limit_check = f"if deleteCount >= {limit} then exit repeat" if limit else ""
     if mailbox:
-        mb_escaped = escape(mailbox)
-        delete_script = f"""
-        tell application "Mail"
-            set mb to mailbox "{mb_escaped}" of account "{acct_escaped}"
-            set targetMsgs to (every message of mb whose {where_clause})
-            set deleteCount to 0
-            set deletedIds to {{}}
-            repeat with m in targetMsgs
-                {limit_check}
-                try
-                    set msgId to id of m
-                    delete m
-                    set end of deletedIds to msgId
-                    set deleteCount to deleteCount + 1
-                end try
-            end repeat
-            set output to (deleteCount as text)
-            repeat with msgId in deletedIds
-                set output to output & linefeed & (msgId as text)
-            end repeat
-            return output
-        end tell
-        """
+        delete_script = _DELETE_IN_MAILBOX_SCRIPT.substitute(
+            account=acct_escaped, mailbox=escape(mailbox), where=where_clause, limit_check=limit_check
+        )
     else:
-        delete_script = f"""
-        tell application "Mail"
-            set deleteCount to 0
-            set deletedIds to {{}}
-            repeat with mbox in (mailboxes of account "{acct_escaped}")
-                {limit_check}
-                set targetMsgs to (every message of mbox whose {where_clause})
-                repeat with m in targetMsgs
-                    {limit_check}
-                    try
-                        set msgId to id of m
-                        delete m
-                        set end of deletedIds to msgId
-                        set deleteCount to deleteCount + 1
-                    end try
-                end repeat
-            end repeat
-            set output to (deleteCount as text)
-            repeat with msgId in deletedIds
-                set output to output & linefeed & (msgId as text)
-            end repeat
-            return output
-        end tell
-        """
+        delete_script = _DELETE_ALL_MAILBOXES_SCRIPT.substitute(account=acct_escaped, where=where_clause, limit_check=limit_check)
 
     result = run(delete_script, timeout=APPLESCRIPT_TIMEOUT_LONG)
-    lines = result.strip().split("\n")
-    deleted = int(lines[0]) if lines and lines[0].isdigit() else 0
-    message_ids = [int(line) for line in lines[1:] if line.isdigit()]
+    deleted, message_ids = _parse_count_and_ids(result)
 
     if deleted > 0:
         log_batch_operation(
@@ -306,15 +314,7 @@ def batch_delete(
             older_than_days=older_than_days,
         )
 
-    return {
-        "account": account,
-        "mailbox": mailbox,
-        "sender": sender,
-        "older_than_days": older_than_days,
-        "deleted": deleted,
-        "filter_desc": filter_desc,
-        "scope_desc": scope_desc,
-    }
+    return {**empty_result, "deleted": deleted}
 
 
 # ---------------------------------------------------------------------------
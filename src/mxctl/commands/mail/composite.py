@@ -16,7 +16,7 @@ from mxctl.config import (
 )
 from mxctl.util.applescript import escape, run, validate_msg_id
 from mxctl.util.formatting import die, format_output, format_short_date, format_table, truncate
-from mxctl.util.mail_helpers import extract_email, normalize_subject, parse_message_line
+from mxctl.util.mail_helpers import REPLY_PREFIXES, extract_email, normalize_subject, parse_message_line
 
 # ---------------------------------------------------------------------------
 # export — save message(s) as markdown
@@ -211,20 +211,6 @@ def get_thread(
     acct_escaped = escape(account)
     mb_escaped = escape(mailbox)
 
-    # Get the subject to find related messages
-    script = f"""
-    tell application "Mail"
-        set mb to mailbox "{mb_escaped}" of account "{acct_escaped}"
-        set theMsg to first message of mb whose id is {message_id}
-        return subject of theMsg
-    end tell
-    """
-    subject = run(script)
-
-    # Strip Re:/Fwd: prefixes to get the thread subject
-    thread_subject = normalize_subject(subject)
-    thread_escaped = escape(thread_subject)
-
     # Search for messages with this subject (default: current account only)
     if all_accounts:
         acct_loop = "repeat with acct in (every account)\nset acctName to name of acct"
@@ -233,15 +219,53 @@ def get_thread(
         acct_loop = f'set acct to account "{acct_escaped}"\nset acctName to name of acct'
         acct_loop_end = ""
 
-    script2 = f"""
+    # One script reads the subject and runs the search, saving an osascript
+    # launch. The prefix stripping mirrors normalize_subject (same
+    # REPLY_PREFIXES), which is still applied to the returned subject for display.
+    prefix_list = ", ".join(f'"{prefix}:"' for prefix in REPLY_PREFIXES)
+    script = f"""
     tell application "Mail"
+        set mb to mailbox "{mb_escaped}" of account "{acct_escaped}"
+        set theMsg to first message of mb whose id is {message_id}
+        set msgSubject to subject of theMsg
+        set threadSubject to msgSubject
+        repeat
+            repeat while threadSubject starts with space or threadSubject starts with tab or threadSubject starts with return or threadSubject starts with linefeed
+                if length of threadSubject is 1 then
+                    set threadSubject to ""
+                else
+                    set threadSubject to text 2 thru -1 of threadSubject
+                end if
+            end repeat
+            repeat while threadSubject ends with space or threadSubject ends with tab or threadSubject ends with return or threadSubject ends with linefeed
+                if length of threadSubject is 1 then
+                    set threadSubject to ""
+                else
+                    set threadSubject to text 1 thru -2 of threadSubject
+                end if
+            end repeat
+            set prefixFound to false
+            repeat with replyPrefix in {{{prefix_list}}}
+                set prefixText to contents of replyPrefix
+                if threadSubject starts with prefixText then
+                    if length of threadSubject is length of prefixText then
+                        set threadSubject to ""
+                    else
+                        set threadSubject to text ((length of prefixText) + 1) thru -1 of threadSubject
+                    end if
+                    set prefixFound to true
+                    exit repeat
+                end if
+            end repeat
+            if not prefixFound then exit repeat
+        end repeat
         set output to ""
         set totalFound to 0
         {acct_loop}
             repeat with mbox in (mailboxes of acct)
                 if totalFound >= {limit} then exit repeat
                 set mbName to name of mbox
-                set msgs to (every message of mbox whose subject contains "{thread_escaped}")
+                set msgs to (every message of mbox whose subject contains threadSubject)
                 repeat with m in msgs
                     if totalFound >= {limit} then exit repeat
                     set output to output & (id of m) & "{FIELD_SEPARATOR}" & (subject of m) & "{FIELD_SEPARATOR}" & (sender of m) & "{FIELD_SEPARATOR}" & (date received of m) & "{FIELD_SEPARATOR}" & mbName & "{FIELD_SEPARATOR}" & acctName & linefeed
@@ -249,11 +273,14 @@ def get_thread(
                 end repeat
             end repeat
         {acct_loop_end}
-        return output
+        return msgSubject & "{RECORD_SEPARATOR}" & output
     end tell
     """
 
-    result = run(script2, timeout=APPLESCRIPT_TIMEOUT_LONG)
+    subject, _, result = run(script, timeout=APPLESCRIPT_TIMEOUT_LONG).partition(RECORD_SEPARATOR)
+
+    # Strip Re:/Fwd: prefixes to get the thread subject
+    thread_subject = normalize_subject(subject)
 
     messages = []
     if result.strip():
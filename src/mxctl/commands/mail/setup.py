@@ -46,6 +46,9 @@ _K_CANCEL = f"{_D}Ctrl+C cancel{_R}"
 _HINT_RADIO = f"  {_K_ARROWS} navigate   {_K_SPACE} select   {_K_ENTER} confirm   {_K_CANCEL}"
 _HINT_CHECKBOX = f"  {_K_ARROWS} navigate   {_K_SPACE} toggle   {_K_ENTER} confirm   {_K_CANCEL}"
 
+# Todoist API tokens are 40 lowercase hex chars
+_TODOIST_TOKEN_RE = re.compile(r"^[a-f0-9]{40}$")
+
 
 def _is_interactive() -> bool:
     """True when running in a real terminal (not a pipe or test)."""
@@ -449,7 +452,7 @@ end tell
     except EOFError:
         raw_token = ""
     if raw_token:
-        if not re.match(r"^[a-f0-9]{40}$", raw_token):
+        if not _TODOIST_TOKEN_RE.match(raw_token):
             print(f"  {_D}Warning: Doesn't match expected format (40 hex chars). Saving anyway.{_R}")
         todoist_token = raw_token
 
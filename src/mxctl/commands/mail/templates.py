@@ -3,27 +3,41 @@
 import json
 import os
 
-from mxctl.config import CONFIG_DIR, TEMPLATES_FILE, file_lock
+from mxctl.config import CONFIG_DIR, TEMPLATES_FILE, _replace_file, file_lock
 from mxctl.util.formatting import die, format_output
 
+# Parsed templates per file path, with the (mtime_ns, size) signature of the
+# file they were read from. Reread when the signature changes.
+_cache: dict[str, tuple[tuple[int, int], dict]] = {}
+
 
 def _load_templates() -> dict:
-    """Load templates from disk."""
-    if os.path.isfile(TEMPLATES_FILE):
-        with file_lock(TEMPLATES_FILE), open(TEMPLATES_FILE) as f:
-            try:
-                return json.load(f)
-            except (json.JSONDecodeError, OSError):
-                return {}
-    return {}
+    """Load templates from disk, reusing the last parse while the file is unchanged."""
+    try:
+        st = os.stat(TEMPLATES_FILE)
+    except OSError:  # no templates saved yet
+        return {}
+    signature = (st.st_mtime_ns, st.st_size)
+    cached = _cache.get(TEMPLATES_FILE)
+    if cached is None or cached[0] != signature:
+        try:
+            with file_lock(TEMPLATES_FILE), open(TEMPLATES_FILE) as f:
+                templates = json.load(f)
+        except (json.JSONDecodeError, OSError):
+            return {}
+        cached = _cache[TEMPLATES_FILE] = (signature, templates)
+    return dict(cached[1])
 
 
 def _save_templates(templates: dict) -> None:
-    """Save templates to disk."""
+    """Save templates to disk, replacing the file atomically."""
     os.makedirs(CONFIG_DIR, exist_ok=True)
-    with file_lock(TEMPLATES_FILE), open(TEMPLATES_FILE, "w") as f:
-        json.dump(templates, f, indent=2)
-    os.chmod(TEMPLATES_FILE, 0o600)
+    with file_lock(TEMPLATES_FILE):
+        _replace_file(TEMPLATES_FILE, json.dumps(templates, indent=2))
+        st = os.stat(TEMPLATES_FILE)
+    # Refresh the cache here: a same-size rewrite within one mtime tick would
+    # otherwise keep the old signature and serve the stale parse
+    _cache[TEMPLATES_FILE] = ((st.st_mtime_ns, st.st_size), dict(templates))
 
 
 def get_templates() -> list[dict]:
@@ -4,12 +4,14 @@ from __future__ import annotations
 
 import json
 import os
+from collections import deque
 from datetime import datetime
 
 from mxctl.config import (
     APPLESCRIPT_TIMEOUT_LONG,
     CONFIG_DIR,
     UNDO_LOG_FILE,
+    _replace_file,
     file_lock,
 )
 from mxctl.util.applescript import escape, run
@@ -18,6 +20,13 @@ from mxctl.util.formatting import die, format_output, format_table, truncate
 MAX_UNDO_OPERATIONS = 10
 UNDO_MAX_AGE_MINUTES = 30
 
+# The log records senders and mailbox names, so new files are owner-only.
+_LOG_MODE = 0o600
+
+# The last MAX_UNDO_OPERATIONS entries per log path, with the (mtime_ns, size)
+# signature of the file they were read from. Reread when the signature changes.
+_cache: dict[str, tuple[tuple[int, int] | None, deque[dict]]] = {}
+
 
 def _entry_age_minutes(entry: dict) -> float | None:
     """Return the age of an undo entry in minutes, or None if timestamp is missing/invalid."""
@@ -39,31 +48,100 @@ def _is_fresh(entry: dict) -> bool:
     return age < UNDO_MAX_AGE_MINUTES
 
 
+def _encode_entry(entry: dict) -> str:
+    """Serialize one entry as a compact JSONL record."""
+    return json.dumps(entry, separators=(",", ":")) + "\n"
+
+
+def _parse_entries(lines) -> list[dict]:
+    """Decode JSONL records, skipping blank or corrupted lines."""
+    entries = []
+    for line in lines:
+        try:
+            entry = json.loads(line)
+        except json.JSONDecodeError:
+            continue
+        if isinstance(entry, dict):
+            entries.append(entry)
+    return entries
+
+
+def _file_signature(path: str) -> tuple[int, int] | None:
+    """Return (mtime_ns, size) for path, or None if it does not exist."""
+    try:
+        st = os.stat(path)
+    except OSError:
+        return None
+    return (st.st_mtime_ns, st.st_size)
+
+
+def _read_undo_file() -> list[dict]:
+    """Decode the last MAX_UNDO_OPERATIONS lines of UNDO_LOG_FILE."""
+    try:
+        with file_lock(UNDO_LOG_FILE), open(UNDO_LOG_FILE) as f:
+            tail = deque(f, maxlen=MAX_UNDO_OPERATIONS)
+    except OSError:
+        return []
+    return _parse_entries(tail)
+
+
 def _load_undo_log(include_stale: bool = False) -> list[dict]:
     """Load undo log from disk.
 
-    By default, only returns entries younger than UNDO_MAX_AGE_MINUTES.
-    Pass include_stale=True to load all entries regardless of age.
+    The log is read into a bounded deque and served from memory until the
+    file's mtime or size changes (e.g. another mxctl process wrote to it).
+    By default, only returns entries younger than
+    UNDO_MAX_AGE_MINUTES. Pass include_stale=True to load all entries
+    regardless of age.
     """
-    if not os.path.isfile(UNDO_LOG_FILE):
-        return []
-    with file_lock(UNDO_LOG_FILE), open(UNDO_LOG_FILE) as f:
-        try:
-            raw = json.load(f)
-        except (json.JSONDecodeError, OSError):
-            return []
+    signature = _file_signature(UNDO_LOG_FILE)
+    cached = _cache.get(UNDO_LOG_FILE)
+    if cached is None or cached[0] != signature:
+        # A missing log (the common case before any batch command) skips the open
+        entries = _read_undo_file() if signature else []
+        cached = _cache[UNDO_LOG_FILE] = (signature, deque(entries, maxlen=MAX_UNDO_OPERATIONS))
+    raw = list(cached[1])
     if include_stale:
-        return list(raw)
+        return raw
     return [entry for entry in raw if _is_fresh(entry)]
 
 
 def _save_undo_log(operations: list[dict]) -> None:
-    """Save undo log to disk, keeping only the last MAX_UNDO_OPERATIONS."""
+    """Rewrite the undo log, keeping only the last MAX_UNDO_OPERATIONS."""
     os.makedirs(CONFIG_DIR, exist_ok=True)
     # Keep only the most recent operations
     trimmed = operations[-MAX_UNDO_OPERATIONS:]
-    with file_lock(UNDO_LOG_FILE), open(UNDO_LOG_FILE, "w") as f:
-        json.dump(trimmed, f, indent=2)
+    with file_lock(UNDO_LOG_FILE):
+        _replace_file(UNDO_LOG_FILE, "".join(map(_encode_entry, trimmed)), _LOG_MODE)
+    _cache[UNDO_LOG_FILE] = (_file_signature(UNDO_LOG_FILE), deque(trimmed, maxlen=MAX_UNDO_OPERATIONS))
+
+
+def _append_undo_entry(entry: dict) -> None:
+    """Append one entry to the undo log in a single write.
+
+    The file is only compacted back down to MAX_UNDO_OPERATIONS once it grows
+    past twice that, so trimming cost is amortized across many appends.
+
+    Writes go to the OS page cache without fsync; a hard crash may lose the
+    most recent entries or leave a torn last line, which only costs the
+    ability to undo them. A torn last line is terminated before appending so
+    it cannot swallow the new record.
+    """
+    os.makedirs(CONFIG_DIR, exist_ok=True)
+    with file_lock(UNDO_LOG_FILE):
+        with os.fdopen(os.open(UNDO_LOG_FILE, os.O_RDWR | os.O_APPEND | os.O_CREAT, _LOG_MODE), "a+") as f:
+            f.seek(0)
+            lines = f.readlines()
+            if lines and not lines[-1].endswith("\n"):
+                lines[-1] += "\n"
+                f.write("\n")
+            lines.append(_encode_entry(entry))
+            if len(lines) <= 2 * MAX_UNDO_OPERATIONS:
+                f.write(lines[-1])
+        if len(lines) > 2 * MAX_UNDO_OPERATIONS:
+            _replace_file(UNDO_LOG_FILE, "".join(lines[-MAX_UNDO_OPERATIONS:]), _LOG_MODE)
+        tail = _parse_entries(lines[-MAX_UNDO_OPERATIONS:])
+        _cache[UNDO_LOG_FILE] = (_file_signature(UNDO_LOG_FILE), deque(tail, maxlen=MAX_UNDO_OPERATIONS))
 
 
 def log_batch_operation(
@@ -76,8 +154,7 @@ def log_batch_operation(
     older_than_days: int | None = None,
 ) -> None:
     """Log a batch operation for potential undo."""
-    operations = _load_undo_log()
-    operations.append(
+    _append_undo_entry(
         {
             "timestamp": datetime.now().isoformat(),
             "operation": operation_type,
@@ -89,7 +166,6 @@ def log_batch_operation(
             "older_than_days": older_than_days,
         }
     )
-    _save_undo_log(operations)
 
 
 def log_fence_operation(operation_type: str) -> None:
@@ -98,15 +174,13 @@ def log_fence_operation(operation_type: str) -> None:
     This claims the undo slot so that a subsequent `mxctl undo` does not silently
     skip past these operations and accidentally undo an earlier undoable entry.
     """
-    operations = _load_undo_log(include_stale=True)
-    operations.append(
+    _append_undo_entry(
         {
             "type": "fence",
             "operation": operation_type,
             "timestamp": datetime.now().isoformat(),
         }
     )
-    _save_undo_log(operations)
 
 
 # ---------------------------------------------------------------------------
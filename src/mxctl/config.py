@@ -13,6 +13,7 @@ This allows existing configs to continue working without modification.
 
 from __future__ import annotations
 
+import copy
 import fcntl
 import json
 import os
@@ -27,7 +28,7 @@ _LEGACY_CONFIG_DIR = os.path.expanduser("~/.config/my")
 CONFIG_FILE = os.path.join(CONFIG_DIR, "config.json")
 STATE_FILE = os.path.join(CONFIG_DIR, "state.json")
 TEMPLATES_FILE = os.path.join(CONFIG_DIR, "mail-templates.json")
-UNDO_LOG_FILE = os.path.join(CONFIG_DIR, "mail-undo.json")
+UNDO_LOG_FILE = os.path.join(CONFIG_DIR, "mail-undo.jsonl")
 
 DEFAULT_MESSAGE_LIMIT = 25
 MAX_MESSAGE_LIMIT = 100
@@ -121,6 +122,18 @@ def file_lock(path: str):
                 die(f"Could not acquire file lock for {path} after {max_retries} attempts. Another process may be holding it.")
 
 
+def _replace_file(path: str, text: str, mode: int = 0o600) -> None:
+    """Atomically replace *path* with *text*. Call with file_lock(path) held.
+
+    The text goes to a sibling temp file that is then os.replace()d over
+    *path*, so a crash mid-write never leaves a truncated file behind.
+    """
+    tmp_path = f"{path}.tmp.{os.getpid()}"
+    with os.fdopen(os.open(tmp_path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, mode), "w") as f:
+        f.write(text)
+    os.replace(tmp_path, path)
+
+
 def _load_json(path: str) -> dict:
     _migrate_legacy_config()
     if os.path.isfile(path):
@@ -150,12 +163,24 @@ def _save_json(path: str, data: dict) -> None:
             json.dump(data, f, indent=2)
         if path in _SENSITIVE_FILES:
             os.chmod(path, 0o600)
+    # An in-place rewrite keeps the inode and may keep mtime and size too
+    _config_cache.pop(path, None)
 
 
 _config_warned: bool = False
 
+# Parsed config per file path, with the (ino, mtime_ns, size) signature of the
+# file it was read from. One command resolves the account and mailbox through
+# several get_config() calls; they share a single parse until the file changes.
+# _save_json drops the entry for the path it writes.
+_config_cache: dict[str, tuple[tuple[int, int, int], dict]] = {}
+
 
 def get_config(required: bool = False, warn: bool = True) -> dict:
+    """Return the parsed config.json, or {} if there is none.
+
+    The file is parsed once while unchanged; each call returns its own copy.
+    """
     global _config_warned
     if not os.path.isfile(CONFIG_FILE):
         _migrate_legacy_config()
@@ -170,7 +195,15 @@ def get_config(required: bool = False, warn: bool = True) -> dict:
                 file=sys.stderr,
             )
             _config_warned = True
-    return _load_json(CONFIG_FILE)
+    try:
+        st = os.stat(CONFIG_FILE)
+    except OSError:
+        return _load_json(CONFIG_FILE)
+    signature = (st.st_ino, st.st_mtime_ns, st.st_size)
+    cached = _config_cache.get(CONFIG_FILE)
+    if cached is None or cached[0] != signature:
+        cached = _config_cache[CONFIG_FILE] = (signature, _load_json(CONFIG_FILE))
+    return copy.deepcopy(cached[1])
 
 
 def get_state() -> dict:
@@ -2,26 +2,32 @@
 
 import argparse
 import sys
+from importlib import import_module
 
 from mxctl import __version__
-from mxctl.commands.mail.accounts import register as register_accounts
-from mxctl.commands.mail.actions import register as register_actions
-from mxctl.commands.mail.ai import register as register_ai
-from mxctl.commands.mail.analytics import register as register_analytics
-from mxctl.commands.mail.attachments import register as register_attachments
-from mxctl.commands.mail.batch import register as register_batch
-from mxctl.commands.mail.brief import register as register_brief
-from mxctl.commands.mail.compose import register as register_compose
-from mxctl.commands.mail.composite import register as register_composite
-from mxctl.commands.mail.deadline_scan import register as register_deadline_scan
-from mxctl.commands.mail.inbox_tools import register as register_inbox_tools
-from mxctl.commands.mail.manage import register as register_manage
-from mxctl.commands.mail.messages import register as register_messages
-from mxctl.commands.mail.setup import register as register_setup
-from mxctl.commands.mail.system import register as register_system
-from mxctl.commands.mail.templates import register as register_templates
-from mxctl.commands.mail.todoist_integration import register as register_todoist
-from mxctl.commands.mail.undo import register as register_undo
+
+# Command modules in registration order, with the subcommands each one
+# registers. Only the module owning the requested command is imported.
+_COMMAND_MODULES: dict[str, tuple[str, ...]] = {
+    "accounts": ("inbox", "accounts", "mailboxes", "count"),
+    "messages": ("list", "read", "search"),
+    "actions": ("mark-read", "mark-unread", "flag", "unflag", "move", "delete", "unsubscribe", "junk", "not-junk", "open"),
+    "compose": ("draft",),
+    "attachments": ("attachments", "save-attachment"),
+    "manage": ("create-mailbox", "delete-mailbox", "empty-trash"),
+    "batch": ("batch-read", "batch-flag", "batch-move", "batch-delete"),
+    "analytics": ("top-senders", "digest", "stats", "show-flagged"),
+    "system": ("check", "headers", "rules"),
+    "composite": ("export", "thread", "reply", "forward"),
+    "ai": ("summary", "triage", "context", "find-related"),
+    "brief": ("brief",),
+    "todoist_integration": ("to-todoist",),
+    "inbox_tools": ("process-inbox", "clean-newsletters", "weekly-review"),
+    "deadline_scan": ("deadline-scan",),
+    "templates": ("templates",),
+    "undo": ("undo",),
+    "setup": ("init", "ai-setup"),
+}
 
 _GROUPED_HELP = """\
 Apple Mail from your terminal.
@@ -44,6 +50,21 @@ Run `mxctl <command> --help` for details on any command.
 """
 
 
+def _modules_for(argv: list[str]) -> list[str]:
+    """Return the command modules to register for the leading CLI argument.
+
+    A known command needs only its own module and --version needs none.
+    Anything else (no command, --help, a typo) registers every module so
+    argparse can list or suggest all commands.
+    """
+    if argv == ["--version"]:
+        return []
+    for module, commands in _COMMAND_MODULES.items():
+        if argv and argv[0] in commands:
+            return [module]
+    return list(_COMMAND_MODULES)
+
+
 def main() -> None:
     parser = argparse.ArgumentParser(
         prog="mxctl",
@@ -57,24 +78,8 @@ def main() -> None:
     )
     subparsers = parser.add_subparsers(dest="command")
 
-    register_accounts(subparsers)
-    register_messages(subparsers)
-    register_actions(subparsers)
-    register_compose(subparsers)
-    register_attachments(subparsers)
-    register_manage(subparsers)
-    register_batch(subparsers)
-    register_analytics(subparsers)
-    register_system(subparsers)
-    register_composite(subparsers)
-    register_ai(subparsers)
-    register_brief(subparsers)
-    register_todoist(subparsers)
-    register_inbox_tools(subparsers)
-    register_deadline_scan(subparsers)
-    register_templates(subparsers)
-    register_undo(subparsers)
-    register_setup(subparsers)
+    for module in _modules_for(sys.argv[1:2]):
+        import_module(f"mxctl.commands.mail.{module}").register(subparsers)
 
     args = parser.parse_args()
 
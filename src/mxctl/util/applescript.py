@@ -17,13 +17,14 @@ def _warn_automation_once() -> None:
     global _automation_warned
     if _automation_warned:
         return
+    # Set before reading state so every later call in this process is a bool check
+    _automation_warned = True
 
     # Check if we've already shown the prompt in a previous session
     from mxctl.config import _save_json, get_state
 
     state = get_state()
     if state.get("automation_prompted"):
-        _automation_warned = True
         return
 
     # Check terminal app name for a friendlier message
@@ -42,8 +43,7 @@ def _warn_automation_once() -> None:
         file=sys.stderr,
     )
 
-    # Mark as warned for this session and persist to state
-    _automation_warned = True
+    # Persist so future sessions skip the warning
     state["automation_prompted"] = True
     _save_json(STATE_FILE, state)
 
@@ -132,8 +132,9 @@ def extract_display_name(sender: str) -> str:
         'John Doe <john@example.com>'   -> 'John Doe'
         'jane@example.com'              -> 'jane@example.com'
     """
-    if "<" in sender:
-        return sender.split("<")[0].strip().strip('"')
+    name, bracket, _ = sender.partition("<")
+    if bracket:
+        return name.strip().strip('"')
     return sender
 
 
@@ -188,6 +189,12 @@ def parse_message_line(
     return result
 
 
+# Reply/forward prefixes (before the colon), stripped repeatedly by normalize_subject.
+# get_thread renders the same tuple into its AppleScript.
+REPLY_PREFIXES = ("Re", "Fwd", "Fw", "AW", "SV", "VS")
+_REPLY_PREFIX_RE = re.compile(rf"^({'|'.join(REPLY_PREFIXES)}):\s*", re.IGNORECASE)
+
+
 def normalize_subject(subject: str) -> str:
     """Normalize email subject by removing Re:/Fwd:/Fw:/AW:/SV:/VS: prefixes.
 
@@ -202,7 +209,7 @@ def normalize_subject(subject: str) -> str:
     """
     # Loop to handle multiple nested prefixes
     while True:
-        normalized = re.sub(r"^(Re|Fwd|Fw|AW|SV|VS):\s*", "", subject, flags=re.IGNORECASE).strip()
+        normalized = _REPLY_PREFIX_RE.sub("", subject).strip()
         if normalized == subject:
             break
         subject = normalized
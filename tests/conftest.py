@@ -1,10 +1,47 @@
 """Pytest configuration and shared fixtures."""
 
+import json
+import subprocess
 from argparse import Namespace
+from types import MappingProxyType, SimpleNamespace
 from unittest.mock import Mock
 
 import pytest
 
+_REAL_SUBPROCESS_RUN = subprocess.run
+
+
+@pytest.fixture(autouse=True, scope="session")
+def _block_subprocess():
+    """Fail fast if a test reaches the real subprocess.run (e.g. spawns osascript).
+
+    Installed once for the whole session; tests that exercise subprocess paths
+    override it with their own monkeypatch/patch, which is undone on teardown.
+    """
+
+    def _blocked(*args, **kwargs):
+        raise RuntimeError("real subprocess blocked in tests (mock subprocess.run)")
+
+    with pytest.MonkeyPatch.context() as mp:
+        mp.setattr(subprocess, "run", _blocked)
+        yield
+
+
+@pytest.fixture
+def real_subprocess(monkeypatch):
+    """Opt a test out of _block_subprocess for deliberate end-to-end process spawns."""
+    monkeypatch.setattr(subprocess, "run", _REAL_SUBPROCESS_RUN)
+
+
+@pytest.fixture
+def osascript_result():
+    """Factory fixture for subprocess.run() results (returncode/stdout/stderr only)."""
+
+    def _make(returncode=0, stdout="", stderr=""):
+        return SimpleNamespace(returncode=returncode, stdout=stdout, stderr=stderr)
+
+    return _make
+
 
 @pytest.fixture
 def mock_run(monkeypatch):
@@ -24,17 +61,48 @@ def mock_run(monkeypatch):
     return mock
 
 
+_ARG_DEFAULTS = MappingProxyType({"json": False, "account": "iCloud", "mailbox": "INBOX"})
+
+
 @pytest.fixture
 def mock_args():
     """Factory fixture for creating argparse Namespace objects with defaults."""
 
     def _create(**overrides):
-        defaults = {
-            "json": False,
-            "account": "iCloud",
-            "mailbox": "INBOX",
-        }
-        defaults.update(overrides)
-        return Namespace(**defaults)
+        return Namespace(**{**_ARG_DEFAULTS, **overrides})
 
     return _create
+
+
+class _FakeResp:
+    """Minimal stand-in for the context manager returned by urlopen()."""
+
+    __slots__ = ("_body", "status")
+
+    def __init__(self, body=b"", status=200):
+        self._body = body
+        self.status = status
+
+    def read(self):
+        return self._body
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+
+@pytest.fixture
+def make_urlopen_response():
+    """Factory fixture for lightweight urlopen() responses.
+
+    Accepts a JSON-serialisable payload (or raw bytes) and returns a context
+    manager whose read() yields the encoded body.
+    """
+
+    def _make(payload=b"", status=200):
+        body = payload if isinstance(payload, (bytes, bytearray)) else json.dumps(payload).encode("utf-8")
+        return _FakeResp(body, status)
+
+    return _make
@@ -458,7 +458,7 @@ class TestNotJunkNoAccount:
 class TestNotJunkGmailPaths:
     """Cover not-junk Gmail mailbox candidates (lines 430, 437-441)."""
 
-    def test_not_junk_custom_mailbox(self, monkeypatch, capsys):
+    def test_not_junk_custom_mailbox(self, monkeypatch, capsys, osascript_result):
         """When -m is specified, only that mailbox is tried (line 430)."""
         from mxctl.commands.mail.actions import cmd_not_junk
 
@@ -471,8 +471,7 @@ class TestNotJunkGmailPaths:
         )
 
         # Mock the subprocess for fetching orig subject/sender
-        mock_fetch = Mock()
-        mock_fetch.returncode = 1  # Fetching original message fails
+        mock_fetch = osascript_result(returncode=1)  # Fetching original message fails
         monkeypatch.setattr("subprocess.run", Mock(return_value=mock_fetch))
 
         args = _args(id=42, mailbox="CustomJunk")
@@ -481,7 +480,7 @@ class TestNotJunkGmailPaths:
         out = capsys.readouterr().out
         assert "not junk" in out.lower()
 
-    def test_not_junk_gmail_adds_candidates(self, monkeypatch, capsys):
+    def test_not_junk_gmail_adds_candidates(self, monkeypatch, capsys, osascript_result):
         """Gmail accounts try [Gmail]/Spam and [Gmail]/All Mail (lines 437-441)."""
         from mxctl.commands.mail.actions import cmd_not_junk
 
@@ -500,8 +499,7 @@ class TestNotJunkGmailPaths:
 
         monkeypatch.setattr("mxctl.commands.mail.actions._try_not_junk_in_mailbox", mock_try_not_junk)
 
-        mock_fetch = Mock()
-        mock_fetch.returncode = 1
+        mock_fetch = osascript_result(returncode=1)
         monkeypatch.setattr("subprocess.run", Mock(return_value=mock_fetch))
 
         args = _args(id=42, account="Gmail", mailbox=None)
@@ -512,7 +510,7 @@ class TestNotJunkGmailPaths:
         # Candidates: [Gmail]/Spam (from resolve_mailbox), [Gmail]/All Mail (appended)
         assert call_count[0] == 2
 
-    def test_not_junk_fetches_orig_subject_sender(self, monkeypatch, capsys):
+    def test_not_junk_fetches_orig_subject_sender(self, monkeypatch, capsys, osascript_result):
         """Cover the successful fetch of original subject+sender (lines 420-423)."""
         from mxctl.commands.mail.actions import cmd_not_junk
 
@@ -521,9 +519,7 @@ class TestNotJunkGmailPaths:
         monkeypatch.setattr("mxctl.commands.mail.actions.resolve_mailbox", lambda acct, mb: mb)
 
         # Mock the subprocess for fetching original subject/sender - SUCCEEDS
-        mock_fetch = Mock()
-        mock_fetch.returncode = 0
-        mock_fetch.stdout = f"Test Subject{FIELD_SEPARATOR}sender@example.com\n"
+        mock_fetch = osascript_result(stdout=f"Test Subject{FIELD_SEPARATOR}sender@example.com\n")
         monkeypatch.setattr("subprocess.run", Mock(return_value=mock_fetch))
 
         monkeypatch.setattr(
@@ -559,7 +555,7 @@ class TestNotJunkGmailPaths:
         out = capsys.readouterr().out
         assert "not junk" in out.lower()
 
-    def test_not_junk_gmail_junk_separate_from_spam(self, monkeypatch, capsys):
+    def test_not_junk_gmail_junk_separate_from_spam(self, monkeypatch, capsys, osascript_result):
         """Cover line 438: [Gmail]/Spam appended when junk_primary != [Gmail]/Spam."""
         from mxctl.commands.mail.actions import cmd_not_junk
 
@@ -579,8 +575,7 @@ class TestNotJunkGmailPaths:
 
         monkeypatch.setattr("mxctl.commands.mail.actions._try_not_junk_in_mailbox", mock_try)
 
-        mock_fetch = Mock()
-        mock_fetch.returncode = 1
+        mock_fetch = osascript_result(returncode=1)
         monkeypatch.setattr("subprocess.run", Mock(return_value=mock_fetch))
 
         args = _args(id=42, account="Gmail", mailbox=None)
@@ -1107,14 +1102,12 @@ class TestCompositeMissingLines:
         monkeypatch.setattr(
             "mxctl.commands.mail.composite.run",
             Mock(
-                side_effect=[
-                    "Subject",
-                    (
-                        f"1{FIELD_SEPARATOR}Subject{FIELD_SEPARATOR}sender{FIELD_SEPARATOR}Monday{FIELD_SEPARATOR}INBOX{FIELD_SEPARATOR}iCloud\n"
-                        "\n"
-                        f"2{FIELD_SEPARATOR}Re: Subject{FIELD_SEPARATOR}sender2{FIELD_SEPARATOR}Tuesday{FIELD_SEPARATOR}INBOX{FIELD_SEPARATOR}iCloud"
-                    ),
-                ]
+                return_value=(
+                    f"Subject{RECORD_SEPARATOR}"
+                    f"1{FIELD_SEPARATOR}Subject{FIELD_SEPARATOR}sender{FIELD_SEPARATOR}Monday{FIELD_SEPARATOR}INBOX{FIELD_SEPARATOR}iCloud\n"
+                    "\n"
+                    f"2{FIELD_SEPARATOR}Re: Subject{FIELD_SEPARATOR}sender2{FIELD_SEPARATOR}Tuesday{FIELD_SEPARATOR}INBOX{FIELD_SEPARATOR}iCloud"
+                )
             ),
         )
 
@@ -1504,17 +1497,13 @@ class TestTodoistMissingLines:
         with pytest.raises(SystemExit):
             cmd_to_todoist(self._todoist_args(project="Work"))
 
-    def test_task_due_string_included(self, monkeypatch, capsys):
+    def test_task_due_string_included(self, monkeypatch, capsys, make_urlopen_response):
         """due_string is included in task payload (line 95)."""
         from mxctl.commands.mail.todoist_integration import cmd_to_todoist
 
         self._setup_todoist(monkeypatch)
 
-        response_payload = {"id": "task_1", "content": "Subject"}
-        mock_resp = MagicMock()
-        mock_resp.read.return_value = json.dumps(response_payload).encode("utf-8")
-        mock_resp.__enter__ = lambda s: s
-        mock_resp.__exit__ = MagicMock(return_value=False)
+        mock_resp = make_urlopen_response({"id": "task_1", "content": "Subject"})
         monkeypatch.setattr("mxctl.commands.mail.todoist_integration.urllib.request.urlopen", Mock(return_value=mock_resp))
 
         cmd_to_todoist(self._todoist_args(due="tomorrow"))
@@ -1590,23 +1579,17 @@ class TestTodoistMissingLines:
         with pytest.raises(SystemExit):
             cmd_to_todoist(self._todoist_args())
 
-    def test_project_paginated_response(self, monkeypatch, capsys):
+    def test_project_paginated_response(self, monkeypatch, capsys, make_urlopen_response):
         """Cover paginated API v1 response with 'results' key (line 72)."""
         from mxctl.commands.mail.todoist_integration import cmd_to_todoist
 
         self._setup_todoist(monkeypatch)
 
         # First call: GET projects (paginated format)
-        projects_resp = MagicMock()
-        projects_resp.read.return_value = json.dumps({"results": [{"id": "proj_1", "name": "Work"}], "next_cursor": None}).encode("utf-8")
-        projects_resp.__enter__ = lambda s: s
-        projects_resp.__exit__ = MagicMock(return_value=False)
+        projects_resp = make_urlopen_response({"results": [{"id": "proj_1", "name": "Work"}], "next_cursor": None})
 
         # Second call: POST task
-        task_resp = MagicMock()
-        task_resp.read.return_value = json.dumps({"id": "task_1", "content": "Subject"}).encode("utf-8")
-        task_resp.__enter__ = lambda s: s
-        task_resp.__exit__ = MagicMock(return_value=False)
+        task_resp = make_urlopen_response({"id": "task_1", "content": "Subject"})
 
         monkeypatch.setattr("mxctl.commands.mail.todoist_integration.urllib.request.urlopen", Mock(side_effect=[projects_resp, task_resp]))
 
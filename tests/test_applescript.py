@@ -1,7 +1,6 @@
 """Tests for applescript module."""
 
 import os
-from unittest.mock import Mock
 
 import pytest
 
@@ -55,11 +54,9 @@ class TestSanitizePath:
 class TestRunSmartQuotes:
     """Test that smart-quoted AppleScript errors trigger friendly messages."""
 
-    def test_smart_quote_account_not_found(self, monkeypatch, capsys):
+    def test_smart_quote_account_not_found(self, monkeypatch, capsys, osascript_result):
         """Smart-quoted can\u2019t get account triggers friendly error."""
-        mock_result = Mock()
-        mock_result.returncode = 1
-        mock_result.stderr = 'Can\u2019t get account "Foo". (-1728)'
+        mock_result = osascript_result(returncode=1, stderr='Can\u2019t get account "Foo". (-1728)')
 
         monkeypatch.setattr("mxctl.util.applescript.subprocess.run", lambda *a, **kw: mock_result)
 
@@ -69,11 +66,9 @@ class TestRunSmartQuotes:
         captured = capsys.readouterr()
         assert "Account not found" in captured.err
 
-    def test_smart_quote_message_not_found(self, monkeypatch, capsys):
+    def test_smart_quote_message_not_found(self, monkeypatch, capsys, osascript_result):
         """Smart-quoted can\u2019t get message triggers friendly error."""
-        mock_result = Mock()
-        mock_result.returncode = 1
-        mock_result.stderr = 'Can\u2019t get message 1 of mailbox "INBOX". (-1719)'
+        mock_result = osascript_result(returncode=1, stderr='Can\u2019t get message 1 of mailbox "INBOX". (-1719)')
 
         monkeypatch.setattr("mxctl.util.applescript.subprocess.run", lambda *a, **kw: mock_result)
 
@@ -83,11 +78,9 @@ class TestRunSmartQuotes:
         captured = capsys.readouterr()
         assert "Message not found" in captured.err
 
-    def test_straight_quote_still_works(self, monkeypatch, capsys):
+    def test_straight_quote_still_works(self, monkeypatch, capsys, osascript_result):
         """ASCII straight-quoted can't get account still works."""
-        mock_result = Mock()
-        mock_result.returncode = 1
-        mock_result.stderr = 'Can\'t get account "Bar". (-1728)'
+        mock_result = osascript_result(returncode=1, stderr='Can\'t get account "Bar". (-1728)')
 
         monkeypatch.setattr("mxctl.util.applescript.subprocess.run", lambda *a, **kw: mock_result)
 
@@ -4,7 +4,7 @@ from unittest.mock import Mock
 
 import pytest
 
-from mxctl.config import FIELD_SEPARATOR
+from mxctl.config import FIELD_SEPARATOR, RECORD_SEPARATOR
 
 # ---------------------------------------------------------------------------
 # cmd_inbox (accounts.py)
@@ -768,15 +768,13 @@ def test_cmd_thread_basic(monkeypatch, mock_args, capsys):
     """Smoke test: cmd_thread shows conversation thread."""
     from mxctl.commands.mail.composite import cmd_thread
 
-    # run() called twice: first for subject, then for thread messages
+    # A single run() returns the subject, RECORD_SEPARATOR, then the thread messages
     mock_run = Mock(
-        side_effect=[
-            "Original Subject",
-            (
-                f"100{chr(0x1F)}Re: Original Subject{chr(0x1F)}person@example.com{chr(0x1F)}Mon Feb 14 2026{chr(0x1F)}INBOX{chr(0x1F)}iCloud\n"
-                f"101{chr(0x1F)}Re: Original Subject{chr(0x1F)}other@example.com{chr(0x1F)}Tue Feb 15 2026{chr(0x1F)}INBOX{chr(0x1F)}iCloud\n"
-            ),
-        ]
+        return_value=(
+            f"Original Subject{RECORD_SEPARATOR}"
+            f"100{chr(0x1F)}Re: Original Subject{chr(0x1F)}person@example.com{chr(0x1F)}Mon Feb 14 2026{chr(0x1F)}INBOX{chr(0x1F)}iCloud\n"
+            f"101{chr(0x1F)}Re: Original Subject{chr(0x1F)}other@example.com{chr(0x1F)}Tue Feb 15 2026{chr(0x1F)}INBOX{chr(0x1F)}iCloud\n"
+        )
     )
     monkeypatch.setattr("mxctl.commands.mail.composite.run", mock_run)
 
@@ -795,10 +793,10 @@ def test_cmd_thread_json(monkeypatch, mock_args, capsys):
     from mxctl.commands.mail.composite import cmd_thread
 
     mock_run = Mock(
-        side_effect=[
-            "Original Subject",
-            f"100{chr(0x1F)}Re: Original Subject{chr(0x1F)}person@example.com{chr(0x1F)}Mon Feb 14 2026{chr(0x1F)}INBOX{chr(0x1F)}iCloud\n",
-        ]
+        return_value=(
+            f"Original Subject{RECORD_SEPARATOR}"
+            f"100{chr(0x1F)}Re: Original Subject{chr(0x1F)}person@example.com{chr(0x1F)}Mon Feb 14 2026{chr(0x1F)}INBOX{chr(0x1F)}iCloud\n"
+        )
     )
     monkeypatch.setattr("mxctl.commands.mail.composite.run", mock_run)
 
@@ -811,6 +809,21 @@ def test_cmd_thread_json(monkeypatch, mock_args, capsys):
     assert '"account": "iCloud"' in captured.out
 
 
+def test_get_thread_script_strips_every_reply_prefix(monkeypatch):
+    """The thread script's prefix list is rendered from REPLY_PREFIXES."""
+    from mxctl.commands.mail.composite import get_thread
+    from mxctl.util.mail_helpers import REPLY_PREFIXES
+
+    mock_run = Mock(return_value=f"Subject{RECORD_SEPARATOR}")
+    monkeypatch.setattr("mxctl.commands.mail.composite.run", mock_run)
+
+    get_thread("iCloud", "INBOX", 123)
+
+    script = mock_run.call_args[0][0]
+    for prefix in REPLY_PREFIXES:
+        assert f'"{prefix}:"' in script
+
+
 # ---------------------------------------------------------------------------
 # cmd_top_senders (analytics.py)
 # ---------------------------------------------------------------------------
@@ -2,7 +2,7 @@
 
 import json
 from argparse import Namespace
-from unittest.mock import MagicMock, Mock, patch
+from unittest.mock import Mock, patch
 
 import pytest
 
@@ -170,7 +170,7 @@ class TestCmdToTodoist:
         with pytest.raises(SystemExit):
             cmd_to_todoist(args)
 
-    def test_to_todoist_happy_path(self, monkeypatch, capsys):
+    def test_to_todoist_happy_path(self, monkeypatch, capsys, make_urlopen_response):
         """Test that cmd_to_todoist creates a task via the API."""
         from mxctl.commands.mail.todoist_integration import cmd_to_todoist
         from mxctl.config import FIELD_SEPARATOR
@@ -192,10 +192,7 @@ class TestCmdToTodoist:
 
         # Mock the urllib HTTP call
         fake_response_data = {"id": "task-999", "content": "Test Subject", "url": "https://todoist.com/tasks/999"}
-        fake_response = MagicMock()
-        fake_response.__enter__ = lambda s: s
-        fake_response.__exit__ = Mock(return_value=False)
-        fake_response.read.return_value = json.dumps(fake_response_data).encode("utf-8")
+        fake_response = make_urlopen_response(fake_response_data)
 
         with patch("mxctl.commands.mail.todoist_integration.urllib.request.urlopen", return_value=fake_response):
             args = _make_args(id=42, project=None, priority=1, due=None)
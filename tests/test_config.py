@@ -345,6 +345,29 @@ class TestLoadJson:
         assert result == {}
 
 
+# ===========================================================================
+# _replace_file atomic writes
+# ===========================================================================
+
+
+class TestReplaceFile:
+    """Test _replace_file temp-file-and-rename writes."""
+
+    def test_replace_file_overwrites_owner_only(self, tmp_path):
+        """Existing content is replaced, mode is 0600, and no temp file remains."""
+        import mxctl.config as cfg_mod
+
+        target = tmp_path / "templates.json"
+        target.write_text("old contents that are longer")
+        target.chmod(0o644)
+
+        cfg_mod._replace_file(str(target), "new")
+
+        assert target.read_text() == "new"
+        assert target.stat().st_mode & 0o777 == 0o600
+        assert os.listdir(tmp_path) == ["templates.json"]
+
+
 # ===========================================================================
 # get_config: migration trigger, required=True, warn paths
 # ===========================================================================
@@ -415,6 +438,61 @@ class TestGetConfig:
         result = cfg_mod.get_config(required=False, warn=False)
         assert result.get("migrated_key") is True
 
+    def test_get_config_parses_unchanged_file_once(self, tmp_path, monkeypatch):
+        """Repeat calls reuse the parsed config while the file is unchanged."""
+        from unittest.mock import patch
+
+        import mxctl.config as cfg_mod
+
+        config_file = tmp_path / "config.json"
+        config_file.write_text('{"mail": {"default_account": "iCloud"}}')
+        monkeypatch.setattr(cfg_mod, "CONFIG_FILE", str(config_file))
+
+        with patch.object(cfg_mod, "_load_json", wraps=cfg_mod._load_json) as mock_load:
+            for _ in range(3):
+                assert cfg_mod.get_config()["mail"]["default_account"] == "iCloud"
+        mock_load.assert_called_once()
+
+    def test_get_config_rereads_rewritten_file(self, tmp_path, monkeypatch):
+        """A rewrite that changes the file's size or mtime is picked up."""
+        import mxctl.config as cfg_mod
+
+        config_file = tmp_path / "config.json"
+        config_file.write_text('{"default_account": "iCloud"}')
+        monkeypatch.setattr(cfg_mod, "CONFIG_FILE", str(config_file))
+        assert cfg_mod.get_config()["default_account"] == "iCloud"
+
+        config_file.write_text('{"default_account": "Work Gmail"}')
+        assert cfg_mod.get_config()["default_account"] == "Work Gmail"
+
+    def test_get_config_sees_same_size_save_within_one_mtime_tick(self, tmp_path, monkeypatch):
+        """_save_json drops the cached parse, even when size and mtime are unchanged."""
+        import mxctl.config as cfg_mod
+
+        config_file = tmp_path / "config.json"
+        monkeypatch.setattr(cfg_mod, "CONFIG_FILE", str(config_file))
+        monkeypatch.setattr(cfg_mod, "CONFIG_DIR", str(tmp_path))
+        monkeypatch.setattr(cfg_mod, "_migrated", True)
+        cfg_mod._save_json(str(config_file), {"default_account": "AAAA"})
+        assert cfg_mod.get_config()["default_account"] == "AAAA"
+        st = config_file.stat()
+
+        cfg_mod._save_json(str(config_file), {"default_account": "BBBB"})
+        # Same size; pin the mtime too, as on a filesystem with 1 s resolution
+        os.utime(config_file, ns=(st.st_atime_ns, st.st_mtime_ns))
+        assert cfg_mod.get_config()["default_account"] == "BBBB"
+
+    def test_get_config_returns_independent_copies(self, tmp_path, monkeypatch):
+        """Mutating a returned config does not change what the next call sees."""
+        import mxctl.config as cfg_mod
+
+        config_file = tmp_path / "config.json"
+        config_file.write_text('{"mail": {"default_account": "iCloud"}}')
+        monkeypatch.setattr(cfg_mod, "CONFIG_FILE", str(config_file))
+
+        cfg_mod.get_config()["mail"]["default_account"] = "Changed"
+        assert cfg_mod.get_config()["mail"]["default_account"] == "iCloud"
+
 
 # ===========================================================================
 # save_message_aliases + resolve_alias
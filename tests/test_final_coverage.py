@@ -9,7 +9,7 @@ Covers:
 
 import json
 from argparse import Namespace
-from unittest.mock import MagicMock, Mock, patch
+from unittest.mock import Mock, patch
 
 from mxctl.config import FIELD_SEPARATOR
 
@@ -72,17 +72,14 @@ class TestAiSummarizePreviews:
         result = _ai_summarize_previews(msgs)
         assert result == ["Hello"]
 
-    def test_successful_api_call(self, monkeypatch):
+    def test_successful_api_call(self, monkeypatch, make_urlopen_response):
         """Successful API call returns parsed summaries."""
         monkeypatch.setenv("ANTHROPIC_API_KEY", "sk-test-key")
         from mxctl.commands.mail.messages import _ai_summarize_previews
 
         api_response = json.dumps({"content": [{"text": "Summary one\nSummary two"}]}).encode()
 
-        mock_resp = MagicMock()
-        mock_resp.read.return_value = api_response
-        mock_resp.__enter__ = lambda s: s
-        mock_resp.__exit__ = Mock(return_value=False)
+        mock_resp = make_urlopen_response(api_response)
 
         with patch("urllib.request.urlopen", return_value=mock_resp):
             msgs = [{"subject": "T1", "sender": "a@b.com", "preview": "Hello"}, {"subject": "T2", "sender": "c@d.com", "preview": "World"}]
@@ -92,17 +89,14 @@ class TestAiSummarizePreviews:
         assert result[0] == "Summary one"
         assert result[1] == "Summary two"
 
-    def test_api_returns_fewer_summaries_pads(self, monkeypatch):
+    def test_api_returns_fewer_summaries_pads(self, monkeypatch, make_urlopen_response):
         """When API returns fewer summaries than messages, pad with empty strings."""
         monkeypatch.setenv("ANTHROPIC_API_KEY", "sk-test-key")
         from mxctl.commands.mail.messages import _ai_summarize_previews
 
         api_response = json.dumps({"content": [{"text": "Only one"}]}).encode()
 
-        mock_resp = MagicMock()
-        mock_resp.read.return_value = api_response
-        mock_resp.__enter__ = lambda s: s
-        mock_resp.__exit__ = Mock(return_value=False)
+        mock_resp = make_urlopen_response(api_response)
 
         with patch("urllib.request.urlopen", return_value=mock_resp):
             msgs = [
@@ -116,17 +110,14 @@ class TestAiSummarizePreviews:
         assert result[1] == ""
         assert result[2] == ""
 
-    def test_api_returns_more_summaries_truncates(self, monkeypatch):
+    def test_api_returns_more_summaries_truncates(self, monkeypatch, make_urlopen_response):
         """When API returns more summaries than messages, truncate to message count."""
         monkeypatch.setenv("ANTHROPIC_API_KEY", "sk-test-key")
         from mxctl.commands.mail.messages import _ai_summarize_previews
 
         api_response = json.dumps({"content": [{"text": "S1\nS2\nS3\nS4"}]}).encode()
 
-        mock_resp = MagicMock()
-        mock_resp.read.return_value = api_response
-        mock_resp.__enter__ = lambda s: s
-        mock_resp.__exit__ = Mock(return_value=False)
+        mock_resp = make_urlopen_response(api_response)
 
         with patch("urllib.request.urlopen", return_value=mock_resp):
             msgs = [{"subject": "A", "sender": "a@b.com", "preview": "x"}, {"subject": "B", "sender": "c@d.com", "preview": "y"}]
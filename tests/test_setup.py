@@ -1,10 +1,31 @@
 """Tests for the mxctl init setup wizard command."""
 
+import argparse
+import builtins
 import json
 import os
-from unittest.mock import Mock
-
+import sys
+import termios
+from pathlib import Path
+from types import SimpleNamespace
+
+import pytest
+
+import mxctl.config as cfg_mod
+from mxctl.commands.mail import setup as setup_mod
+from mxctl.commands.mail.setup import (
+    _MXCTL_AI_SNIPPET,
+    _SNIPPET_MARKER,
+    _checkbox_select,
+    _is_interactive,
+    _radio_select,
+    cmd_ai_setup,
+    cmd_init,
+    register,
+)
 from mxctl.config import FIELD_SEPARATOR
+from mxctl.util import mail_helpers
+from mxctl.util.mail_helpers import resolve_mailbox
 
 # ---------------------------------------------------------------------------
 # Helpers
@@ -16,26 +37,86 @@ def _make_account_line(name, email, enabled=True):
     return f"{name}{FIELD_SEPARATOR}{email}{FIELD_SEPARATOR}{enabled_str}"
 
 
+_ACCT_ICLOUD = _make_account_line("iCloud", "me@icloud.com")
+_ACCT_GMAIL = _make_account_line("Gmail", "me@gmail.com")
+_ACCT_ASU = _make_account_line("ASU Gmail", "me@asu.edu")
+_ACCT_DISABLED = _make_account_line("Disabled", "me@example.com", enabled=False)
+
+_LINES_ICLOUD = _ACCT_ICLOUD + "\n"
+_LINES_GMAIL = _ACCT_GMAIL + "\n"
+_LINES_DISABLED = _ACCT_DISABLED + "\n"
+_LINES_ICLOUD_GMAIL = _ACCT_ICLOUD + "\n" + _ACCT_GMAIL + "\n"
+_LINES_ICLOUD_ASU = _ACCT_ICLOUD + "\n" + _ACCT_ASU + "\n"
+_LINES_ICLOUD_TWO_GMAIL = (
+    "\n".join([_ACCT_ICLOUD, _make_account_line("Gmail1", "a@gmail.com"), _make_account_line("Gmail2", "b@gmail.com")]) + "\n"
+)
+
+
+def _patch(monkeypatch, target, **attrs):
+    """monkeypatch.setattr each keyword onto *target*."""
+    for name, value in attrs.items():
+        monkeypatch.setattr(target, name, value)
+
+
+def _fake_run(output):
+    """Stand-in for setup.run that ignores the script and returns *output*."""
+    return lambda *a, **k: output
+
+
+def _read_cfg(path):
+    return json.loads(Path(path).read_bytes())
+
+
+@pytest.fixture
+def setup_paths(monkeypatch, tmp_path):
+    """Point the setup module's CONFIG_DIR/CONFIG_FILE into tmp_path.
+
+    mxctl.config is patched too so _save_json's _ensure_dir never creates or
+    migrates the real ~/.config/mxctl, keeping the tests safe under pytest-xdist.
+    """
+    config_dir = tmp_path / "config"
+    config_file = config_dir / "config.json"
+    _patch(monkeypatch, setup_mod, CONFIG_DIR=str(config_dir), CONFIG_FILE=str(config_file))
+    _patch(monkeypatch, cfg_mod, CONFIG_DIR=str(config_dir), _migrated=True)
+    return config_dir, config_file
+
+
+def _raise(exc):
+    """Stand-in (input answer or selector) that raises *exc* when called."""
+
+    def _answer(*_args):
+        raise exc
+
+    return _answer
+
+
+def _scripted_input(monkeypatch, answers):
+    """Feed *answers* to builtins.input in order; callable answers are invoked instead."""
+    pos = 0
+
+    def _input(_prompt):
+        nonlocal pos
+        answer = answers[pos]
+        pos += 1
+        return answer() if callable(answer) else answer
+
+    monkeypatch.setattr(builtins, "input", _input)
+
+
+_EXISTING_CONFIG = {"mail": {"default_account": "OldAccount"}}
+
+
 # ---------------------------------------------------------------------------
 # test_init_no_accounts
 # ---------------------------------------------------------------------------
 
 
-def test_init_no_accounts(monkeypatch, mock_args, capsys, tmp_path):
+def test_init_no_accounts(monkeypatch, mock_args, capsys, setup_paths):
     """When run() returns empty, print an error and return early."""
-    from mxctl.commands.mail.setup import cmd_init
-
-    # Point config file at a path that genuinely does not exist
-    config_dir = str(tmp_path / "cfg")
-    config_file = str(tmp_path / "cfg" / "config.json")
-    monkeypatch.setattr("mxctl.commands.mail.setup.CONFIG_DIR", config_dir)
-    monkeypatch.setattr("mxctl.commands.mail.setup.CONFIG_FILE", config_file)
+    # setup_paths points the config file at a path that genuinely does not exist
+    monkeypatch.setattr(setup_mod, "run", _fake_run(""))
 
-    mock_run = Mock(return_value="")
-    monkeypatch.setattr("mxctl.commands.mail.setup.run", mock_run)
-
-    args = mock_args()
-    cmd_init(args)
+    cmd_init(mock_args())
 
     captured = capsys.readouterr()
     assert "No mail accounts found" in captured.out
@@ -46,33 +127,24 @@ def test_init_no_accounts(monkeypatch, mock_args, capsys, tmp_path):
 # ---------------------------------------------------------------------------
 
 
-def test_init_single_account_autoselect(monkeypatch, mock_args, capsys, tmp_path):
+def test_init_single_account_autoselect(monkeypatch, mock_args, capsys, setup_paths):
     """One enabled account: auto-select it and write config."""
-    from mxctl.commands.mail.setup import cmd_init
-
-    config_dir = str(tmp_path / "config")
-    config_file = str(tmp_path / "config" / "config.json")
-    monkeypatch.setattr("mxctl.commands.mail.setup.CONFIG_DIR", config_dir)
-    monkeypatch.setattr("mxctl.commands.mail.setup.CONFIG_FILE", config_file)
+    _, config_file = setup_paths
 
-    acct_line = _make_account_line("iCloud", "me@icloud.com", enabled=True)
-    mock_run = Mock(return_value=acct_line + "\n")
-    monkeypatch.setattr("mxctl.commands.mail.setup.run", mock_run)
+    monkeypatch.setattr(setup_mod, "run", _fake_run(_LINES_ICLOUD))
 
     # config_file genuinely does not exist (fresh tmp_path) — no patch needed
     # Skip Todoist token
-    monkeypatch.setattr("builtins.input", lambda _: "")
+    monkeypatch.setattr(builtins, "input", lambda _: "")
 
-    args = mock_args()
-    cmd_init(args)
+    cmd_init(mock_args())
 
     captured = capsys.readouterr()
     assert "Auto-selected" in captured.out
     assert "iCloud" in captured.out
 
     assert os.path.isfile(config_file)
-    with open(config_file) as f:
-        cfg = json.load(f)
+    cfg = _read_cfg(config_file)
     assert cfg["mail"]["default_account"] == "iCloud"
 
 
@@ -81,39 +153,21 @@ def test_init_single_account_autoselect(monkeypatch, mock_args, capsys, tmp_path
 # ---------------------------------------------------------------------------
 
 
-def test_init_multiple_accounts(monkeypatch, mock_args, capsys, tmp_path):
+def test_init_multiple_accounts(monkeypatch, mock_args, setup_paths):
     """Multiple accounts: user picks one by number, config is written."""
-    from mxctl.commands.mail.setup import cmd_init
-
-    config_dir = str(tmp_path / "config")
-    config_file = str(tmp_path / "config" / "config.json")
-    monkeypatch.setattr("mxctl.commands.mail.setup.CONFIG_DIR", config_dir)
-    monkeypatch.setattr("mxctl.commands.mail.setup.CONFIG_FILE", config_file)
-
-    lines = (
-        "\n".join(
-            [
-                _make_account_line("iCloud", "me@icloud.com", enabled=True),
-                _make_account_line("Gmail", "me@gmail.com", enabled=True),
-            ]
-        )
-        + "\n"
-    )
-    mock_run = Mock(return_value=lines)
-    monkeypatch.setattr("mxctl.commands.mail.setup.run", mock_run)
+    _, config_file = setup_paths
+
+    monkeypatch.setattr(setup_mod, "run", _fake_run(_LINES_ICLOUD_GMAIL))
 
     # config_file genuinely does not exist — no patch needed
 
     # User picks account 2 (Gmail), skips Gmail prompt, skips Todoist token
-    inputs = iter(["2", "", ""])
-    monkeypatch.setattr("builtins.input", lambda _: next(inputs))
+    _scripted_input(monkeypatch, ["2", "", ""])
 
-    args = mock_args()
-    cmd_init(args)
+    cmd_init(mock_args())
 
     assert os.path.isfile(config_file)
-    with open(config_file) as f:
-        cfg = json.load(f)
+    cfg = _read_cfg(config_file)
     assert cfg["mail"]["default_account"] == "Gmail"
 
 
@@ -122,40 +176,31 @@ def test_init_multiple_accounts(monkeypatch, mock_args, capsys, tmp_path):
 # ---------------------------------------------------------------------------
 
 
-def test_init_existing_config(monkeypatch, mock_args, capsys, tmp_path):
-    """Existing config: user says 'y' to reconfigure, wizard runs."""
-    from mxctl.commands.mail.setup import cmd_init
-
-    config_dir = str(tmp_path / "config")
-    config_file = str(tmp_path / "config" / "config.json")
-    os.makedirs(config_dir, exist_ok=True)
-
-    # Write an existing config so os.path.isfile returns True for real
-    existing = {"mail": {"default_account": "OldAccount"}}
-    with open(config_file, "w") as f:
-        json.dump(existing, f)
-
-    monkeypatch.setattr("mxctl.commands.mail.setup.CONFIG_DIR", config_dir)
-    monkeypatch.setattr("mxctl.commands.mail.setup.CONFIG_FILE", config_file)
+@pytest.mark.parametrize(
+    ("answers", "use_json", "expected", "saved_account"),
+    [
+        pytest.param(["y", "n", ""], False, ("Auto-selected",), "iCloud", id="reconfigure"),
+        pytest.param(["n"], False, ("Keeping existing configuration",), "OldAccount", id="decline"),
+        pytest.param(["n"], True, ("Keeping existing configuration", '"default_account"', "OldAccount"), "OldAccount", id="decline-json"),
+        pytest.param([_raise(KeyboardInterrupt)], False, ("Setup cancelled",), "OldAccount", id="keyboard-interrupt"),
+        pytest.param([_raise(EOFError)], False, ("Keeping existing configuration",), "OldAccount", id="eof-declines"),
+    ],
+)
+def test_init_existing_config(monkeypatch, mock_args, capsys, setup_paths, answers, use_json, expected, saved_account):
+    """Existing config: 'y' reruns the wizard; 'n', EOF or Ctrl-C leave the file untouched."""
+    config_dir, config_file = setup_paths
+    config_dir.mkdir()
+    config_file.write_text(json.dumps(_EXISTING_CONFIG))
 
-    acct_line = _make_account_line("iCloud", "me@icloud.com", enabled=True)
-    mock_run = Mock(return_value=acct_line + "\n")
-    monkeypatch.setattr("mxctl.commands.mail.setup.run", mock_run)
-    monkeypatch.setattr("mxctl.commands.mail.setup.get_config", lambda: existing)
+    _patch(monkeypatch, setup_mod, run=_fake_run(_LINES_ICLOUD), get_config=lambda: _EXISTING_CONFIG)
+    _scripted_input(monkeypatch, answers)
 
-    # "y" to reconfigure, skip Gmail prompt ("n"), skip Todoist token
-    inputs = iter(["y", "n", ""])
-    monkeypatch.setattr("builtins.input", lambda _: next(inputs))
-
-    args = mock_args()
-    cmd_init(args)
+    cmd_init(mock_args(json=use_json))
 
     captured = capsys.readouterr()
-    assert "Auto-selected" in captured.out
-
-    with open(config_file) as f:
-        cfg = json.load(f)
-    assert cfg["mail"]["default_account"] == "iCloud"
+    for text in expected:
+        assert text in captured.out
+    assert _read_cfg(config_file)["mail"]["default_account"] == saved_account
 
 
 # ---------------------------------------------------------------------------
@@ -163,23 +208,15 @@ def test_init_existing_config(monkeypatch, mock_args, capsys, tmp_path):
 # ---------------------------------------------------------------------------
 
 
-def test_init_json_output(monkeypatch, mock_args, capsys, tmp_path):
+def test_init_json_output(monkeypatch, mock_args, capsys, setup_paths):
     """--json flag outputs the written config as JSON."""
-    from mxctl.commands.mail.setup import cmd_init
-
-    config_dir = str(tmp_path / "config")
-    config_file = str(tmp_path / "config" / "config.json")
-    monkeypatch.setattr("mxctl.commands.mail.setup.CONFIG_DIR", config_dir)
-    monkeypatch.setattr("mxctl.commands.mail.setup.CONFIG_FILE", config_file)
+    _, config_file = setup_paths
 
-    acct_line = _make_account_line("iCloud", "me@icloud.com", enabled=True)
-    mock_run = Mock(return_value=acct_line + "\n")
-    monkeypatch.setattr("mxctl.commands.mail.setup.run", mock_run)
+    monkeypatch.setattr(setup_mod, "run", _fake_run(_LINES_ICLOUD))
     # config_file genuinely does not exist — no patch needed
-    monkeypatch.setattr("builtins.input", lambda _: "")
+    monkeypatch.setattr(builtins, "input", lambda _: "")
 
-    args = mock_args(json=True)
-    cmd_init(args)
+    cmd_init(mock_args(json=True))
 
     captured = capsys.readouterr()
     assert '"default_account"' in captured.out
@@ -191,36 +228,18 @@ def test_init_json_output(monkeypatch, mock_args, capsys, tmp_path):
 # ---------------------------------------------------------------------------
 
 
-def test_init_gmail_accounts_saved(monkeypatch, mock_args, capsys, tmp_path):
+def test_init_gmail_accounts_saved(monkeypatch, mock_args, setup_paths):
     """Gmail accounts selected during init are saved to config."""
-    from mxctl.commands.mail.setup import cmd_init
-
-    config_dir = str(tmp_path / "config")
-    config_file = str(tmp_path / "config" / "config.json")
-    monkeypatch.setattr("mxctl.commands.mail.setup.CONFIG_DIR", config_dir)
-    monkeypatch.setattr("mxctl.commands.mail.setup.CONFIG_FILE", config_file)
-
-    lines = (
-        "\n".join(
-            [
-                _make_account_line("iCloud", "me@icloud.com", enabled=True),
-                _make_account_line("ASU Gmail", "me@asu.edu", enabled=True),
-            ]
-        )
-        + "\n"
-    )
-    mock_run = Mock(return_value=lines)
-    monkeypatch.setattr("mxctl.commands.mail.setup.run", mock_run)
+    _, config_file = setup_paths
+
+    monkeypatch.setattr(setup_mod, "run", _fake_run(_LINES_ICLOUD_ASU))
 
     # Pick account 1, mark account 2 as Gmail, skip Todoist
-    inputs = iter(["1", "2", ""])
-    monkeypatch.setattr("builtins.input", lambda _: next(inputs))
+    _scripted_input(monkeypatch, ["1", "2", ""])
 
-    args = mock_args()
-    cmd_init(args)
+    cmd_init(mock_args())
 
-    with open(config_file) as f:
-        cfg = json.load(f)
+    cfg = _read_cfg(config_file)
     assert cfg["mail"]["default_account"] == "iCloud"
     assert "ASU Gmail" in cfg["mail"]["gmail_accounts"]
 
@@ -232,16 +251,7 @@ def test_init_gmail_accounts_saved(monkeypatch, mock_args, capsys, tmp_path):
 
 def test_resolve_mailbox_gmail_translation(monkeypatch):
     """resolve_mailbox translates friendly names for Gmail accounts."""
-    from mxctl.util.mail_helpers import resolve_mailbox
-
-    monkeypatch.setattr(
-        "mxctl.util.mail_helpers.get_gmail_accounts",
-        lambda: ["ASU Gmail", "Personal Gmail"],
-    )
-    monkeypatch.setattr(
-        "mxctl.util.mail_helpers.get_icloud_accounts",
-        lambda: [],
-    )
+    _patch(monkeypatch, mail_helpers, get_gmail_accounts=lambda: ["ASU Gmail", "Personal Gmail"], get_icloud_accounts=lambda: [])
 
     assert resolve_mailbox("ASU Gmail", "Spam") == "[Gmail]/Spam"
     assert resolve_mailbox("ASU Gmail", "Junk") == "[Gmail]/Spam"
@@ -254,16 +264,7 @@ def test_resolve_mailbox_gmail_translation(monkeypatch):
 
 def test_resolve_mailbox_icloud_translation(monkeypatch):
     """resolve_mailbox translates friendly names for iCloud accounts."""
-    from mxctl.util.mail_helpers import resolve_mailbox
-
-    monkeypatch.setattr(
-        "mxctl.util.mail_helpers.get_gmail_accounts",
-        lambda: ["ASU Gmail"],
-    )
-    monkeypatch.setattr(
-        "mxctl.util.mail_helpers.get_icloud_accounts",
-        lambda: ["iCloud"],
-    )
+    _patch(monkeypatch, mail_helpers, get_gmail_accounts=lambda: ["ASU Gmail"], get_icloud_accounts=lambda: ["iCloud"])
 
     assert resolve_mailbox("iCloud", "Trash") == "Deleted Messages"
     assert resolve_mailbox("iCloud", "Deleted") == "Deleted Messages"
@@ -279,16 +280,7 @@ def test_resolve_mailbox_icloud_translation(monkeypatch):
 
 def test_resolve_mailbox_non_configured_passthrough(monkeypatch):
     """resolve_mailbox does not translate names for unconfigured accounts."""
-    from mxctl.util.mail_helpers import resolve_mailbox
-
-    monkeypatch.setattr(
-        "mxctl.util.mail_helpers.get_gmail_accounts",
-        lambda: ["ASU Gmail"],
-    )
-    monkeypatch.setattr(
-        "mxctl.util.mail_helpers.get_icloud_accounts",
-        lambda: [],
-    )
+    _patch(monkeypatch, mail_helpers, get_gmail_accounts=lambda: ["ASU Gmail"], get_icloud_accounts=lambda: [])
 
     assert resolve_mailbox("Outlook", "Trash") == "Trash"
     assert resolve_mailbox("Outlook", "Spam") == "Spam"
@@ -300,27 +292,18 @@ def test_resolve_mailbox_non_configured_passthrough(monkeypatch):
 # ---------------------------------------------------------------------------
 
 
-def test_init_creates_config_dir(monkeypatch, mock_args, capsys, tmp_path):
+def test_init_creates_config_dir(monkeypatch, mock_args, setup_paths):
     """Config directory is created if it doesn't exist."""
-    from mxctl.commands.mail.setup import cmd_init
-
-    config_dir = str(tmp_path / "new_config_dir")
-    config_file = str(tmp_path / "new_config_dir" / "config.json")
+    config_dir, config_file = setup_paths
 
     # Directory does NOT exist yet
     assert not os.path.isdir(config_dir)
 
-    monkeypatch.setattr("mxctl.commands.mail.setup.CONFIG_DIR", config_dir)
-    monkeypatch.setattr("mxctl.commands.mail.setup.CONFIG_FILE", config_file)
-
-    acct_line = _make_account_line("iCloud", "me@icloud.com", enabled=True)
-    mock_run = Mock(return_value=acct_line + "\n")
-    monkeypatch.setattr("mxctl.commands.mail.setup.run", mock_run)
+    monkeypatch.setattr(setup_mod, "run", _fake_run(_LINES_ICLOUD))
     # config_file genuinely does not exist — no patch needed
-    monkeypatch.setattr("builtins.input", lambda _: "")
+    monkeypatch.setattr(builtins, "input", lambda _: "")
 
-    args = mock_args()
-    cmd_init(args)
+    cmd_init(mock_args())
 
     # Directory and config file should now exist
     assert os.path.isdir(config_dir)
@@ -334,8 +317,6 @@ def test_init_creates_config_dir(monkeypatch, mock_args, capsys, tmp_path):
 
 def test_is_interactive_ci_env(monkeypatch):
     """CI env var forces _is_interactive() to return False."""
-    from mxctl.commands.mail.setup import _is_interactive
-
     monkeypatch.setenv("CI", "true")
     monkeypatch.delenv("MY_CLI_NON_INTERACTIVE", raising=False)
     assert _is_interactive() is False
@@ -343,148 +324,21 @@ def test_is_interactive_ci_env(monkeypatch):
 
 def test_is_interactive_non_interactive_env(monkeypatch):
     """MY_CLI_NON_INTERACTIVE env var forces _is_interactive() to return False."""
-    from mxctl.commands.mail.setup import _is_interactive
-
     monkeypatch.delenv("CI", raising=False)
     monkeypatch.setenv("MY_CLI_NON_INTERACTIVE", "1")
     assert _is_interactive() is False
 
 
-# ---------------------------------------------------------------------------
-# Existing config: user declines reconfigure
-# ---------------------------------------------------------------------------
-
-
-def test_init_existing_config_decline(monkeypatch, mock_args, capsys, tmp_path):
-    """Existing config, user says 'n' — keeps config and returns."""
-    from mxctl.commands.mail.setup import cmd_init
-
-    config_dir = str(tmp_path / "config")
-    config_file = str(tmp_path / "config" / "config.json")
-    os.makedirs(config_dir, exist_ok=True)
-
-    existing = {"mail": {"default_account": "OldAccount"}}
-    with open(config_file, "w") as f:
-        json.dump(existing, f)
-
-    monkeypatch.setattr("mxctl.commands.mail.setup.CONFIG_DIR", config_dir)
-    monkeypatch.setattr("mxctl.commands.mail.setup.CONFIG_FILE", config_file)
-    monkeypatch.setattr("mxctl.commands.mail.setup.get_config", lambda: existing)
-
-    # User says 'n' to reconfigure
-    monkeypatch.setattr("builtins.input", lambda _: "n")
-
-    args = mock_args()
-    cmd_init(args)
-
-    captured = capsys.readouterr()
-    assert "Keeping existing configuration" in captured.out
-
-
-def test_init_existing_config_decline_json(monkeypatch, mock_args, capsys, tmp_path):
-    """Existing config, user declines, --json outputs existing config."""
-    from mxctl.commands.mail.setup import cmd_init
-
-    config_dir = str(tmp_path / "config")
-    config_file = str(tmp_path / "config" / "config.json")
-    os.makedirs(config_dir, exist_ok=True)
-
-    existing = {"mail": {"default_account": "OldAccount"}}
-    with open(config_file, "w") as f:
-        json.dump(existing, f)
-
-    monkeypatch.setattr("mxctl.commands.mail.setup.CONFIG_DIR", config_dir)
-    monkeypatch.setattr("mxctl.commands.mail.setup.CONFIG_FILE", config_file)
-    monkeypatch.setattr("mxctl.commands.mail.setup.get_config", lambda: existing)
-
-    monkeypatch.setattr("builtins.input", lambda _: "n")
-
-    args = mock_args(json=True)
-    cmd_init(args)
-
-    captured = capsys.readouterr()
-    assert "Keeping existing configuration" in captured.out
-    # JSON output is present with existing config data
-    assert '"default_account"' in captured.out
-    assert "OldAccount" in captured.out
-
-
-def test_init_existing_config_keyboard_interrupt(monkeypatch, mock_args, capsys, tmp_path):
-    """Existing config, KeyboardInterrupt at reconfigure prompt — cancels."""
-    from mxctl.commands.mail.setup import cmd_init
-
-    config_dir = str(tmp_path / "config")
-    config_file = str(tmp_path / "config" / "config.json")
-    os.makedirs(config_dir, exist_ok=True)
-
-    existing = {"mail": {"default_account": "OldAccount"}}
-    with open(config_file, "w") as f:
-        json.dump(existing, f)
-
-    monkeypatch.setattr("mxctl.commands.mail.setup.CONFIG_DIR", config_dir)
-    monkeypatch.setattr("mxctl.commands.mail.setup.CONFIG_FILE", config_file)
-    monkeypatch.setattr("mxctl.commands.mail.setup.get_config", lambda: existing)
-
-    def raise_interrupt(_):
-        raise KeyboardInterrupt
-
-    monkeypatch.setattr("builtins.input", raise_interrupt)
-
-    args = mock_args()
-    cmd_init(args)
-
-    captured = capsys.readouterr()
-    assert "Setup cancelled" in captured.out
-
-
-def test_init_existing_config_eof(monkeypatch, mock_args, capsys, tmp_path):
-    """Existing config, EOFError at reconfigure prompt — defaults to 'n'."""
-    from mxctl.commands.mail.setup import cmd_init
-
-    config_dir = str(tmp_path / "config")
-    config_file = str(tmp_path / "config" / "config.json")
-    os.makedirs(config_dir, exist_ok=True)
-
-    existing = {"mail": {"default_account": "OldAccount"}}
-    with open(config_file, "w") as f:
-        json.dump(existing, f)
-
-    monkeypatch.setattr("mxctl.commands.mail.setup.CONFIG_DIR", config_dir)
-    monkeypatch.setattr("mxctl.commands.mail.setup.CONFIG_FILE", config_file)
-    monkeypatch.setattr("mxctl.commands.mail.setup.get_config", lambda: existing)
-
-    def raise_eof(_):
-        raise EOFError
-
-    monkeypatch.setattr("builtins.input", raise_eof)
-
-    args = mock_args()
-    cmd_init(args)
-
-    captured = capsys.readouterr()
-    assert "Keeping existing configuration" in captured.out
-
-
 # ---------------------------------------------------------------------------
 # No enabled accounts found
 # ---------------------------------------------------------------------------
 
 
-def test_init_no_enabled_accounts(monkeypatch, mock_args, capsys, tmp_path):
+def test_init_no_enabled_accounts(monkeypatch, mock_args, capsys, setup_paths):
     """All accounts disabled — prints error."""
-    from mxctl.commands.mail.setup import cmd_init
-
-    config_dir = str(tmp_path / "config")
-    config_file = str(tmp_path / "config" / "config.json")
-    monkeypatch.setattr("mxctl.commands.mail.setup.CONFIG_DIR", config_dir)
-    monkeypatch.setattr("mxctl.commands.mail.setup.CONFIG_FILE", config_file)
+    monkeypatch.setattr(setup_mod, "run", _fake_run(_LINES_DISABLED))
 
-    line = _make_account_line("Disabled", "me@example.com", enabled=False)
-    mock_run = Mock(return_value=line + "\n")
-    monkeypatch.setattr("mxctl.commands.mail.setup.run", mock_run)
-
-    args = mock_args()
-    cmd_init(args)
+    cmd_init(mock_args())
 
     captured = capsys.readouterr()
     assert "No enabled mail accounts found" in captured.out
@@ -495,27 +349,15 @@ def test_init_no_enabled_accounts(monkeypatch, mock_args, capsys, tmp_path):
 # ---------------------------------------------------------------------------
 
 
-def test_init_blank_lines_skipped(monkeypatch, mock_args, capsys, tmp_path):
+def test_init_blank_lines_skipped(monkeypatch, mock_args, capsys, setup_paths):
     """Blank lines in AppleScript output are skipped during parsing."""
-    from mxctl.commands.mail.setup import cmd_init
-
-    config_dir = str(tmp_path / "config")
-    config_file = str(tmp_path / "config" / "config.json")
-    monkeypatch.setattr("mxctl.commands.mail.setup.CONFIG_DIR", config_dir)
-    monkeypatch.setattr("mxctl.commands.mail.setup.CONFIG_FILE", config_file)
-
     # Put blank line BETWEEN two valid accounts so strip() won't remove it
-    acct1 = _make_account_line("iCloud", "me@icloud.com", enabled=True)
-    acct2 = _make_account_line("Gmail", "me@gmail.com", enabled=True)
-    lines = f"{acct1}\n\n{acct2}\n"
-    mock_run = Mock(return_value=lines)
-    monkeypatch.setattr("mxctl.commands.mail.setup.run", mock_run)
+    lines = f"{_ACCT_ICLOUD}\n\n{_ACCT_GMAIL}\n"
+    monkeypatch.setattr(setup_mod, "run", _fake_run(lines))
 
     # Pick account 1, skip gmail, skip todoist
-    inputs = iter(["1", "", ""])
-    monkeypatch.setattr("builtins.input", lambda _: next(inputs))
-    args = mock_args()
-    cmd_init(args)
+    _scripted_input(monkeypatch, ["1", "", ""])
+    cmd_init(mock_args())
 
     captured = capsys.readouterr()
     # Both accounts were parsed (blank line skipped)
@@ -527,113 +369,48 @@ def test_init_blank_lines_skipped(monkeypatch, mock_args, capsys, tmp_path):
 # ---------------------------------------------------------------------------
 
 
-def test_init_multi_account_invalid_then_valid(monkeypatch, mock_args, capsys, tmp_path):
+def test_init_multi_account_invalid_then_valid(monkeypatch, mock_args, capsys, setup_paths):
     """Invalid selection number, then valid — exercises the retry loop."""
-    from mxctl.commands.mail.setup import cmd_init
-
-    config_dir = str(tmp_path / "config")
-    config_file = str(tmp_path / "config" / "config.json")
-    monkeypatch.setattr("mxctl.commands.mail.setup.CONFIG_DIR", config_dir)
-    monkeypatch.setattr("mxctl.commands.mail.setup.CONFIG_FILE", config_file)
-
-    lines = (
-        "\n".join(
-            [
-                _make_account_line("iCloud", "me@icloud.com", enabled=True),
-                _make_account_line("Gmail", "me@gmail.com", enabled=True),
-            ]
-        )
-        + "\n"
-    )
-    mock_run = Mock(return_value=lines)
-    monkeypatch.setattr("mxctl.commands.mail.setup.run", mock_run)
+    _, config_file = setup_paths
+
+    monkeypatch.setattr(setup_mod, "run", _fake_run(_LINES_ICLOUD_GMAIL))
 
     # Invalid "99" first, then valid "1", then skip gmail, skip todoist
-    inputs = iter(["99", "1", "", ""])
-    monkeypatch.setattr("builtins.input", lambda _: next(inputs))
+    _scripted_input(monkeypatch, ["99", "1", "", ""])
 
-    args = mock_args()
-    cmd_init(args)
+    cmd_init(mock_args())
 
     captured = capsys.readouterr()
     assert "Please enter a number between 1 and 2" in captured.out
 
-    with open(config_file) as f:
-        cfg = json.load(f)
+    cfg = _read_cfg(config_file)
     assert cfg["mail"]["default_account"] == "iCloud"
 
 
-def test_init_multi_account_keyboard_interrupt(monkeypatch, mock_args, capsys, tmp_path):
+def test_init_multi_account_keyboard_interrupt(monkeypatch, mock_args, capsys, setup_paths):
     """KeyboardInterrupt during account selection — cancels."""
-    from mxctl.commands.mail.setup import cmd_init
-
-    config_dir = str(tmp_path / "config")
-    config_file = str(tmp_path / "config" / "config.json")
-    monkeypatch.setattr("mxctl.commands.mail.setup.CONFIG_DIR", config_dir)
-    monkeypatch.setattr("mxctl.commands.mail.setup.CONFIG_FILE", config_file)
-
-    lines = (
-        "\n".join(
-            [
-                _make_account_line("iCloud", "me@icloud.com", enabled=True),
-                _make_account_line("Gmail", "me@gmail.com", enabled=True),
-            ]
-        )
-        + "\n"
-    )
-    mock_run = Mock(return_value=lines)
-    monkeypatch.setattr("mxctl.commands.mail.setup.run", mock_run)
-
-    def raise_interrupt(_):
-        raise KeyboardInterrupt
+    monkeypatch.setattr(setup_mod, "run", _fake_run(_LINES_ICLOUD_GMAIL))
 
-    monkeypatch.setattr("builtins.input", raise_interrupt)
+    _scripted_input(monkeypatch, [_raise(KeyboardInterrupt)])
 
-    args = mock_args()
-    cmd_init(args)
+    cmd_init(mock_args())
 
     captured = capsys.readouterr()
     assert "Setup cancelled" in captured.out
 
 
-def test_init_multi_account_eof_defaults_to_1(monkeypatch, mock_args, capsys, tmp_path):
+def test_init_multi_account_eof_defaults_to_1(monkeypatch, mock_args, setup_paths):
     """EOFError during account selection — defaults to account 1."""
-    from mxctl.commands.mail.setup import cmd_init
-
-    config_dir = str(tmp_path / "config")
-    config_file = str(tmp_path / "config" / "config.json")
-    monkeypatch.setattr("mxctl.commands.mail.setup.CONFIG_DIR", config_dir)
-    monkeypatch.setattr("mxctl.commands.mail.setup.CONFIG_FILE", config_file)
-
-    lines = (
-        "\n".join(
-            [
-                _make_account_line("iCloud", "me@icloud.com", enabled=True),
-                _make_account_line("Gmail", "me@gmail.com", enabled=True),
-            ]
-        )
-        + "\n"
-    )
-    mock_run = Mock(return_value=lines)
-    monkeypatch.setattr("mxctl.commands.mail.setup.run", mock_run)
+    _, config_file = setup_paths
 
-    # First input: EOFError -> defaults to "1", then gmail skip, todoist skip
-    call_count = 0
-
-    def eof_then_empty(prompt):
-        nonlocal call_count
-        call_count += 1
-        if call_count == 1:
-            raise EOFError
-        return ""
+    monkeypatch.setattr(setup_mod, "run", _fake_run(_LINES_ICLOUD_GMAIL))
 
-    monkeypatch.setattr("builtins.input", eof_then_empty)
+    # First input: EOFError -> defaults to "1", then gmail skip, todoist skip
+    _scripted_input(monkeypatch, [_raise(EOFError), "", ""])
 
-    args = mock_args()
-    cmd_init(args)
+    cmd_init(mock_args())
 
-    with open(config_file) as f:
-        cfg = json.load(f)
+    cfg = _read_cfg(config_file)
     assert cfg["mail"]["default_account"] == "iCloud"
 
 
@@ -642,61 +419,34 @@ def test_init_multi_account_eof_defaults_to_1(monkeypatch, mock_args, capsys, tm
 # ---------------------------------------------------------------------------
 
 
-def test_init_single_account_gmail_yes(monkeypatch, mock_args, capsys, tmp_path):
+def test_init_single_account_gmail_yes(monkeypatch, mock_args, setup_paths):
     """Single account, user says 'y' to Gmail prompt."""
-    from mxctl.commands.mail.setup import cmd_init
+    _, config_file = setup_paths
 
-    config_dir = str(tmp_path / "config")
-    config_file = str(tmp_path / "config" / "config.json")
-    monkeypatch.setattr("mxctl.commands.mail.setup.CONFIG_DIR", config_dir)
-    monkeypatch.setattr("mxctl.commands.mail.setup.CONFIG_FILE", config_file)
-
-    acct_line = _make_account_line("Gmail", "me@gmail.com", enabled=True)
-    mock_run = Mock(return_value=acct_line + "\n")
-    monkeypatch.setattr("mxctl.commands.mail.setup.run", mock_run)
+    monkeypatch.setattr(setup_mod, "run", _fake_run(_LINES_GMAIL))
 
     # Gmail 'y', then todoist skip
-    inputs = iter(["y", ""])
-    monkeypatch.setattr("builtins.input", lambda _: next(inputs))
+    _scripted_input(monkeypatch, ["y", ""])
 
-    args = mock_args()
-    cmd_init(args)
+    cmd_init(mock_args())
 
-    with open(config_file) as f:
-        cfg = json.load(f)
+    cfg = _read_cfg(config_file)
     assert cfg["mail"]["gmail_accounts"] == ["Gmail"]
 
 
-def test_init_single_account_gmail_interrupt(monkeypatch, mock_args, capsys, tmp_path):
+def test_init_single_account_gmail_interrupt(monkeypatch, mock_args, setup_paths):
     """Single account, KeyboardInterrupt at Gmail prompt — defaults to 'n'."""
-    from mxctl.commands.mail.setup import cmd_init
-
-    config_dir = str(tmp_path / "config")
-    config_file = str(tmp_path / "config" / "config.json")
-    monkeypatch.setattr("mxctl.commands.mail.setup.CONFIG_DIR", config_dir)
-    monkeypatch.setattr("mxctl.commands.mail.setup.CONFIG_FILE", config_file)
-
-    acct_line = _make_account_line("iCloud", "me@icloud.com", enabled=True)
-    mock_run = Mock(return_value=acct_line + "\n")
-    monkeypatch.setattr("mxctl.commands.mail.setup.run", mock_run)
-
-    call_count = 0
+    _, config_file = setup_paths
 
-    def interrupt_then_empty(prompt):
-        nonlocal call_count
-        call_count += 1
-        if call_count == 1:
-            raise KeyboardInterrupt
-        return ""
+    monkeypatch.setattr(setup_mod, "run", _fake_run(_LINES_ICLOUD))
 
-    monkeypatch.setattr("builtins.input", interrupt_then_empty)
+    # KeyboardInterrupt at gmail prompt, then todoist skip
+    _scripted_input(monkeypatch, [_raise(KeyboardInterrupt), ""])
 
-    args = mock_args()
-    cmd_init(args)
+    cmd_init(mock_args())
 
-    with open(config_file) as f:
-        cfg = json.load(f)
-    assert "gmail_accounts" not in cfg.get("mail", {})
+    cfg = _read_cfg(config_file)
+    assert cfg["mail"] == {"default_account": "iCloud"}
 
 
 # ---------------------------------------------------------------------------
@@ -704,79 +454,34 @@ def test_init_single_account_gmail_interrupt(monkeypatch, mock_args, capsys, tmp
 # ---------------------------------------------------------------------------
 
 
-def test_init_multi_account_gmail_selection(monkeypatch, mock_args, capsys, tmp_path):
+def test_init_multi_account_gmail_selection(monkeypatch, mock_args, setup_paths):
     """Multi-account, non-interactive: user enters gmail account numbers."""
-    from mxctl.commands.mail.setup import cmd_init
-
-    config_dir = str(tmp_path / "config")
-    config_file = str(tmp_path / "config" / "config.json")
-    monkeypatch.setattr("mxctl.commands.mail.setup.CONFIG_DIR", config_dir)
-    monkeypatch.setattr("mxctl.commands.mail.setup.CONFIG_FILE", config_file)
-
-    lines = (
-        "\n".join(
-            [
-                _make_account_line("iCloud", "me@icloud.com", enabled=True),
-                _make_account_line("Gmail", "me@gmail.com", enabled=True),
-            ]
-        )
-        + "\n"
-    )
-    mock_run = Mock(return_value=lines)
-    monkeypatch.setattr("mxctl.commands.mail.setup.run", mock_run)
+    _, config_file = setup_paths
+
+    monkeypatch.setattr(setup_mod, "run", _fake_run(_LINES_ICLOUD_GMAIL))
 
     # Pick account 1, mark account 2 as Gmail, skip todoist
-    inputs = iter(["1", "2", ""])
-    monkeypatch.setattr("builtins.input", lambda _: next(inputs))
+    _scripted_input(monkeypatch, ["1", "2", ""])
 
-    args = mock_args()
-    cmd_init(args)
+    cmd_init(mock_args())
 
-    with open(config_file) as f:
-        cfg = json.load(f)
+    cfg = _read_cfg(config_file)
     assert "Gmail" in cfg["mail"]["gmail_accounts"]
 
 
-def test_init_multi_account_gmail_interrupt(monkeypatch, mock_args, capsys, tmp_path):
+def test_init_multi_account_gmail_interrupt(monkeypatch, mock_args, setup_paths):
     """Multi-account, KeyboardInterrupt/EOFError at gmail prompt — defaults to empty."""
-    from mxctl.commands.mail.setup import cmd_init
-
-    config_dir = str(tmp_path / "config")
-    config_file = str(tmp_path / "config" / "config.json")
-    monkeypatch.setattr("mxctl.commands.mail.setup.CONFIG_DIR", config_dir)
-    monkeypatch.setattr("mxctl.commands.mail.setup.CONFIG_FILE", config_file)
-
-    lines = (
-        "\n".join(
-            [
-                _make_account_line("iCloud", "me@icloud.com", enabled=True),
-                _make_account_line("Gmail", "me@gmail.com", enabled=True),
-            ]
-        )
-        + "\n"
-    )
-    mock_run = Mock(return_value=lines)
-    monkeypatch.setattr("mxctl.commands.mail.setup.run", mock_run)
+    _, config_file = setup_paths
 
-    call_count = 0
+    monkeypatch.setattr(setup_mod, "run", _fake_run(_LINES_ICLOUD_GMAIL))
 
-    def inputs(prompt):
-        nonlocal call_count
-        call_count += 1
-        if call_count == 1:
-            return "1"  # account selection
-        if call_count == 2:
-            raise EOFError  # gmail prompt
-        return ""  # todoist skip
+    # Account selection, EOFError at gmail prompt, todoist skip
+    _scripted_input(monkeypatch, ["1", _raise(EOFError), ""])
 
-    monkeypatch.setattr("builtins.input", inputs)
+    cmd_init(mock_args())
 
-    args = mock_args()
-    cmd_init(args)
-
-    with open(config_file) as f:
-        cfg = json.load(f)
-    assert "gmail_accounts" not in cfg.get("mail", {})
+    cfg = _read_cfg(config_file)
+    assert cfg["mail"] == {"default_account": "iCloud"}
 
 
 # ---------------------------------------------------------------------------
@@ -784,28 +489,18 @@ def test_init_multi_account_gmail_interrupt(monkeypatch, mock_args, capsys, tmp_
 # ---------------------------------------------------------------------------
 
 
-def test_init_todoist_valid_token(monkeypatch, mock_args, capsys, tmp_path):
+def test_init_todoist_valid_token(monkeypatch, mock_args, capsys, setup_paths):
     """Valid 40-hex-char Todoist token is saved without warning."""
-    from mxctl.commands.mail.setup import cmd_init
-
-    config_dir = str(tmp_path / "config")
-    config_file = str(tmp_path / "config" / "config.json")
-    monkeypatch.setattr("mxctl.commands.mail.setup.CONFIG_DIR", config_dir)
-    monkeypatch.setattr("mxctl.commands.mail.setup.CONFIG_FILE", config_file)
+    _, config_file = setup_paths
 
-    acct_line = _make_account_line("iCloud", "me@icloud.com", enabled=True)
-    mock_run = Mock(return_value=acct_line + "\n")
-    monkeypatch.setattr("mxctl.commands.mail.setup.run", mock_run)
+    monkeypatch.setattr(setup_mod, "run", _fake_run(_LINES_ICLOUD))
 
     valid_token = "a" * 40
-    inputs = iter(["n", valid_token])
-    monkeypatch.setattr("builtins.input", lambda _: next(inputs))
+    _scripted_input(monkeypatch, ["n", valid_token])
 
-    args = mock_args()
-    cmd_init(args)
+    cmd_init(mock_args())
 
-    with open(config_file) as f:
-        cfg = json.load(f)
+    cfg = _read_cfg(config_file)
     assert cfg["todoist_api_token"] == valid_token
 
     captured = capsys.readouterr()
@@ -813,61 +508,35 @@ def test_init_todoist_valid_token(monkeypatch, mock_args, capsys, tmp_path):
     assert "Warning" not in captured.out
 
 
-def test_init_todoist_invalid_token(monkeypatch, mock_args, capsys, tmp_path):
+def test_init_todoist_invalid_token(monkeypatch, mock_args, capsys, setup_paths):
     """Non-hex token is saved but prints a warning."""
-    from mxctl.commands.mail.setup import cmd_init
+    _, config_file = setup_paths
 
-    config_dir = str(tmp_path / "config")
-    config_file = str(tmp_path / "config" / "config.json")
-    monkeypatch.setattr("mxctl.commands.mail.setup.CONFIG_DIR", config_dir)
-    monkeypatch.setattr("mxctl.commands.mail.setup.CONFIG_FILE", config_file)
-
-    acct_line = _make_account_line("iCloud", "me@icloud.com", enabled=True)
-    mock_run = Mock(return_value=acct_line + "\n")
-    monkeypatch.setattr("mxctl.commands.mail.setup.run", mock_run)
+    monkeypatch.setattr(setup_mod, "run", _fake_run(_LINES_ICLOUD))
 
     invalid_token = "not-a-valid-token"
-    inputs = iter(["n", invalid_token])
-    monkeypatch.setattr("builtins.input", lambda _: next(inputs))
+    _scripted_input(monkeypatch, ["n", invalid_token])
 
-    args = mock_args()
-    cmd_init(args)
+    cmd_init(mock_args())
 
     captured = capsys.readouterr()
     assert "Warning" in captured.out
     assert "expected format" in captured.out
 
-    with open(config_file) as f:
-        cfg = json.load(f)
+    cfg = _read_cfg(config_file)
     assert cfg["todoist_api_token"] == invalid_token
 
 
-def test_init_todoist_keyboard_interrupt(monkeypatch, mock_args, capsys, tmp_path):
+def test_init_todoist_keyboard_interrupt(monkeypatch, mock_args, capsys, setup_paths):
     """KeyboardInterrupt at Todoist prompt — cancels setup entirely."""
-    from mxctl.commands.mail.setup import cmd_init
-
-    config_dir = str(tmp_path / "config")
-    config_file = str(tmp_path / "config" / "config.json")
-    monkeypatch.setattr("mxctl.commands.mail.setup.CONFIG_DIR", config_dir)
-    monkeypatch.setattr("mxctl.commands.mail.setup.CONFIG_FILE", config_file)
+    _, config_file = setup_paths
 
-    acct_line = _make_account_line("iCloud", "me@icloud.com", enabled=True)
-    mock_run = Mock(return_value=acct_line + "\n")
-    monkeypatch.setattr("mxctl.commands.mail.setup.run", mock_run)
+    monkeypatch.setattr(setup_mod, "run", _fake_run(_LINES_ICLOUD))
 
-    call_count = 0
+    # "n" at gmail prompt, KeyboardInterrupt at todoist prompt
+    _scripted_input(monkeypatch, ["n", _raise(KeyboardInterrupt)])
 
-    def inputs(prompt):
-        nonlocal call_count
-        call_count += 1
-        if call_count == 1:
-            return "n"  # gmail prompt
-        raise KeyboardInterrupt  # todoist prompt
-
-    monkeypatch.setattr("builtins.input", inputs)
-
-    args = mock_args()
-    cmd_init(args)
+    cmd_init(mock_args())
 
     captured = capsys.readouterr()
     assert "Setup cancelled" in captured.out
@@ -875,36 +544,19 @@ def test_init_todoist_keyboard_interrupt(monkeypatch, mock_args, capsys, tmp_pat
     assert not os.path.isfile(config_file)
 
 
-def test_init_todoist_eof(monkeypatch, mock_args, capsys, tmp_path):
+def test_init_todoist_eof(monkeypatch, mock_args, setup_paths):
     """EOFError at Todoist prompt — skips token, saves config."""
-    from mxctl.commands.mail.setup import cmd_init
-
-    config_dir = str(tmp_path / "config")
-    config_file = str(tmp_path / "config" / "config.json")
-    monkeypatch.setattr("mxctl.commands.mail.setup.CONFIG_DIR", config_dir)
-    monkeypatch.setattr("mxctl.commands.mail.setup.CONFIG_FILE", config_file)
+    _, config_file = setup_paths
 
-    acct_line = _make_account_line("iCloud", "me@icloud.com", enabled=True)
-    mock_run = Mock(return_value=acct_line + "\n")
-    monkeypatch.setattr("mxctl.commands.mail.setup.run", mock_run)
+    monkeypatch.setattr(setup_mod, "run", _fake_run(_LINES_ICLOUD))
 
-    call_count = 0
+    # "n" at gmail prompt, EOFError at todoist prompt
+    _scripted_input(monkeypatch, ["n", _raise(EOFError)])
 
-    def inputs(prompt):
-        nonlocal call_count
-        call_count += 1
-        if call_count == 1:
-            return "n"  # gmail prompt
-        raise EOFError  # todoist prompt
+    cmd_init(mock_args())
 
-    monkeypatch.setattr("builtins.input", inputs)
-
-    args = mock_args()
-    cmd_init(args)
-
-    with open(config_file) as f:
-        cfg = json.load(f)
-    assert "todoist_api_token" not in cfg
+    cfg = _read_cfg(config_file)
+    assert cfg == {"mail": {"default_account": "iCloud"}}
 
 
 # ---------------------------------------------------------------------------
@@ -912,25 +564,14 @@ def test_init_todoist_eof(monkeypatch, mock_args, capsys, tmp_path):
 # ---------------------------------------------------------------------------
 
 
-def test_init_json_todoist_redacted(monkeypatch, mock_args, capsys, tmp_path):
+def test_init_json_todoist_redacted(monkeypatch, mock_args, capsys, setup_paths):
     """--json output redacts the Todoist token."""
-    from mxctl.commands.mail.setup import cmd_init
-
-    config_dir = str(tmp_path / "config")
-    config_file = str(tmp_path / "config" / "config.json")
-    monkeypatch.setattr("mxctl.commands.mail.setup.CONFIG_DIR", config_dir)
-    monkeypatch.setattr("mxctl.commands.mail.setup.CONFIG_FILE", config_file)
-
-    acct_line = _make_account_line("iCloud", "me@icloud.com", enabled=True)
-    mock_run = Mock(return_value=acct_line + "\n")
-    monkeypatch.setattr("mxctl.commands.mail.setup.run", mock_run)
+    monkeypatch.setattr(setup_mod, "run", _fake_run(_LINES_ICLOUD))
 
     valid_token = "a" * 40
-    inputs = iter(["n", valid_token])
-    monkeypatch.setattr("builtins.input", lambda _: next(inputs))
+    _scripted_input(monkeypatch, ["n", valid_token])
 
-    args = mock_args(json=True)
-    cmd_init(args)
+    cmd_init(mock_args(json=True))
 
     captured = capsys.readouterr()
     # JSON output should have redacted token, not the real one
@@ -943,34 +584,14 @@ def test_init_json_todoist_redacted(monkeypatch, mock_args, capsys, tmp_path):
 # ---------------------------------------------------------------------------
 
 
-def test_init_summary_gmail_plural(monkeypatch, mock_args, capsys, tmp_path):
+def test_init_summary_gmail_plural(monkeypatch, mock_args, capsys, setup_paths):
     """Gmail count in summary pluralizes correctly."""
-    from mxctl.commands.mail.setup import cmd_init
-
-    config_dir = str(tmp_path / "config")
-    config_file = str(tmp_path / "config" / "config.json")
-    monkeypatch.setattr("mxctl.commands.mail.setup.CONFIG_DIR", config_dir)
-    monkeypatch.setattr("mxctl.commands.mail.setup.CONFIG_FILE", config_file)
-
-    lines = (
-        "\n".join(
-            [
-                _make_account_line("iCloud", "me@icloud.com", enabled=True),
-                _make_account_line("Gmail1", "a@gmail.com", enabled=True),
-                _make_account_line("Gmail2", "b@gmail.com", enabled=True),
-            ]
-        )
-        + "\n"
-    )
-    mock_run = Mock(return_value=lines)
-    monkeypatch.setattr("mxctl.commands.mail.setup.run", mock_run)
+    monkeypatch.setattr(setup_mod, "run", _fake_run(_LINES_ICLOUD_TWO_GMAIL))
 
     # Pick account 1, mark both 2 and 3 as Gmail, skip todoist
-    inputs = iter(["1", "2,3", ""])
-    monkeypatch.setattr("builtins.input", lambda _: next(inputs))
+    _scripted_input(monkeypatch, ["1", "2,3", ""])
 
-    args = mock_args()
-    cmd_init(args)
+    cmd_init(mock_args())
 
     captured = capsys.readouterr()
     assert "Gmail: 2 accounts" in captured.out
@@ -985,109 +606,57 @@ def test_init_summary_gmail_plural(monkeypatch, mock_args, capsys, tmp_path):
 # ---------------------------------------------------------------------------
 
 
-def test_init_interactive_multi_account_radio(monkeypatch, mock_args, capsys, tmp_path):
+def test_init_interactive_multi_account_radio(monkeypatch, mock_args, setup_paths):
     """Interactive mode: _radio_select picks account, _checkbox_select picks Gmail."""
-    from mxctl.commands.mail.setup import cmd_init
-
-    config_dir = str(tmp_path / "config")
-    config_file = str(tmp_path / "config" / "config.json")
-    monkeypatch.setattr("mxctl.commands.mail.setup.CONFIG_DIR", config_dir)
-    monkeypatch.setattr("mxctl.commands.mail.setup.CONFIG_FILE", config_file)
-
-    lines = (
-        "\n".join(
-            [
-                _make_account_line("iCloud", "me@icloud.com", enabled=True),
-                _make_account_line("Gmail", "me@gmail.com", enabled=True),
-            ]
-        )
-        + "\n"
+    _, config_file = setup_paths
+
+    _patch(
+        monkeypatch,
+        setup_mod,
+        run=_fake_run(_LINES_ICLOUD_GMAIL),
+        _is_interactive=lambda: True,
+        _radio_select=lambda prompt, opts: 0,
+        _checkbox_select=lambda prompt, opts: [1],
     )
-    mock_run = Mock(return_value=lines)
-    monkeypatch.setattr("mxctl.commands.mail.setup.run", mock_run)
-
-    monkeypatch.setattr("mxctl.commands.mail.setup._is_interactive", lambda: True)
-    monkeypatch.setattr("mxctl.commands.mail.setup._radio_select", lambda prompt, opts: 0)
-    monkeypatch.setattr("mxctl.commands.mail.setup._checkbox_select", lambda prompt, opts: [1])
 
     # Todoist prompt
-    monkeypatch.setattr("builtins.input", lambda _: "")
+    monkeypatch.setattr(builtins, "input", lambda _: "")
 
-    args = mock_args()
-    cmd_init(args)
+    cmd_init(mock_args())
 
-    with open(config_file) as f:
-        cfg = json.load(f)
+    cfg = _read_cfg(config_file)
     assert cfg["mail"]["default_account"] == "iCloud"
     assert "Gmail" in cfg["mail"]["gmail_accounts"]
 
 
-def test_init_interactive_radio_keyboard_interrupt(monkeypatch, mock_args, capsys, tmp_path):
+def test_init_interactive_radio_keyboard_interrupt(monkeypatch, mock_args, capsys, setup_paths):
     """Interactive mode: KeyboardInterrupt in _radio_select cancels."""
-    from mxctl.commands.mail.setup import cmd_init
-
-    config_dir = str(tmp_path / "config")
-    config_file = str(tmp_path / "config" / "config.json")
-    monkeypatch.setattr("mxctl.commands.mail.setup.CONFIG_DIR", config_dir)
-    monkeypatch.setattr("mxctl.commands.mail.setup.CONFIG_FILE", config_file)
-
-    lines = (
-        "\n".join(
-            [
-                _make_account_line("iCloud", "me@icloud.com", enabled=True),
-                _make_account_line("Gmail", "me@gmail.com", enabled=True),
-            ]
-        )
-        + "\n"
+    _patch(
+        monkeypatch,
+        setup_mod,
+        run=_fake_run(_LINES_ICLOUD_GMAIL),
+        _is_interactive=lambda: True,
+        _radio_select=_raise(KeyboardInterrupt),
     )
-    mock_run = Mock(return_value=lines)
-    monkeypatch.setattr("mxctl.commands.mail.setup.run", mock_run)
-
-    monkeypatch.setattr("mxctl.commands.mail.setup._is_interactive", lambda: True)
 
-    def raise_interrupt(prompt, opts):
-        raise KeyboardInterrupt
-
-    monkeypatch.setattr("mxctl.commands.mail.setup._radio_select", raise_interrupt)
-
-    args = mock_args()
-    cmd_init(args)
+    cmd_init(mock_args())
 
     captured = capsys.readouterr()
     assert "Setup cancelled" in captured.out
 
 
-def test_init_interactive_checkbox_keyboard_interrupt(monkeypatch, mock_args, capsys, tmp_path):
+def test_init_interactive_checkbox_keyboard_interrupt(monkeypatch, mock_args, capsys, setup_paths):
     """Interactive mode: KeyboardInterrupt in _checkbox_select cancels."""
-    from mxctl.commands.mail.setup import cmd_init
-
-    config_dir = str(tmp_path / "config")
-    config_file = str(tmp_path / "config" / "config.json")
-    monkeypatch.setattr("mxctl.commands.mail.setup.CONFIG_DIR", config_dir)
-    monkeypatch.setattr("mxctl.commands.mail.setup.CONFIG_FILE", config_file)
-
-    lines = (
-        "\n".join(
-            [
-                _make_account_line("iCloud", "me@icloud.com", enabled=True),
-                _make_account_line("Gmail", "me@gmail.com", enabled=True),
-            ]
-        )
-        + "\n"
+    _patch(
+        monkeypatch,
+        setup_mod,
+        run=_fake_run(_LINES_ICLOUD_GMAIL),
+        _is_interactive=lambda: True,
+        _radio_select=lambda prompt, opts: 0,
+        _checkbox_select=_raise(KeyboardInterrupt),
     )
-    mock_run = Mock(return_value=lines)
-    monkeypatch.setattr("mxctl.commands.mail.setup.run", mock_run)
-
-    monkeypatch.setattr("mxctl.commands.mail.setup._is_interactive", lambda: True)
-    monkeypatch.setattr("mxctl.commands.mail.setup._radio_select", lambda prompt, opts: 0)
 
-    def raise_interrupt(prompt, opts):
-        raise KeyboardInterrupt
-
-    monkeypatch.setattr("mxctl.commands.mail.setup._checkbox_select", raise_interrupt)
-
-    args = mock_args()
-    cmd_init(args)
+    cmd_init(mock_args())
 
     captured = capsys.readouterr()
     assert "Setup cancelled" in captured.out
@@ -1098,87 +667,72 @@ def test_init_interactive_checkbox_keyboard_interrupt(monkeypatch, mock_args, ca
 # ---------------------------------------------------------------------------
 
 
-def _mock_stdin(monkeypatch):
-    """Mock sys.stdin.fileno() to return 0 (needed in pytest where stdin is a pseudofile)."""
-    mock_stdin = Mock()
-    mock_stdin.fileno.return_value = 0
-    monkeypatch.setattr("sys.stdin", mock_stdin)
-
+class _StdinStub:
+    """Minimal sys.stdin stand-in exposing only fileno()."""
 
-def test_radio_select_enter(monkeypatch):
-    """_radio_select: pressing Enter on first option returns 0."""
-    from mxctl.commands.mail.setup import _radio_select
-
-    _mock_stdin(monkeypatch)
-    monkeypatch.setattr("mxctl.commands.mail.setup.termios.tcgetattr", lambda fd: [])
-    monkeypatch.setattr("mxctl.commands.mail.setup.termios.tcsetattr", lambda fd, when, attrs: None)
-    monkeypatch.setattr("mxctl.commands.mail.setup.tty.setraw", lambda fd: None)
-    monkeypatch.setattr("mxctl.commands.mail.setup.os.read", lambda fd, n: b"\r")
+    @staticmethod
+    def fileno():
+        return 0
 
-    result = _radio_select("Pick one:", ["Alpha", "Beta"])
-    assert result == 0
 
+_STDIN_STUB = _StdinStub()
 
-def test_radio_select_arrow_down_then_enter(monkeypatch):
-    """_radio_select: arrow down then Enter selects second option."""
-    from mxctl.commands.mail.setup import _radio_select
 
-    _mock_stdin(monkeypatch)
-    monkeypatch.setattr("mxctl.commands.mail.setup.termios.tcgetattr", lambda fd: [])
-    monkeypatch.setattr("mxctl.commands.mail.setup.termios.tcsetattr", lambda fd, when, attrs: None)
-    monkeypatch.setattr("mxctl.commands.mail.setup.tty.setraw", lambda fd: None)
+def _mock_stdin(monkeypatch):
+    """Mock sys.stdin.fileno() to return 0 (needed in pytest where stdin is a pseudofile)."""
+    monkeypatch.setattr(sys, "stdin", _STDIN_STUB)
 
-    reads = iter([b"\x1b", b"[B", b"\r"])
-    monkeypatch.setattr("mxctl.commands.mail.setup.os.read", lambda fd, n: next(reads))
 
-    result = _radio_select("Pick one:", ["Alpha", "Beta"])
-    assert result == 1
+# Stand-ins for the termios/tty modules as setup.py references them, so the
+# real (process-wide) modules are never touched.
+_FAKE_TERMIOS = SimpleNamespace(
+    TCSADRAIN=termios.TCSADRAIN,
+    tcgetattr=lambda fd: [],
+    tcsetattr=lambda fd, when, attrs: None,
+)
+_FAKE_TTY = SimpleNamespace(setraw=lambda fd: None)
 
 
-def test_radio_select_arrow_up_wraps(monkeypatch):
-    """_radio_select: arrow up from 0 wraps to last option."""
-    from mxctl.commands.mail.setup import _radio_select
+@pytest.fixture
+def raw_tty(monkeypatch):
+    """Stub the stdin fd and termios/tty calls so the raw-mode selectors run headless.
 
+    Tests still patch os.read with the key bytes they want to feed.
+    """
     _mock_stdin(monkeypatch)
-    monkeypatch.setattr("mxctl.commands.mail.setup.termios.tcgetattr", lambda fd: [])
-    monkeypatch.setattr("mxctl.commands.mail.setup.termios.tcsetattr", lambda fd, when, attrs: None)
-    monkeypatch.setattr("mxctl.commands.mail.setup.tty.setraw", lambda fd: None)
+    _patch(monkeypatch, setup_mod, termios=_FAKE_TERMIOS, tty=_FAKE_TTY)
 
-    reads = iter([b"\x1b", b"[A", b" "])
-    monkeypatch.setattr("mxctl.commands.mail.setup.os.read", lambda fd, n: next(reads))
 
-    result = _radio_select("Pick:", ["A", "B", "C"])
-    assert result == 2  # wrapped from 0 to last (2)
+def _feed_keys(monkeypatch, keys):
+    """Make os.read return each chunk in *keys* in turn."""
+    next_key = iter(keys).__next__
+    monkeypatch.setattr(setup_mod.os, "read", lambda fd, n: next_key())
 
 
-def test_radio_select_space_selects(monkeypatch):
-    """_radio_select: space selects current option."""
-    from mxctl.commands.mail.setup import _radio_select
+@pytest.mark.usefixtures("raw_tty")
+class TestRadioSelect:
+    """_radio_select in raw terminal mode."""
 
-    _mock_stdin(monkeypatch)
-    monkeypatch.setattr("mxctl.commands.mail.setup.termios.tcgetattr", lambda fd: [])
-    monkeypatch.setattr("mxctl.commands.mail.setup.termios.tcsetattr", lambda fd, when, attrs: None)
-    monkeypatch.setattr("mxctl.commands.mail.setup.tty.setraw", lambda fd: None)
-    monkeypatch.setattr("mxctl.commands.mail.setup.os.read", lambda fd, n: b" ")
-
-    result = _radio_select("Pick:", ["Only"])
-    assert result == 0
-
-
-def test_radio_select_ctrl_c_raises(monkeypatch):
-    """_radio_select: Ctrl+C raises KeyboardInterrupt."""
-    import pytest
-
-    from mxctl.commands.mail.setup import _radio_select
+    @pytest.mark.parametrize(
+        ("options", "keys", "expected"),
+        [
+            pytest.param(["Alpha", "Beta"], (b"\r",), 0, id="enter"),
+            pytest.param(["Alpha", "Beta"], (b"\x1b", b"[B", b"\r"), 1, id="arrow-down-then-enter"),
+            pytest.param(["A", "B", "C"], (b"\x1b", b"[A", b" "), 2, id="arrow-up-wraps"),
+            pytest.param(["Only"], (b" ",), 0, id="space-selects"),
+        ],
+    )
+    def test_radio_select(self, monkeypatch, options, keys, expected):
+        """_radio_select: key sequence lands on the expected index."""
+        _feed_keys(monkeypatch, keys)
+        assert _radio_select("Pick:", options) == expected
 
-    _mock_stdin(monkeypatch)
-    monkeypatch.setattr("mxctl.commands.mail.setup.termios.tcgetattr", lambda fd: [])
-    monkeypatch.setattr("mxctl.commands.mail.setup.termios.tcsetattr", lambda fd, when, attrs: None)
-    monkeypatch.setattr("mxctl.commands.mail.setup.tty.setraw", lambda fd: None)
-    monkeypatch.setattr("mxctl.commands.mail.setup.os.read", lambda fd, n: b"\x03")
+    def test_radio_select_ctrl_c_raises(self, monkeypatch):
+        """_radio_select: Ctrl+C raises KeyboardInterrupt."""
+        _feed_keys(monkeypatch, (b"\x03",))
 
-    with pytest.raises(KeyboardInterrupt):
-        _radio_select("Pick:", ["A", "B"])
+        with pytest.raises(KeyboardInterrupt):
+            _radio_select("Pick:", ["A", "B"])
 
 
 # ---------------------------------------------------------------------------
@@ -1186,115 +740,33 @@ def test_radio_select_ctrl_c_raises(monkeypatch):
 # ---------------------------------------------------------------------------
 
 
-def test_checkbox_select_enter_none(monkeypatch):
-    """_checkbox_select: Enter with no toggles returns empty list."""
-    from mxctl.commands.mail.setup import _checkbox_select
-
-    _mock_stdin(monkeypatch)
-    monkeypatch.setattr("mxctl.commands.mail.setup.termios.tcgetattr", lambda fd: [])
-    monkeypatch.setattr("mxctl.commands.mail.setup.termios.tcsetattr", lambda fd, when, attrs: None)
-    monkeypatch.setattr("mxctl.commands.mail.setup.tty.setraw", lambda fd: None)
-    monkeypatch.setattr("mxctl.commands.mail.setup.os.read", lambda fd, n: b"\r")
-
-    result = _checkbox_select("Select:", ["A", "B"])
-    assert result == []
-
-
-def test_checkbox_select_toggle_and_enter(monkeypatch):
-    """_checkbox_select: space toggles first item, then Enter."""
-    from mxctl.commands.mail.setup import _checkbox_select
-
-    _mock_stdin(monkeypatch)
-    monkeypatch.setattr("mxctl.commands.mail.setup.termios.tcgetattr", lambda fd: [])
-    monkeypatch.setattr("mxctl.commands.mail.setup.termios.tcsetattr", lambda fd, when, attrs: None)
-    monkeypatch.setattr("mxctl.commands.mail.setup.tty.setraw", lambda fd: None)
-
-    reads = iter([b" ", b"\r"])
-    monkeypatch.setattr("mxctl.commands.mail.setup.os.read", lambda fd, n: next(reads))
-
-    result = _checkbox_select("Select:", ["A", "B"])
-    assert result == [0]
-
-
-def test_checkbox_select_toggle_on_off(monkeypatch):
-    """_checkbox_select: toggle on then off deselects."""
-    from mxctl.commands.mail.setup import _checkbox_select
-
-    _mock_stdin(monkeypatch)
-    monkeypatch.setattr("mxctl.commands.mail.setup.termios.tcgetattr", lambda fd: [])
-    monkeypatch.setattr("mxctl.commands.mail.setup.termios.tcsetattr", lambda fd, when, attrs: None)
-    monkeypatch.setattr("mxctl.commands.mail.setup.tty.setraw", lambda fd: None)
-
-    reads = iter([b" ", b" ", b"\r"])
-    monkeypatch.setattr("mxctl.commands.mail.setup.os.read", lambda fd, n: next(reads))
-
-    result = _checkbox_select("Select:", ["A", "B"])
-    assert result == []
-
-
-def test_checkbox_select_arrow_down_and_toggle(monkeypatch):
-    """_checkbox_select: arrow down to second item, toggle, enter."""
-    from mxctl.commands.mail.setup import _checkbox_select
-
-    _mock_stdin(monkeypatch)
-    monkeypatch.setattr("mxctl.commands.mail.setup.termios.tcgetattr", lambda fd: [])
-    monkeypatch.setattr("mxctl.commands.mail.setup.termios.tcsetattr", lambda fd, when, attrs: None)
-    monkeypatch.setattr("mxctl.commands.mail.setup.tty.setraw", lambda fd: None)
-
-    reads = iter([b"\x1b", b"[B", b" ", b"\n"])
-    monkeypatch.setattr("mxctl.commands.mail.setup.os.read", lambda fd, n: next(reads))
-
-    result = _checkbox_select("Select:", ["A", "B", "C"])
-    assert result == [1]
-
-
-def test_checkbox_select_arrow_up_wraps(monkeypatch):
-    """_checkbox_select: arrow up from 0 wraps to last."""
-    from mxctl.commands.mail.setup import _checkbox_select
-
-    _mock_stdin(monkeypatch)
-    monkeypatch.setattr("mxctl.commands.mail.setup.termios.tcgetattr", lambda fd: [])
-    monkeypatch.setattr("mxctl.commands.mail.setup.termios.tcsetattr", lambda fd, when, attrs: None)
-    monkeypatch.setattr("mxctl.commands.mail.setup.tty.setraw", lambda fd: None)
-
-    reads = iter([b"\x1b", b"[A", b" ", b"\r"])
-    monkeypatch.setattr("mxctl.commands.mail.setup.os.read", lambda fd, n: next(reads))
-
-    result = _checkbox_select("Select:", ["A", "B", "C"])
-    assert result == [2]
-
-
-def test_checkbox_select_ctrl_c_raises(monkeypatch):
-    """_checkbox_select: Ctrl+C raises KeyboardInterrupt."""
-    import pytest
-
-    from mxctl.commands.mail.setup import _checkbox_select
-
-    _mock_stdin(monkeypatch)
-    monkeypatch.setattr("mxctl.commands.mail.setup.termios.tcgetattr", lambda fd: [])
-    monkeypatch.setattr("mxctl.commands.mail.setup.termios.tcsetattr", lambda fd, when, attrs: None)
-    monkeypatch.setattr("mxctl.commands.mail.setup.tty.setraw", lambda fd: None)
-    monkeypatch.setattr("mxctl.commands.mail.setup.os.read", lambda fd, n: b"\x03")
-
-    with pytest.raises(KeyboardInterrupt):
-        _checkbox_select("Select:", ["A", "B"])
-
-
-def test_checkbox_select_multiple_selected(monkeypatch):
-    """_checkbox_select: toggle first and third, returns sorted."""
-    from mxctl.commands.mail.setup import _checkbox_select
-
-    _mock_stdin(monkeypatch)
-    monkeypatch.setattr("mxctl.commands.mail.setup.termios.tcgetattr", lambda fd: [])
-    monkeypatch.setattr("mxctl.commands.mail.setup.termios.tcsetattr", lambda fd, when, attrs: None)
-    monkeypatch.setattr("mxctl.commands.mail.setup.tty.setraw", lambda fd: None)
+@pytest.mark.usefixtures("raw_tty")
+class TestCheckboxSelect:
+    """_checkbox_select in raw terminal mode."""
+
+    @pytest.mark.parametrize(
+        ("options", "keys", "expected"),
+        [
+            pytest.param(["A", "B"], (b"\r",), [], id="enter-none"),
+            pytest.param(["A", "B"], (b" ", b"\r"), [0], id="toggle-and-enter"),
+            pytest.param(["A", "B"], (b" ", b" ", b"\r"), [], id="toggle-on-off"),
+            pytest.param(["A", "B", "C"], (b"\x1b", b"[B", b" ", b"\n"), [1], id="arrow-down-and-toggle"),
+            pytest.param(["A", "B", "C"], (b"\x1b", b"[A", b" ", b"\r"), [2], id="arrow-up-wraps"),
+            # Toggle A, down, down, toggle C, enter — result is sorted
+            pytest.param(["A", "B", "C"], (b" ", b"\x1b", b"[B", b"\x1b", b"[B", b" ", b"\r"), [0, 2], id="multiple-selected"),
+        ],
+    )
+    def test_checkbox_select(self, monkeypatch, options, keys, expected):
+        """_checkbox_select: key sequence yields the expected sorted selection."""
+        _feed_keys(monkeypatch, keys)
+        assert _checkbox_select("Select:", options) == expected
 
-    # Toggle A (space), down, down, toggle C (space), enter
-    reads = iter([b" ", b"\x1b", b"[B", b"\x1b", b"[B", b" ", b"\r"])
-    monkeypatch.setattr("mxctl.commands.mail.setup.os.read", lambda fd, n: next(reads))
+    def test_checkbox_select_ctrl_c_raises(self, monkeypatch):
+        """_checkbox_select: Ctrl+C raises KeyboardInterrupt."""
+        _feed_keys(monkeypatch, (b"\x03",))
 
-    result = _checkbox_select("Select:", ["A", "B", "C"])
-    assert result == [0, 2]
+        with pytest.raises(KeyboardInterrupt):
+            _checkbox_select("Select:", ["A", "B"])
 
 
 # ---------------------------------------------------------------------------
@@ -1304,10 +776,6 @@ def test_checkbox_select_multiple_selected(monkeypatch):
 
 def test_register(monkeypatch):
     """register() adds 'init' subcommand."""
-    import argparse
-
-    from mxctl.commands.mail.setup import register
-
     parser = argparse.ArgumentParser()
     subs = parser.add_subparsers(dest="command")
     register(subs)
@@ -1329,25 +797,21 @@ def _patch_ai_targets(monkeypatch, tmp_path):
         "Cursor": (str(tmp_path / ".cursorrules"), "project"),
         "Windsurf": (str(tmp_path / ".windsurfrules"), "project"),
     }
-    monkeypatch.setattr("mxctl.commands.mail.setup._AI_TOOL_TARGETS", targets)
+    monkeypatch.setattr(setup_mod, "_AI_TOOL_TARGETS", targets)
     return targets
 
 
 def test_ai_setup_claude_code_new_file(monkeypatch, mock_args, capsys, tmp_path):
     """Claude Code selected; CLAUDE.md doesn't exist — creates and writes snippet."""
-    from mxctl.commands.mail.setup import _SNIPPET_MARKER, cmd_ai_setup
-
     targets = _patch_ai_targets(monkeypatch, tmp_path)
     target = targets["Claude Code"][0]
 
-    inputs = iter(["1", "y"])  # select Claude Code, confirm write
-    monkeypatch.setattr("builtins.input", lambda _: next(inputs))
+    _scripted_input(monkeypatch, ["1", "y"])  # select Claude Code, confirm write
 
     cmd_ai_setup(mock_args())
 
     assert os.path.isfile(target)
-    with open(target) as f:
-        content = f.read()
+    content = Path(target).read_text()
     assert _SNIPPET_MARKER in content
     assert "mxctl inbox" in content
 
@@ -1355,45 +819,35 @@ def test_ai_setup_claude_code_new_file(monkeypatch, mock_args, capsys, tmp_path)
     assert "Done" in captured.out
 
 
-def test_ai_setup_claude_code_appends_to_existing(monkeypatch, mock_args, capsys, tmp_path):
+def test_ai_setup_claude_code_appends_to_existing(monkeypatch, mock_args, tmp_path):
     """CLAUDE.md exists but has no mxctl section — snippet is appended."""
-    from mxctl.commands.mail.setup import _SNIPPET_MARKER, cmd_ai_setup
-
     targets = _patch_ai_targets(monkeypatch, tmp_path)
     target = targets["Claude Code"][0]
 
     # Pre-create the file with unrelated content
-    with open(target, "w") as f:
-        f.write("# My Notes\n\nSome existing content.\n")
+    Path(target).write_text("# My Notes\n\nSome existing content.\n")
 
-    inputs = iter(["1", "y"])
-    monkeypatch.setattr("builtins.input", lambda _: next(inputs))
+    _scripted_input(monkeypatch, ["1", "y"])
 
     cmd_ai_setup(mock_args())
 
-    with open(target) as f:
-        content = f.read()
+    content = Path(target).read_text()
     assert "# My Notes" in content  # original preserved
     assert _SNIPPET_MARKER in content  # snippet appended
 
 
 def test_ai_setup_already_configured(monkeypatch, mock_args, capsys, tmp_path):
     """File already contains the mxctl snippet — skips without re-appending."""
-    from mxctl.commands.mail.setup import _MXCTL_AI_SNIPPET, _SNIPPET_MARKER, cmd_ai_setup
-
     targets = _patch_ai_targets(monkeypatch, tmp_path)
     target = targets["Claude Code"][0]
 
-    with open(target, "w") as f:
-        f.write(_MXCTL_AI_SNIPPET)
+    Path(target).write_text(_MXCTL_AI_SNIPPET)
 
-    inputs = iter(["1"])  # select Claude Code — no confirm prompt should appear
-    monkeypatch.setattr("builtins.input", lambda _: next(inputs))
+    _scripted_input(monkeypatch, ["1"])  # select Claude Code — no confirm prompt should appear
 
     cmd_ai_setup(mock_args())
 
-    with open(target) as f:
-        content = f.read()
+    content = Path(target).read_text()
     # Snippet should appear exactly once
     assert content.count(_SNIPPET_MARKER) == 1
 
@@ -1403,13 +857,10 @@ def test_ai_setup_already_configured(monkeypatch, mock_args, capsys, tmp_path):
 
 def test_ai_setup_user_declines(monkeypatch, mock_args, capsys, tmp_path):
     """User selects a tool but answers 'n' at the confirm prompt — no file written."""
-    from mxctl.commands.mail.setup import cmd_ai_setup
-
     targets = _patch_ai_targets(monkeypatch, tmp_path)
     target = targets["Claude Code"][0]
 
-    inputs = iter(["1", "n"])  # select Claude Code, decline
-    monkeypatch.setattr("builtins.input", lambda _: next(inputs))
+    _scripted_input(monkeypatch, ["1", "n"])  # select Claude Code, decline
 
     cmd_ai_setup(mock_args())
 
@@ -1420,12 +871,9 @@ def test_ai_setup_user_declines(monkeypatch, mock_args, capsys, tmp_path):
 
 def test_ai_setup_other_prints_snippet(monkeypatch, mock_args, capsys, tmp_path):
     """'Other (copy-paste)' selection prints the snippet and writes no file."""
-    from mxctl.commands.mail.setup import _SNIPPET_MARKER, cmd_ai_setup
-
     _patch_ai_targets(monkeypatch, tmp_path)
 
-    inputs = iter(["4"])  # select "Other (copy-paste)"
-    monkeypatch.setattr("builtins.input", lambda _: next(inputs))
+    _scripted_input(monkeypatch, ["4"])  # select "Other (copy-paste)"
 
     cmd_ai_setup(mock_args())
 
@@ -1437,12 +885,9 @@ def test_ai_setup_other_prints_snippet(monkeypatch, mock_args, capsys, tmp_path)
 
 def test_ai_setup_skip(monkeypatch, mock_args, capsys, tmp_path):
     """'Skip' selection exits cleanly with no file written."""
-    from mxctl.commands.mail.setup import cmd_ai_setup
-
     _patch_ai_targets(monkeypatch, tmp_path)
 
-    inputs = iter(["5"])  # select "Skip"
-    monkeypatch.setattr("builtins.input", lambda _: next(inputs))
+    _scripted_input(monkeypatch, ["5"])  # select "Skip"
 
     cmd_ai_setup(mock_args())
 
@@ -1451,55 +896,44 @@ def test_ai_setup_skip(monkeypatch, mock_args, capsys, tmp_path):
     assert not any(tmp_path.iterdir())
 
 
-def test_ai_setup_cursor(monkeypatch, mock_args, capsys, tmp_path):
+def test_ai_setup_cursor(monkeypatch, mock_args, tmp_path):
     """Cursor selection writes .cursorrules into the target path."""
-    from mxctl.commands.mail.setup import _SNIPPET_MARKER, cmd_ai_setup
-
     targets = _patch_ai_targets(monkeypatch, tmp_path)
     target = targets["Cursor"][0]
 
-    inputs = iter(["2", "y"])  # select Cursor, confirm
-    monkeypatch.setattr("builtins.input", lambda _: next(inputs))
+    _scripted_input(monkeypatch, ["2", "y"])  # select Cursor, confirm
 
     cmd_ai_setup(mock_args())
 
     assert os.path.isfile(target)
-    with open(target) as f:
-        assert _SNIPPET_MARKER in f.read()
+    assert _SNIPPET_MARKER in Path(target).read_text()
 
 
 def test_ai_setup_json_output(monkeypatch, mock_args, capsys, tmp_path):
     """--json flag emits a JSON result after writing."""
-    from mxctl.commands.mail.setup import cmd_ai_setup
-
     targets = _patch_ai_targets(monkeypatch, tmp_path)
     target = targets["Claude Code"][0]
 
-    inputs = iter(["1", "y"])
-    monkeypatch.setattr("builtins.input", lambda _: next(inputs))
+    _scripted_input(monkeypatch, ["1", "y"])
 
     cmd_ai_setup(mock_args(json=True))
 
     captured = capsys.readouterr()
-    import json as _json
-
     # format_output may pretty-print JSON across multiple lines; collect the full blob
     out = captured.out
     start = out.find("{")
     end = out.rfind("}") + 1
     assert start != -1, "Expected JSON object in output"
-    data = _json.loads(out[start:end])
+    data = json.loads(out[start:end])
     assert data["status"] == "written"
     assert data["file"] == target
 
 
 def test_ai_setup_keyboard_interrupt_at_selection(monkeypatch, mock_args, capsys, tmp_path):
     """KeyboardInterrupt during tool selection exits cleanly."""
-    from mxctl.commands.mail.setup import cmd_ai_setup
-
     _patch_ai_targets(monkeypatch, tmp_path)
 
-    monkeypatch.setattr("builtins.input", lambda _: (_ for _ in ()).throw(KeyboardInterrupt()))
+    _scripted_input(monkeypatch, [_raise(KeyboardInterrupt)])
 
     cmd_ai_setup(mock_args())  # should not raise
 
@@ -1509,8 +943,6 @@ def test_ai_setup_keyboard_interrupt_at_selection(monkeypatch, mock_args, capsys
 
 def test_ai_setup_print_flag(mock_args, capsys):
     """--print dumps the raw snippet to stdout with no wizard or prompts."""
-    from mxctl.commands.mail.setup import _SNIPPET_MARKER, cmd_ai_setup
-
     cmd_ai_setup(mock_args(print_snippet=True))
 
     captured = capsys.readouterr()
@@ -1522,46 +954,34 @@ def test_ai_setup_print_flag(mock_args, capsys):
 
 def test_ai_setup_print_no_leading_newline(mock_args, capsys):
     """--print output starts with the heading, not a blank line (clean for piping)."""
-    from mxctl.commands.mail.setup import cmd_ai_setup
-
     cmd_ai_setup(mock_args(print_snippet=True))
 
     captured = capsys.readouterr()
     assert captured.out.startswith("## mxctl")
 
 
-def test_ai_setup_interactive_radio_select(monkeypatch, mock_args, capsys, tmp_path):
+def test_ai_setup_interactive_radio_select(monkeypatch, mock_args, tmp_path):
     """Interactive mode: _radio_select picks Claude Code, file is written."""
-    from mxctl.commands.mail.setup import _SNIPPET_MARKER, cmd_ai_setup
-
     targets = _patch_ai_targets(monkeypatch, tmp_path)
     target = targets["Claude Code"][0]
 
-    monkeypatch.setattr("mxctl.commands.mail.setup._is_interactive", lambda: True)
-    monkeypatch.setattr("mxctl.commands.mail.setup._radio_select", lambda prompt, opts: 0)  # Claude Code
+    # _radio_select index 0 is Claude Code
+    _patch(monkeypatch, setup_mod, _is_interactive=lambda: True, _radio_select=lambda prompt, opts: 0)
 
     # Confirm write
-    monkeypatch.setattr("builtins.input", lambda _: "y")
+    monkeypatch.setattr(builtins, "input", lambda _: "y")
 
     cmd_ai_setup(mock_args())
 
     assert os.path.isfile(target)
-    with open(target) as f:
-        assert _SNIPPET_MARKER in f.read()
+    assert _SNIPPET_MARKER in Path(target).read_text()
 
 
 def test_ai_setup_interactive_keyboard_interrupt(monkeypatch, mock_args, capsys, tmp_path):
     """Interactive mode: KeyboardInterrupt in _radio_select cancels cleanly."""
-    from mxctl.commands.mail.setup import cmd_ai_setup
-
     _patch_ai_targets(monkeypatch, tmp_path)
 
-    monkeypatch.setattr("mxctl.commands.mail.setup._is_interactive", lambda: True)
-
-    def raise_interrupt(prompt, opts):
-        raise KeyboardInterrupt
-
-    monkeypatch.setattr("mxctl.commands.mail.setup._radio_select", raise_interrupt)
+    _patch(monkeypatch, setup_mod, _is_interactive=lambda: True, _radio_select=_raise(KeyboardInterrupt))
 
     cmd_ai_setup(mock_args())
 
@@ -1571,13 +991,10 @@ def test_ai_setup_interactive_keyboard_interrupt(monkeypatch, mock_args, capsys,
 
 def test_ai_setup_invalid_then_valid_input(monkeypatch, mock_args, capsys, tmp_path):
     """Invalid selection number triggers retry, then valid input proceeds."""
-    from mxctl.commands.mail.setup import cmd_ai_setup
-
     _patch_ai_targets(monkeypatch, tmp_path)
 
     # "99" is invalid, then "5" selects Skip
-    inputs = iter(["99", "5"])
-    monkeypatch.setattr("builtins.input", lambda _: next(inputs))
+    _scripted_input(monkeypatch, ["99", "5"])
 
     cmd_ai_setup(mock_args())
 
@@ -1588,16 +1005,12 @@ def test_ai_setup_invalid_then_valid_input(monkeypatch, mock_args, capsys, tmp_p
 
 def test_ai_setup_already_configured_json(monkeypatch, mock_args, capsys, tmp_path):
     """Already-configured path with --json emits JSON status."""
-    from mxctl.commands.mail.setup import _MXCTL_AI_SNIPPET, cmd_ai_setup
-
     targets = _patch_ai_targets(monkeypatch, tmp_path)
     target = targets["Claude Code"][0]
 
-    with open(target, "w") as f:
-        f.write(_MXCTL_AI_SNIPPET)
+    Path(target).write_text(_MXCTL_AI_SNIPPET)
 
-    inputs = iter(["1"])
-    monkeypatch.setattr("builtins.input", lambda _: next(inputs))
+    _scripted_input(monkeypatch, ["1"])
 
     cmd_ai_setup(mock_args(json=True))
 
@@ -1607,21 +1020,11 @@ def test_ai_setup_already_configured_json(monkeypatch, mock_args, capsys, tmp_pa
 
 def test_ai_setup_confirm_interrupt(monkeypatch, mock_args, capsys, tmp_path):
     """KeyboardInterrupt at the confirm prompt cancels without writing."""
-    from mxctl.commands.mail.setup import cmd_ai_setup
-
     targets = _patch_ai_targets(monkeypatch, tmp_path)
     target = targets["Claude Code"][0]
 
-    call_count = 0
-
-    def input_then_interrupt(prompt):
-        nonlocal call_count
-        call_count += 1
-        if call_count == 1:
-            return "1"  # select Claude Code
-        raise KeyboardInterrupt
-
-    monkeypatch.setattr("builtins.input", input_then_interrupt)
+    # Select Claude Code, then KeyboardInterrupt at the confirm prompt
+    _scripted_input(monkeypatch, ["1", _raise(KeyboardInterrupt)])
 
     cmd_ai_setup(mock_args())
 
@@ -1632,10 +1035,6 @@ def test_ai_setup_confirm_interrupt(monkeypatch, mock_args, capsys, tmp_path):
 
 def test_register_includes_ai_setup():
     """register() adds both 'init' and 'ai-setup' subcommands."""
-    import argparse
-
-    from mxctl.commands.mail.setup import register
-
     parser = argparse.ArgumentParser()
     subs = parser.add_subparsers(dest="command")
     register(subs)
@@ -1647,10 +1046,6 @@ def test_register_includes_ai_setup():
 
 def test_register_ai_setup_print_flag():
     """register() wires --print flag as print_snippet dest."""
-    import argparse
-
-    from mxctl.commands.mail.setup import register
-
     parser = argparse.ArgumentParser()
     subs = parser.add_subparsers(dest="command")
     register(subs)
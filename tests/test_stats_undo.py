@@ -6,10 +6,32 @@ from unittest.mock import patch
 
 import pytest
 
+import mxctl.commands.mail.undo as undo_module
 from mxctl.commands.mail.analytics import cmd_stats
+from mxctl.commands.mail.batch import cmd_batch_delete
 from mxctl.config import FIELD_SEPARATOR
 
 
+@pytest.fixture
+def mock_undo_run():
+    """Patch undo.run(); defaults to reporting one message restored."""
+    with patch("mxctl.commands.mail.undo.run", return_value="1") as mocked:
+        yield mocked
+
+
+@pytest.fixture(autouse=True)
+def undo_log(tmp_path, monkeypatch):
+    """Point the undo module at a per-test log file."""
+    path = tmp_path / "mail-undo.jsonl"
+    monkeypatch.setattr(undo_module, "UNDO_LOG_FILE", str(path))
+    return path
+
+
+def _write_log(path, entries):
+    """Seed an undo log file with JSONL entries, encoded exactly as undo.py writes them."""
+    path.write_text("".join(map(undo_module._encode_entry, entries)))
+
+
 class TestEnhancedStats:
     """Test enhanced stats with --all flag."""
 
@@ -81,13 +103,8 @@ class TestEnhancedStats:
 class TestUndoLogging:
     """Test undo operation logging."""
 
-    def test_log_batch_operation_creates_entry(self, tmp_path, monkeypatch):
+    def test_log_batch_operation_creates_entry(self):
         """Test that logging a batch operation creates a proper entry."""
-        import mxctl.commands.mail.undo as undo_module
-
-        test_log = tmp_path / "mail-undo.json"
-        monkeypatch.setattr(undo_module, "UNDO_LOG_FILE", str(test_log))
-
         undo_module.log_batch_operation(
             operation_type="batch-move",
             account="iCloud",
@@ -106,15 +123,29 @@ class TestUndoLogging:
         assert operations[0]["dest_mailbox"] == "Archive"
         assert operations[0]["sender"] == "test@example.com"
 
-    def test_undo_log_keeps_only_last_10_operations(self, tmp_path, monkeypatch):
+    def test_undo_log_keeps_only_last_10_operations(self, undo_log):
         """Test that undo log is trimmed to MAX_UNDO_OPERATIONS."""
-        import mxctl.commands.mail.undo as undo_module
+        # Seed a full log in one write, then push one more entry past the cap
+        now = datetime.now().isoformat()
+        _write_log(
+            undo_log,
+            [{"timestamp": now, "operation": "batch-delete", "account": "iCloud", "message_ids": [i]} for i in range(10)],
+        )
+        undo_module.log_batch_operation(
+            operation_type="batch-delete",
+            account="iCloud",
+            message_ids=[99],
+            source_mailbox="Trash",
+        )
 
-        test_log = tmp_path / "mail-undo.json"
-        monkeypatch.setattr(undo_module, "UNDO_LOG_FILE", str(test_log))
+        operations = undo_module._load_undo_log()
+        assert len(operations) == 10  # Should keep only last 10
+        assert operations[0]["message_ids"] == [1]
+        assert operations[-1]["message_ids"] == [99]
 
-        # Add 15 operations
-        for i in range(15):
+    def test_undo_log_compacts_after_twice_the_cap(self, undo_log):
+        """Appends rewrite the file down to MAX_UNDO_OPERATIONS once it reaches 2x the cap."""
+        for i in range(25):
             undo_module.log_batch_operation(
                 operation_type="batch-delete",
                 account="iCloud",
@@ -122,16 +153,62 @@ class TestUndoLogging:
                 source_mailbox="Trash",
             )
 
+        # 20 appends, compaction to 10 on the 21st, then 4 more appends
+        assert len(undo_log.read_text().splitlines()) == 14
         operations = undo_module._load_undo_log()
-        assert len(operations) == 10  # Should keep only last 10
+        assert [op["message_ids"] for op in operations] == [[i] for i in range(15, 25)]
 
-    def test_undo_list_shows_recent_operations(self, tmp_path, monkeypatch, mock_args, capsys):
-        """Test that undo --list shows recent operations."""
-        import mxctl.commands.mail.undo as undo_module
+    def test_logged_entries_are_written_immediately(self, undo_log):
+        """Each logged entry reaches the file before the logging call returns."""
+        undo_module.log_batch_operation(operation_type="batch-delete", account="iCloud", message_ids=[1])
+        assert len(undo_log.read_text().splitlines()) == 1
+
+        undo_module.log_fence_operation("batch-read")
+        lines = undo_log.read_text().splitlines()
+        assert [json.loads(line)["operation"] for line in lines] == ["batch-delete", "batch-read"]
+
+    def test_append_after_torn_last_line_keeps_new_entry(self, undo_log):
+        """A last line left unterminated by a crash does not swallow the next record."""
+        undo_log.write_text('{"timestamp":"2026-01-01T00:00:00","operation":"batch-mo')
+        undo_module.log_batch_operation(operation_type="batch-delete", account="iCloud", message_ids=[7])
+
+        operations = undo_module._load_undo_log()
+        assert [op["message_ids"] for op in operations] == [[7]]
+
+    def test_new_log_file_is_owner_only(self, undo_log):
+        """The undo log is created with 0600 permissions."""
+        undo_module.log_fence_operation("batch-flag")
+
+        assert undo_log.stat().st_mode & 0o777 == 0o600
+
+    def test_appended_log_is_served_from_memory(self):
+        """Appends refresh the bounded cache, so the next load does not reread the file."""
+        for i in range(12):
+            undo_module.log_batch_operation(operation_type="batch-delete", account="iCloud", message_ids=[i])
+
+        with patch.object(undo_module, "_read_undo_file") as mock_read:
+            operations = undo_module._load_undo_log()
+        mock_read.assert_not_called()
+        assert [op["message_ids"] for op in operations] == [[i] for i in range(2, 12)]
 
-        test_log = tmp_path / "mail-undo.json"
-        monkeypatch.setattr(undo_module, "UNDO_LOG_FILE", str(test_log))
+    def test_undone_entry_is_not_written_back(self, undo_log, mock_undo_run):
+        """An entry logged after the cache is warm and then undone stays out of the file."""
+        assert undo_module.list_undo_history() == []
+        undo_module.log_batch_operation(operation_type="batch-move", account="iCloud", message_ids=[1], dest_mailbox="Archive")
+        undo_module.undo_last()
 
+        assert undo_log.read_text() == ""
+
+    def test_cached_log_rereads_after_external_write(self, undo_log):
+        """A change to the file's mtime/size (e.g. another process) invalidates the cache."""
+        assert undo_module._load_undo_log() == []
+        _write_log(undo_log, [{"timestamp": datetime.now().isoformat(), "operation": "batch-move", "account": "iCloud"}])
+
+        operations = undo_module._load_undo_log()
+        assert [op["operation"] for op in operations] == ["batch-move"]
+
+    def test_undo_list_shows_recent_operations(self, mock_args, capsys):
+        """Test that undo --list shows recent operations."""
         undo_module.log_batch_operation(
             operation_type="batch-move",
             account="iCloud",
@@ -148,13 +225,8 @@ class TestUndoLogging:
         assert "batch-move" in captured.out
         assert "│ 2" in captured.out
 
-    def test_undo_list_empty_when_no_operations(self, tmp_path, monkeypatch, mock_args, capsys):
+    def test_undo_list_empty_when_no_operations(self, mock_args, capsys):
         """Test that undo --list shows appropriate message when empty."""
-        import mxctl.commands.mail.undo as undo_module
-
-        test_log = tmp_path / "mail-undo-empty.json"
-        monkeypatch.setattr(undo_module, "UNDO_LOG_FILE", str(test_log))
-
         args = mock_args(json=False)
         undo_module.cmd_undo_list(args)
 
@@ -179,8 +251,6 @@ class TestBatchDelete:
             limit=None,
             json=False,
         )
-        from mxctl.commands.mail.batch import cmd_batch_delete
-
         cmd_batch_delete(args)
 
         captured = capsys.readouterr()
@@ -193,7 +263,7 @@ class TestBatchDelete:
     @patch("mxctl.commands.mail.batch.run")
     def test_batch_delete_from_sender_scans_all_mailboxes(self, mock_run, mock_args, capsys):
         """Test --from-sender without -m uses all-mailboxes script."""
-        mock_run.side_effect = ["3", "3\n101\n102\n103"]  # count, then delete
+        mock_run.return_value = "3\n101\n102\n103"  # --force skips the count pass
         args = mock_args(
             account="iCloud",
             mailbox=None,
@@ -204,21 +274,21 @@ class TestBatchDelete:
             limit=None,
             json=False,
         )
-        from mxctl.commands.mail.batch import cmd_batch_delete
-
         cmd_batch_delete(args)
 
         captured = capsys.readouterr()
         assert "Deleted 3" in captured.out
+        # --force deletes in a single run() call, with no separate count script
+        assert mock_run.call_count == 1
         # Delete script should iterate all mailboxes (no single mailbox "of account")
-        delete_script = mock_run.call_args_list[1][0][0]
+        delete_script = mock_run.call_args[0][0]
         assert "mailboxes of account" in delete_script
         assert 'mailbox "' not in delete_script
 
     @patch("mxctl.commands.mail.batch.run")
     def test_batch_delete_from_sender_with_mailbox(self, mock_run, mock_args, capsys):
         """Test --from-sender -m scopes to a single mailbox."""
-        mock_run.side_effect = ["2", "2\n201\n202"]
+        mock_run.return_value = "2\n201\n202"
         args = mock_args(
             account="iCloud",
             mailbox="Junk",
@@ -229,19 +299,18 @@ class TestBatchDelete:
             limit=None,
             json=False,
         )
-        from mxctl.commands.mail.batch import cmd_batch_delete
-
         cmd_batch_delete(args)
 
         captured = capsys.readouterr()
         assert "Deleted 2" in captured.out
-        delete_script = mock_run.call_args_list[1][0][0]
+        assert mock_run.call_count == 1
+        delete_script = mock_run.call_args[0][0]
         assert 'mailbox "Junk"' in delete_script
 
     @patch("mxctl.commands.mail.batch.run")
     def test_batch_delete_combined_filters(self, mock_run, mock_args, capsys):
         """Test --from-sender + --older-than builds combined where clause."""
-        mock_run.side_effect = ["1", "1\n301"]
+        mock_run.return_value = "1\n301"
         args = mock_args(
             account="iCloud",
             mailbox="INBOX",
@@ -252,18 +321,14 @@ class TestBatchDelete:
             limit=None,
             json=False,
         )
-        from mxctl.commands.mail.batch import cmd_batch_delete
-
         cmd_batch_delete(args)
 
-        count_script = mock_run.call_args_list[0][0][0]
-        assert "sender contains" in count_script
-        assert "date received <" in count_script
+        delete_script = mock_run.call_args[0][0]
+        assert "sender contains" in delete_script
+        assert "date received <" in delete_script
 
     def test_batch_delete_no_filters_raises(self, mock_args):
         """Test that providing neither --from-sender nor --older-than exits."""
-        from mxctl.commands.mail.batch import cmd_batch_delete
-
         args = mock_args(
             account="iCloud",
             mailbox="INBOX",
@@ -279,8 +344,6 @@ class TestBatchDelete:
 
     def test_batch_delete_older_than_without_mailbox_raises(self, mock_args):
         """Test that --older-than alone without -m exits for safety."""
-        from mxctl.commands.mail.batch import cmd_batch_delete
-
         args = mock_args(
             account="iCloud",
             mailbox=None,
@@ -298,13 +361,8 @@ class TestBatchDelete:
 class TestCmdUndo:
     """Smoke tests for cmd_undo execution."""
 
-    def test_undo_batch_move_calls_run_with_move_script(self, tmp_path, monkeypatch, mock_args, capsys):
+    def test_undo_batch_move_calls_run_with_move_script(self, mock_args, capsys, mock_undo_run):
         """Test that cmd_undo for batch-move calls run() with a script that moves messages back."""
-        import mxctl.commands.mail.undo as undo_module
-
-        test_log = tmp_path / "mail-undo.json"
-        monkeypatch.setattr(undo_module, "UNDO_LOG_FILE", str(test_log))
-
         # Seed one batch-move operation
         undo_module.log_batch_operation(
             operation_type="batch-move",
@@ -314,15 +372,13 @@ class TestCmdUndo:
             sender="sender@example.com",
         )
 
-        mock_run = patch("mxctl.commands.mail.undo.run")
-        with mock_run as mocked:
-            mocked.return_value = "2"
-            args = mock_args(json=False)
-            undo_module.cmd_undo(args)
+        mock_undo_run.return_value = "2"
+        args = mock_args(json=False)
+        undo_module.cmd_undo(args)
 
         # Verify run() was called and the script moves messages back to INBOX
-        assert mocked.call_count == 1
-        script_called = mocked.call_args[0][0]
+        assert mock_undo_run.call_count == 1
+        script_called = mock_undo_run.call_args[0][0]
         assert "move" in script_called.lower()
         assert "Archive" in script_called or "archive" in script_called.lower()
         assert "INBOX" in script_called
@@ -331,13 +387,8 @@ class TestCmdUndo:
         assert "Undid batch-move" in captured.out
         assert "2/2" in captured.out
 
-    def test_undo_batch_delete_restores_from_trash(self, tmp_path, monkeypatch, mock_args, capsys):
+    def test_undo_batch_delete_restores_from_trash(self, mock_args, capsys, mock_undo_run):
         """Test that cmd_undo for batch-delete moves messages from Trash back to source."""
-        import mxctl.commands.mail.undo as undo_module
-
-        test_log = tmp_path / "mail-undo.json"
-        monkeypatch.setattr(undo_module, "UNDO_LOG_FILE", str(test_log))
-
         # Seed one batch-delete operation
         undo_module.log_batch_operation(
             operation_type="batch-delete",
@@ -347,15 +398,13 @@ class TestCmdUndo:
             sender="deleted@example.com",
         )
 
-        mock_run = patch("mxctl.commands.mail.undo.run")
-        with mock_run as mocked:
-            mocked.return_value = "3"
-            args = mock_args(json=False)
-            undo_module.cmd_undo(args)
+        mock_undo_run.return_value = "3"
+        args = mock_args(json=False)
+        undo_module.cmd_undo(args)
 
         # Verify run() was called with a script referencing Trash
-        assert mocked.call_count == 1
-        script_called = mocked.call_args[0][0]
+        assert mock_undo_run.call_count == 1
+        script_called = mock_undo_run.call_args[0][0]
         assert "Trash" in script_called
         assert "move" in script_called.lower()
 
@@ -367,93 +416,72 @@ class TestCmdUndo:
 class TestUndoStaleness:
     """Tests for the 30-minute freshness window and --force flag."""
 
-    def test_undo_rejects_stale_entry_without_force(self, tmp_path, monkeypatch, mock_args):
+    def test_undo_rejects_stale_entry_without_force(self, undo_log, mock_args):
         """Stale entry (>30 min old) should cause die() without --force."""
-        import mxctl.commands.mail.undo as undo_module
-
-        test_log = tmp_path / "mail-undo.json"
-        monkeypatch.setattr(undo_module, "UNDO_LOG_FILE", str(test_log))
-
         # Write a stale entry directly (60 minutes ago)
         stale_ts = (datetime.now() - timedelta(minutes=60)).isoformat()
-        test_log.write_text(
-            json.dumps(
-                [
-                    {
-                        "timestamp": stale_ts,
-                        "operation": "batch-delete",
-                        "account": "iCloud",
-                        "message_ids": [999],
-                        "source_mailbox": "INBOX",
-                        "dest_mailbox": None,
-                        "sender": None,
-                        "older_than_days": None,
-                    }
-                ]
-            )
+        _write_log(
+            undo_log,
+            [
+                {
+                    "timestamp": stale_ts,
+                    "operation": "batch-delete",
+                    "account": "iCloud",
+                    "message_ids": [999],
+                    "source_mailbox": "INBOX",
+                    "dest_mailbox": None,
+                    "sender": None,
+                    "older_than_days": None,
+                }
+            ],
         )
 
         args = mock_args(json=False, force=False)
         with pytest.raises(SystemExit):
             undo_module.cmd_undo(args)
 
-    def test_undo_force_bypasses_staleness(self, tmp_path, monkeypatch, mock_args, capsys):
+    def test_undo_force_bypasses_staleness(self, undo_log, mock_args, capsys, mock_undo_run):
         """--force should run the undo even if the entry is older than 30 minutes."""
-        import mxctl.commands.mail.undo as undo_module
-
-        test_log = tmp_path / "mail-undo.json"
-        monkeypatch.setattr(undo_module, "UNDO_LOG_FILE", str(test_log))
-
         stale_ts = (datetime.now() - timedelta(minutes=60)).isoformat()
-        test_log.write_text(
-            json.dumps(
-                [
-                    {
-                        "timestamp": stale_ts,
-                        "operation": "batch-delete",
-                        "account": "iCloud",
-                        "message_ids": [999],
-                        "source_mailbox": "INBOX",
-                        "dest_mailbox": None,
-                        "sender": None,
-                        "older_than_days": None,
-                    }
-                ]
-            )
+        _write_log(
+            undo_log,
+            [
+                {
+                    "timestamp": stale_ts,
+                    "operation": "batch-delete",
+                    "account": "iCloud",
+                    "message_ids": [999],
+                    "source_mailbox": "INBOX",
+                    "dest_mailbox": None,
+                    "sender": None,
+                    "older_than_days": None,
+                }
+            ],
         )
 
-        mock_run = patch("mxctl.commands.mail.undo.run")
-        with mock_run as mocked:
-            mocked.return_value = "1"
-            args = mock_args(json=False, force=True)
-            undo_module.cmd_undo(args)
+        args = mock_args(json=False, force=True)
+        undo_module.cmd_undo(args)
 
         captured = capsys.readouterr()
         assert "Undid batch-delete" in captured.out
 
-    def test_undo_stale_message_mentions_age_and_force(self, tmp_path, monkeypatch, mock_args, capsys):
+    def test_undo_stale_message_mentions_age_and_force(self, undo_log, mock_args, capsys):
         """Stale-entry error message should mention minutes and --force."""
-        import mxctl.commands.mail.undo as undo_module
-
-        test_log = tmp_path / "mail-undo.json"
-        monkeypatch.setattr(undo_module, "UNDO_LOG_FILE", str(test_log))
-
         stale_ts = (datetime.now() - timedelta(minutes=45)).isoformat()
-        test_log.write_text(
-            json.dumps(
-                [
-                    {
-                        "timestamp": stale_ts,
-                        "operation": "batch-move",
-                        "account": "iCloud",
-                        "message_ids": [888],
-                        "source_mailbox": None,
-                        "dest_mailbox": "Archive",
-                        "sender": "old@example.com",
-                        "older_than_days": None,
-                    }
-                ]
-            )
+        _write_log(
+            undo_log,
+            [
+                {
+                    "timestamp": stale_ts,
+                    "operation": "batch-move",
+                    "account": "iCloud",
+                    "message_ids": [888],
+                    "source_mailbox": None,
+                    "dest_mailbox": "Archive",
+                    "sender": "old@example.com",
+                    "older_than_days": None,
+                }
+            ],
         )
 
         args = mock_args(json=False, force=False)
@@ -464,13 +492,8 @@ class TestUndoStaleness:
         assert "minutes ago" in captured.err
         assert "--force" in captured.err
 
-    def test_undo_fresh_entry_executes_normally(self, tmp_path, monkeypatch, mock_args, capsys):
+    def test_undo_fresh_entry_executes_normally(self, mock_args, capsys, mock_undo_run):
         """Fresh entry (<30 min old) should execute without --force."""
-        import mxctl.commands.mail.undo as undo_module
-
-        test_log = tmp_path / "mail-undo.json"
-        monkeypatch.setattr(undo_module, "UNDO_LOG_FILE", str(test_log))
-
         # Log a fresh operation
         undo_module.log_batch_operation(
             operation_type="batch-move",
@@ -480,11 +503,8 @@ class TestUndoStaleness:
             sender="test@example.com",
         )
 
-        mock_run = patch("mxctl.commands.mail.undo.run")
-        with mock_run as mocked:
-            mocked.return_value = "1"
-            args = mock_args(json=False, force=False)
-            undo_module.cmd_undo(args)
+        args = mock_args(json=False, force=False)
+        undo_module.cmd_undo(args)
 
         captured = capsys.readouterr()
         assert "Undid batch-move" in captured.out
@@ -495,22 +515,16 @@ class TestEntryAgeFreshness:
 
     def test_entry_age_minutes_no_timestamp(self):
         """_entry_age_minutes returns None when timestamp is missing (line 26)."""
-        import mxctl.commands.mail.undo as undo_module
-
         result = undo_module._entry_age_minutes({})
         assert result is None
 
     def test_entry_age_minutes_invalid_timestamp(self):
         """_entry_age_minutes returns None for garbage timestamp (lines 30-31)."""
-        import mxctl.commands.mail.undo as undo_module
-
         result = undo_module._entry_age_minutes({"timestamp": "not-a-date"})
         assert result is None
 
     def test_entry_age_minutes_valid_timestamp(self):
         """_entry_age_minutes returns positive float for a recent timestamp."""
-        import mxctl.commands.mail.undo as undo_module
-
         ts = datetime.now().isoformat()
         result = undo_module._entry_age_minutes({"timestamp": ts})
         assert result is not None
@@ -518,23 +532,17 @@ class TestEntryAgeFreshness:
 
     def test_is_fresh_no_timestamp_returns_false(self):
         """_is_fresh returns False when age is None (line 38)."""
-        import mxctl.commands.mail.undo as undo_module
-
         result = undo_module._is_fresh({})
         assert result is False
 
     def test_is_fresh_stale_entry_returns_false(self):
         """_is_fresh returns False for entry older than UNDO_MAX_AGE_MINUTES."""
-        import mxctl.commands.mail.undo as undo_module
-
         stale_ts = (datetime.now() - timedelta(minutes=60)).isoformat()
         result = undo_module._is_fresh({"timestamp": stale_ts})
         assert result is False
 
     def test_is_fresh_fresh_entry_returns_true(self):
         """_is_fresh returns True for entry younger than UNDO_MAX_AGE_MINUTES."""
-        import mxctl.commands.mail.undo as undo_module
-
         fresh_ts = datetime.now().isoformat()
         result = undo_module._is_fresh({"timestamp": fresh_ts})
         assert result is True
@@ -543,36 +551,27 @@ class TestEntryAgeFreshness:
 class TestLoadUndoLogEdgeCases:
     """Tests for _load_undo_log edge cases."""
 
-    def test_load_undo_log_invalid_json(self, tmp_path, monkeypatch):
+    def test_load_undo_log_invalid_json(self, undo_log):
         """_load_undo_log returns [] for corrupted JSON (lines 53-54)."""
-        import mxctl.commands.mail.undo as undo_module
-
-        test_log = tmp_path / "mail-undo.json"
-        test_log.write_text("{invalid json content!!")
-        monkeypatch.setattr(undo_module, "UNDO_LOG_FILE", str(test_log))
+        undo_log.write_text("{invalid json content!!")
 
         result = undo_module._load_undo_log()
         assert result == []
 
-    def test_load_undo_log_include_stale(self, tmp_path, monkeypatch):
+    def test_load_undo_log_include_stale(self, undo_log):
         """_load_undo_log(include_stale=True) returns stale entries too."""
-        import mxctl.commands.mail.undo as undo_module
-
-        test_log = tmp_path / "mail-undo.json"
         stale_ts = (datetime.now() - timedelta(minutes=60)).isoformat()
-        test_log.write_text(
-            json.dumps(
-                [
-                    {
-                        "timestamp": stale_ts,
-                        "operation": "batch-move",
-                        "account": "iCloud",
-                        "message_ids": [1],
-                    }
-                ]
-            )
+        _write_log(
+            undo_log,
+            [
+                {
+                    "timestamp": stale_ts,
+                    "operation": "batch-move",
+                    "account": "iCloud",
+                    "message_ids": [1],
+                }
+            ],
         )
-        monkeypatch.setattr(undo_module, "UNDO_LOG_FILE", str(test_log))
 
         # Without include_stale: empty (stale entry filtered)
         result_fresh = undo_module._load_undo_log(include_stale=False)
@@ -586,13 +585,8 @@ class TestLoadUndoLogEdgeCases:
 class TestLogFenceOperation:
     """Tests for log_fence_operation (lines 99-105)."""
 
-    def test_fence_operation_creates_fence_entry(self, tmp_path, monkeypatch):
+    def test_fence_operation_creates_fence_entry(self):
         """log_fence_operation creates a fence sentinel entry."""
-        import mxctl.commands.mail.undo as undo_module
-
-        test_log = tmp_path / "mail-undo.json"
-        monkeypatch.setattr(undo_module, "UNDO_LOG_FILE", str(test_log))
-
         undo_module.log_fence_operation("batch-read")
 
         operations = undo_module._load_undo_log(include_stale=True)
@@ -605,13 +599,8 @@ class TestLogFenceOperation:
 class TestUndoListFences:
     """Tests for cmd_undo_list with fence entries and mixed entries."""
 
-    def test_undo_list_shows_fence_as_no_undo(self, tmp_path, monkeypatch, mock_args, capsys):
+    def test_undo_list_shows_fence_as_no_undo(self, mock_args, capsys):
         """cmd_undo_list marks fence entries as [no undo] (lines 127, 131)."""
-        import mxctl.commands.mail.undo as undo_module
-
-        test_log = tmp_path / "mail-undo.json"
-        monkeypatch.setattr(undo_module, "UNDO_LOG_FILE", str(test_log))
-
         # Create a normal operation first
         undo_module.log_batch_operation(
             operation_type="batch-move",
@@ -631,13 +620,8 @@ class TestUndoListFences:
         assert "batch-read" in captured.out
         assert "batch-move" in captured.out
 
-    def test_undo_list_shows_older_than_days(self, tmp_path, monkeypatch, mock_args, capsys):
+    def test_undo_list_shows_older_than_days(self, mock_args, capsys):
         """cmd_undo_list shows older_than_days when present (line 131)."""
-        import mxctl.commands.mail.undo as undo_module
-
-        test_log = tmp_path / "mail-undo.json"
-        monkeypatch.setattr(undo_module, "UNDO_LOG_FILE", str(test_log))
-
         undo_module.log_batch_operation(
             operation_type="batch-delete",
             account="iCloud",
@@ -657,41 +641,50 @@ class TestUndoListFences:
 class TestCmdUndoEdgeCases:
     """Tests for cmd_undo edge cases — fences, empty logs, unknown ops."""
 
-    def test_undo_empty_log_dies(self, tmp_path, monkeypatch, mock_args):
-        """cmd_undo with empty log dies with message (line 147)."""
-        import mxctl.commands.mail.undo as undo_module
-
-        test_log = tmp_path / "mail-undo-empty.json"
-        monkeypatch.setattr(undo_module, "UNDO_LOG_FILE", str(test_log))
+    @pytest.mark.parametrize(
+        ("entries", "force", "expected"),
+        [
+            pytest.param([{"type": "fence", "operation": "batch-flag"}], False, "(batch-flag) cannot be undone", id="fence-without-force"),
+            pytest.param([{"type": "fence", "operation": "batch-flag"}], True, "No undoable operations remain", id="fence-only-with-force"),
+            pytest.param(
+                [{"operation": "batch-move", "account": "iCloud", "message_ids": [], "dest_mailbox": "Archive"}],
+                False,
+                "No message IDs recorded",
+                id="no-message-ids",
+            ),
+            pytest.param(
+                [{"operation": "batch-unknown", "account": "iCloud", "message_ids": [1, 2]}],
+                False,
+                "Unknown operation type 'batch-unknown'",
+                id="unknown-operation",
+            ),
+            pytest.param(
+                [{"operation": "batch-move", "account": "iCloud", "message_ids": [1], "dest_mailbox": None}],
+                False,
+                "Incomplete operation data",
+                id="batch-move-no-dest",
+            ),
+        ],
+    )
+    def test_undo_dies(self, undo_log, mock_args, capsys, entries, force, expected):
+        """cmd_undo exits with a specific error for logs it cannot act on."""
+        now = datetime.now().isoformat()
+        _write_log(undo_log, [{"timestamp": now, **entry} for entry in entries])
 
-        args = mock_args(json=False, force=False)
         with pytest.raises(SystemExit):
-            undo_module.cmd_undo(args)
-
-    def test_undo_fence_without_force_dies(self, tmp_path, monkeypatch, mock_args, capsys):
-        """cmd_undo on fence entry without --force dies with message (lines 170-176)."""
-        import mxctl.commands.mail.undo as undo_module
+            undo_module.cmd_undo(mock_args(json=False, force=force))
 
-        test_log = tmp_path / "mail-undo.json"
-        monkeypatch.setattr(undo_module, "UNDO_LOG_FILE", str(test_log))
-
-        undo_module.log_fence_operation("batch-flag")
+        assert expected in capsys.readouterr().err
 
-        args = mock_args(json=False, force=False)
+    def test_undo_dies_with_empty_log(self, mock_args, capsys):
+        """cmd_undo exits when no batch operation has been logged."""
         with pytest.raises(SystemExit):
-            undo_module.cmd_undo(args)
+            undo_module.cmd_undo(mock_args(json=False, force=False))
 
-        captured = capsys.readouterr()
-        assert "batch-flag" in captured.err
-        assert "cannot be undone" in captured.err
+        assert "No recent batch operations to undo" in capsys.readouterr().err
 
-    def test_undo_fence_with_force_skips_to_next_entry(self, tmp_path, monkeypatch, mock_args, capsys):
+    def test_undo_fence_with_force_skips_to_next_entry(self, mock_args, capsys, mock_undo_run):
         """cmd_undo --force on fence pops it and executes next entry (lines 177-180)."""
-        import mxctl.commands.mail.undo as undo_module
-
-        test_log = tmp_path / "mail-undo.json"
-        monkeypatch.setattr(undo_module, "UNDO_LOG_FILE", str(test_log))
-
         # Log an undoable operation, then a fence on top
         undo_module.log_batch_operation(
             operation_type="batch-move",
@@ -702,85 +695,14 @@ class TestCmdUndoEdgeCases:
         )
         undo_module.log_fence_operation("batch-read")
 
-        mock_run = patch("mxctl.commands.mail.undo.run")
-        with mock_run as mocked:
-            mocked.return_value = "1"
-            args = mock_args(json=False, force=True)
-            undo_module.cmd_undo(args)
+        args = mock_args(json=False, force=True)
+        undo_module.cmd_undo(args)
 
         captured = capsys.readouterr()
         assert "Undid batch-move" in captured.out
 
-    def test_undo_fence_only_with_force_dies(self, tmp_path, monkeypatch, mock_args):
-        """cmd_undo --force with only a fence and nothing behind it dies (line 179)."""
-        import mxctl.commands.mail.undo as undo_module
-
-        test_log = tmp_path / "mail-undo.json"
-        monkeypatch.setattr(undo_module, "UNDO_LOG_FILE", str(test_log))
-
-        undo_module.log_fence_operation("batch-flag")
-
-        args = mock_args(json=False, force=True)
-        with pytest.raises(SystemExit):
-            undo_module.cmd_undo(args)
-
-    def test_undo_no_message_ids_dies(self, tmp_path, monkeypatch, mock_args):
-        """cmd_undo with empty message_ids dies (line 187)."""
-        import mxctl.commands.mail.undo as undo_module
-
-        test_log = tmp_path / "mail-undo.json"
-        monkeypatch.setattr(undo_module, "UNDO_LOG_FILE", str(test_log))
-
-        # Manually write an entry with empty message_ids
-        test_log.write_text(
-            json.dumps(
-                [
-                    {
-                        "timestamp": datetime.now().isoformat(),
-                        "operation": "batch-move",
-                        "account": "iCloud",
-                        "message_ids": [],
-                        "dest_mailbox": "Archive",
-                    }
-                ]
-            )
-        )
-
-        args = mock_args(json=False, force=False)
-        with pytest.raises(SystemExit):
-            undo_module.cmd_undo(args)
-
-    def test_undo_unknown_operation_type_dies(self, tmp_path, monkeypatch, mock_args):
-        """cmd_undo with unknown operation type dies (line 305)."""
-        import mxctl.commands.mail.undo as undo_module
-
-        test_log = tmp_path / "mail-undo.json"
-        monkeypatch.setattr(undo_module, "UNDO_LOG_FILE", str(test_log))
-
-        test_log.write_text(
-            json.dumps(
-                [
-                    {
-                        "timestamp": datetime.now().isoformat(),
-                        "operation": "batch-unknown",
-                        "account": "iCloud",
-                        "message_ids": [1, 2],
-                    }
-                ]
-            )
-        )
-
-        args = mock_args(json=False, force=False)
-        with pytest.raises(SystemExit):
-            undo_module.cmd_undo(args)
-
-    def test_undo_batch_move_zero_restored(self, tmp_path, monkeypatch, mock_args, capsys):
+    def test_undo_batch_move_zero_restored(self, mock_args, capsys, mock_undo_run):
         """cmd_undo batch-move with 0 messages found shows 'Nothing to restore' (line 234)."""
-        import mxctl.commands.mail.undo as undo_module
-
-        test_log = tmp_path / "mail-undo.json"
-        monkeypatch.setattr(undo_module, "UNDO_LOG_FILE", str(test_log))
-
         undo_module.log_batch_operation(
             operation_type="batch-move",
             account="iCloud",
@@ -789,47 +711,15 @@ class TestCmdUndoEdgeCases:
             sender="s@x.com",
         )
 
-        mock_run = patch("mxctl.commands.mail.undo.run")
-        with mock_run as mocked:
-            mocked.return_value = "0"
-            args = mock_args(json=False, force=False)
-            undo_module.cmd_undo(args)
+        mock_undo_run.return_value = "0"
+        args = mock_args(json=False, force=False)
+        undo_module.cmd_undo(args)
 
         captured = capsys.readouterr()
         assert "Nothing to restore" in captured.out
 
-    def test_undo_batch_move_no_dest_mailbox_dies(self, tmp_path, monkeypatch, mock_args):
-        """cmd_undo batch-move with no dest_mailbox dies (line 197)."""
-        import mxctl.commands.mail.undo as undo_module
-
-        test_log = tmp_path / "mail-undo.json"
-        monkeypatch.setattr(undo_module, "UNDO_LOG_FILE", str(test_log))
-
-        test_log.write_text(
-            json.dumps(
-                [
-                    {
-                        "timestamp": datetime.now().isoformat(),
-                        "operation": "batch-move",
-                        "account": "iCloud",
-                        "message_ids": [1],
-                        "dest_mailbox": None,
-                    }
-                ]
-            )
-        )
-
-        args = mock_args(json=False, force=False)
-        with pytest.raises(SystemExit):
-            undo_module.cmd_undo(args)
-
-    def test_undo_batch_delete_zero_restored(self, tmp_path, monkeypatch, mock_args, capsys):
+    def test_undo_batch_delete_zero_restored(self, mock_args, capsys, mock_undo_run):
         """cmd_undo batch-delete with 0 found shows 'Nothing to restore' (line 285)."""
-        import mxctl.commands.mail.undo as undo_module
-
-        test_log = tmp_path / "mail-undo.json"
-        monkeypatch.setattr(undo_module, "UNDO_LOG_FILE", str(test_log))
-
         undo_module.log_batch_operation(
             operation_type="batch-delete",
             account="iCloud",
@@ -837,53 +727,37 @@ class TestCmdUndoEdgeCases:
             source_mailbox="INBOX",
         )
 
-        mock_run = patch("mxctl.commands.mail.undo.run")
-        with mock_run as mocked:
-            mocked.return_value = "0"
-            args = mock_args(json=False, force=False)
-            undo_module.cmd_undo(args)
+        mock_undo_run.return_value = "0"
+        args = mock_args(json=False, force=False)
+        undo_module.cmd_undo(args)
 
         captured = capsys.readouterr()
         assert "Nothing to restore" in captured.out
 
-    def test_undo_batch_delete_no_source_mailbox_restores_to_inbox(self, tmp_path, monkeypatch, mock_args, capsys):
+    def test_undo_batch_delete_no_source_mailbox_restores_to_inbox(self, undo_log, mock_args, capsys, mock_undo_run):
         """cmd_undo batch-delete without source_mailbox restores to INBOX with note (lines 289, 300)."""
-        import mxctl.commands.mail.undo as undo_module
-
-        test_log = tmp_path / "mail-undo.json"
-        monkeypatch.setattr(undo_module, "UNDO_LOG_FILE", str(test_log))
-
-        test_log.write_text(
-            json.dumps(
-                [
-                    {
-                        "timestamp": datetime.now().isoformat(),
-                        "operation": "batch-delete",
-                        "account": "iCloud",
-                        "message_ids": [301],
-                        "source_mailbox": None,
-                    }
-                ]
-            )
+        _write_log(
+            undo_log,
+            [
+                {
+                    "timestamp": datetime.now().isoformat(),
+                    "operation": "batch-delete",
+                    "account": "iCloud",
+                    "message_ids": [301],
+                    "source_mailbox": None,
+                }
+            ],
         )
 
-        mock_run = patch("mxctl.commands.mail.undo.run")
-        with mock_run as mocked:
-            mocked.return_value = "1"
-            args = mock_args(json=False, force=False)
-            undo_module.cmd_undo(args)
+        args = mock_args(json=False, force=False)
+        undo_module.cmd_undo(args)
 
         captured = capsys.readouterr()
         assert "INBOX" in captured.out
         assert "Original mailbox unknown" in captured.out
 
-    def test_undo_restores_log_on_exception(self, tmp_path, monkeypatch, mock_args):
+    def test_undo_restores_log_on_exception(self, mock_args, mock_undo_run):
         """cmd_undo restores the operation to the log if an exception occurs (lines 307-310)."""
-        import mxctl.commands.mail.undo as undo_module
-
-        test_log = tmp_path / "mail-undo.json"
-        monkeypatch.setattr(undo_module, "UNDO_LOG_FILE", str(test_log))
-
         undo_module.log_batch_operation(
             operation_type="batch-move",
             account="iCloud",
@@ -892,46 +766,35 @@ class TestCmdUndoEdgeCases:
             sender="s@x.com",
         )
 
-        mock_run = patch("mxctl.commands.mail.undo.run")
-        with mock_run as mocked:
-            mocked.side_effect = RuntimeError("AppleScript error")
-            args = mock_args(json=False, force=False)
-            with pytest.raises(RuntimeError):
-                undo_module.cmd_undo(args)
+        mock_undo_run.side_effect = RuntimeError("AppleScript error")
+        args = mock_args(json=False, force=False)
+        with pytest.raises(RuntimeError):
+            undo_module.cmd_undo(args)
 
         # The operation should have been put back
         operations = undo_module._load_undo_log()
         assert len(operations) == 1
         assert operations[0]["message_ids"] == [401]
 
-    def test_undo_force_with_no_fresh_uses_all_ops(self, tmp_path, monkeypatch, mock_args, capsys):
+    def test_undo_force_with_no_fresh_uses_all_ops(self, undo_log, mock_args, capsys, mock_undo_run):
         """cmd_undo --force with only stale entries uses all_ops (line 162)."""
-        import mxctl.commands.mail.undo as undo_module
-
-        test_log = tmp_path / "mail-undo.json"
-        monkeypatch.setattr(undo_module, "UNDO_LOG_FILE", str(test_log))
-
         stale_ts = (datetime.now() - timedelta(minutes=60)).isoformat()
-        test_log.write_text(
-            json.dumps(
-                [
-                    {
-                        "timestamp": stale_ts,
-                        "operation": "batch-move",
-                        "account": "iCloud",
-                        "message_ids": [501],
-                        "dest_mailbox": "Archive",
-                        "sender": "old@x.com",
-                    }
-                ]
-            )
+        _write_log(
+            undo_log,
+            [
+                {
+                    "timestamp": stale_ts,
+                    "operation": "batch-move",
+                    "account": "iCloud",
+                    "message_ids": [501],
+                    "dest_mailbox": "Archive",
+                    "sender": "old@x.com",
+                }
+            ],
         )
 
-        mock_run = patch("mxctl.commands.mail.undo.run")
-        with mock_run as mocked:
-            mocked.return_value = "1"
-            args = mock_args(json=False, force=True)
-            undo_module.cmd_undo(args)
+        args = mock_args(json=False, force=True)
+        undo_module.cmd_undo(args)
 
         captured = capsys.readouterr()
         assert "Undid batch-move" in captured.out
@@ -993,8 +856,6 @@ class TestStatsAllAccountsFix:
         cmd_stats(args)
 
         captured = capsys.readouterr()
-        import json
-
         out = captured.out
         data = json.loads(out[out.find("{") : out.rfind("}") + 1])
         assert data["scope"] == "all"
@@ -1008,8 +869,6 @@ class TestStatsAllAccountsFix:
         cmd_stats(args)
 
         captured = capsys.readouterr()
-        import json
-
         out = captured.out
         data = json.loads(out[out.find("{") : out.rfind("}") + 1])
         assert data["scope"] == "iCloud"
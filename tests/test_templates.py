@@ -3,6 +3,7 @@
 import json
 import os
 from argparse import Namespace
+from unittest.mock import patch
 
 import pytest
 
@@ -28,7 +29,9 @@ class TestLoadSaveTemplates:
 
         missing = str(tmp_path / "nonexistent.json")
         monkeypatch.setattr("mxctl.commands.mail.templates.TEMPLATES_FILE", missing)
-        assert _load_templates() == {}
+        with patch("mxctl.commands.mail.templates.file_lock") as mock_lock:
+            assert _load_templates() == {}
+        mock_lock.assert_not_called()
 
     def test_save_and_load_round_trip(self, monkeypatch, tmp_path):
         from mxctl.commands.mail.templates import _load_templates, _save_templates
@@ -54,6 +57,46 @@ class TestLoadSaveTemplates:
         monkeypatch.setattr("mxctl.commands.mail.templates.TEMPLATES_FILE", tpl_file)
         assert _load_templates() == {}
 
+    def test_unchanged_file_served_from_cache(self, monkeypatch, tmp_path):
+        from mxctl.commands.mail import templates as templates_mod
+
+        tpl_file = tmp_path / "templates.json"
+        tpl_file.write_text(json.dumps({"a": {"subject": "S", "body": "B"}}))
+        monkeypatch.setattr(templates_mod, "TEMPLATES_FILE", str(tpl_file))
+
+        with patch.object(templates_mod.json, "load", wraps=json.load) as mock_load:
+            loaded = templates_mod._load_templates()
+            loaded["b"] = {}
+            assert templates_mod._load_templates() == {"a": {"subject": "S", "body": "B"}}
+        mock_load.assert_called_once()
+
+    def test_same_size_rewrite_within_one_mtime_tick(self, monkeypatch, tmp_path):
+        from mxctl.commands.mail.templates import _load_templates, _save_templates
+
+        tpl_file = tmp_path / "templates.json"
+        monkeypatch.setattr("mxctl.commands.mail.templates.TEMPLATES_FILE", str(tpl_file))
+        monkeypatch.setattr("mxctl.commands.mail.templates.CONFIG_DIR", str(tmp_path))
+        _save_templates({"a": {"subject": "S", "body": "B"}})
+        assert "a" in _load_templates()
+        st = tpl_file.stat()
+
+        _save_templates({"b": {"subject": "S", "body": "B"}})
+        # Same size; pin the mtime too, as on a filesystem with 1 s resolution
+        os.utime(tpl_file, ns=(st.st_atime_ns, st.st_mtime_ns))
+        assert tpl_file.stat().st_size == st.st_size
+        assert list(_load_templates()) == ["b"]
+
+    def test_rewritten_file_is_reparsed(self, monkeypatch, tmp_path):
+        from mxctl.commands.mail.templates import _load_templates
+
+        tpl_file = tmp_path / "templates.json"
+        monkeypatch.setattr("mxctl.commands.mail.templates.TEMPLATES_FILE", str(tpl_file))
+        tpl_file.write_text(json.dumps({"a": {}}))
+        assert list(_load_templates()) == ["a"]
+
+        tpl_file.write_text(json.dumps({"bb": {}}))
+        assert list(_load_templates()) == ["bb"]
+
 
 # ---------------------------------------------------------------------------
 # cmd_templates_list
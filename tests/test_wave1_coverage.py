@@ -24,6 +24,12 @@ from unittest.mock import Mock, patch
 
 import pytest
 
+from mxctl.commands.mail.analytics import cmd_digest, cmd_show_flagged, cmd_top_senders
+from mxctl.commands.mail.attachments import cmd_attachments
+from mxctl.commands.mail.composite import cmd_forward, cmd_reply, cmd_thread
+from mxctl.commands.mail.system import cmd_headers, cmd_rules
+from mxctl.config import FIELD_SEPARATOR, RECORD_SEPARATOR
+
 # ---------------------------------------------------------------------------
 # Helpers
 # ---------------------------------------------------------------------------
@@ -39,6 +45,14 @@ def _args(**kwargs):
     return Namespace(**defaults)
 
 
+@pytest.fixture
+def patched_run(request, monkeypatch):
+    """Install a Mock as the `run` named by the test class's RUN_TARGET."""
+    mock = Mock(return_value="")
+    monkeypatch.setattr(request.cls.RUN_TARGET, mock)
+    return mock
+
+
 # ===========================================================================
 # extract_display_name() — mail_helpers.py
 # ===========================================================================
@@ -132,6 +146,13 @@ class TestVersionFlag:
         combined = captured.out + captured.err
         assert __version__ in combined
 
+    def test_version_imports_no_command_modules(self):
+        from mxctl.main import main
+
+        with pytest.raises(SystemExit), patch("sys.argv", ["mxctl", "--version"]), patch("mxctl.main.import_module") as mock_import:
+            main()
+        mock_import.assert_not_called()
+
 
 # ===========================================================================
 # main() dispatch paths — main.py lines 77-89
@@ -141,6 +162,31 @@ class TestVersionFlag:
 class TestMainDispatch:
     """Test main() command dispatch, no-command help, and KeyboardInterrupt."""
 
+    def test_command_table_matches_registered_subcommands(self):
+        """Every module registers exactly the commands listed for it in _COMMAND_MODULES."""
+        import argparse
+        import importlib
+
+        from mxctl.main import _COMMAND_MODULES
+
+        for module, commands in _COMMAND_MODULES.items():
+            subparsers = argparse.ArgumentParser().add_subparsers()
+            importlib.import_module(f"mxctl.commands.mail.{module}").register(subparsers)
+            assert tuple(subparsers.choices) == commands, module
+
+    def test_known_command_registers_only_its_module(self):
+        import importlib
+
+        from mxctl.main import main
+
+        with (
+            pytest.raises(SystemExit),
+            patch("sys.argv", ["mxctl", "undo", "--help"]),
+            patch("mxctl.main.import_module", wraps=importlib.import_module) as mock_import,
+        ):
+            main()
+        mock_import.assert_called_once_with("mxctl.commands.mail.undo")
+
     def test_no_command_prints_help_and_exits(self, capsys):
         """No subcommand given — prints help and exits 0."""
         from mxctl.main import main
@@ -174,7 +220,7 @@ class TestMainDispatch:
         assert len(called_with) == 1
         assert called_with[0].command == "init"
 
-    def test_command_without_func_shows_subcommand_help(self, monkeypatch, capsys):
+    def test_command_without_func_shows_subcommand_help(self, monkeypatch):
         """Subcommand with no func attribute falls back to subcommand --help."""
         from mxctl.main import main
 
@@ -236,6 +282,7 @@ class TestDunderMain:
         importlib.import_module("mxctl.__main__")
         assert len(called) == 1
 
+    @pytest.mark.usefixtures("real_subprocess")
     def test_python_m_mxctl_version(self):
         """python -m mxctl --version succeeds (via installed binary or module)."""
         import shutil
@@ -289,7 +336,7 @@ class TestResolveMessageContextInitErrors:
             resolve_message_context(args)
         assert exc_info.value.code == 1
 
-    def test_config_exists_but_no_default_account(self, tmp_path, monkeypatch, capsys):
+    def test_config_exists_but_no_default_account(self, tmp_path, monkeypatch):
         """When config exists but no default is set, error mentions configure one."""
         import json as json_mod
 
@@ -384,16 +431,11 @@ class TestWarnAutomationOnce:
 class TestCmdThreadEdgeCases:
     """Edge cases for cmd_thread."""
 
-    def test_thread_empty_result_shows_no_thread_message(self, monkeypatch, capsys):
-        from mxctl.commands.mail.composite import cmd_thread
+    RUN_TARGET = "mxctl.commands.mail.composite.run"
 
-        mock_run = Mock(
-            side_effect=[
-                "Original Subject",  # first call: get subject
-                "",  # second call: no thread messages found
-            ]
-        )
-        monkeypatch.setattr("mxctl.commands.mail.composite.run", mock_run)
+    def test_thread_empty_result_shows_no_thread_message(self, patched_run, capsys):
+        # Subject found, but the search returned no thread messages
+        patched_run.return_value = f"Original Subject{RECORD_SEPARATOR}"
 
         args = _args(id=123, json=False, limit=100, all_accounts=False)
         cmd_thread(args)
@@ -401,16 +443,8 @@ class TestCmdThreadEdgeCases:
         captured = capsys.readouterr()
         assert "No thread found" in captured.out
 
-    def test_thread_empty_result_json(self, monkeypatch, capsys):
-        from mxctl.commands.mail.composite import cmd_thread
-
-        mock_run = Mock(
-            side_effect=[
-                "Test Subject",
-                "",
-            ]
-        )
-        monkeypatch.setattr("mxctl.commands.mail.composite.run", mock_run)
+    def test_thread_empty_result_json(self, patched_run, capsys):
+        patched_run.return_value = f"Test Subject{RECORD_SEPARATOR}"
 
         args = _args(id=123, json=True, limit=100, all_accounts=False)
         cmd_thread(args)
@@ -419,42 +453,27 @@ class TestCmdThreadEdgeCases:
         data = json.loads(captured.out)
         assert data["messages"] == []
 
-    def test_thread_all_accounts_flag(self, monkeypatch, capsys):
-        from mxctl.commands.mail.composite import cmd_thread
-
-        mock_run = Mock(
-            side_effect=[
-                "Meeting Notes",
-                f"50{chr(0x1F)}Meeting Notes{chr(0x1F)}alice@example.com{chr(0x1F)}Monday{chr(0x1F)}INBOX{chr(0x1F)}Work\n",
-            ]
-        )
-        monkeypatch.setattr("mxctl.commands.mail.composite.run", mock_run)
+    def test_thread_all_accounts_flag(self, patched_run):
+        patched_run.return_value = f"Meeting Notes{RECORD_SEPARATOR}50{FIELD_SEPARATOR}Meeting Notes{FIELD_SEPARATOR}alice@example.com{FIELD_SEPARATOR}Monday{FIELD_SEPARATOR}INBOX{FIELD_SEPARATOR}Work\n"
 
         args = _args(id=50, json=False, limit=100, all_accounts=True)
         cmd_thread(args)
 
-        # When all_accounts=True, second script should use "every account" loop
-        second_script = mock_run.call_args_list[1][0][0]
-        assert "every account" in second_script
-
-    def test_thread_single_account_script(self, monkeypatch, capsys):
-        from mxctl.commands.mail.composite import cmd_thread
+        # When all_accounts=True, the single script should use "every account" loop
+        patched_run.assert_called_once()
+        assert "every account" in patched_run.call_args[0][0]
 
-        mock_run = Mock(
-            side_effect=[
-                "Budget Review",
-                f"77{chr(0x1F)}Budget Review{chr(0x1F)}bob@example.com{chr(0x1F)}Tuesday{chr(0x1F)}INBOX{chr(0x1F)}iCloud\n",
-            ]
-        )
-        monkeypatch.setattr("mxctl.commands.mail.composite.run", mock_run)
+    def test_thread_single_account_script(self, patched_run):
+        patched_run.return_value = f"Budget Review{RECORD_SEPARATOR}77{FIELD_SEPARATOR}Budget Review{FIELD_SEPARATOR}bob@example.com{FIELD_SEPARATOR}Tuesday{FIELD_SEPARATOR}INBOX{FIELD_SEPARATOR}iCloud\n"
 
         args = _args(id=77, json=False, limit=100, all_accounts=False)
         cmd_thread(args)
 
-        second_script = mock_run.call_args_list[1][0][0]
+        patched_run.assert_called_once()
+        script = patched_run.call_args[0][0]
         # Single account mode: should NOT have "every account" loop
-        assert "every account" not in second_script
-        assert "iCloud" in second_script
+        assert "every account" not in script
+        assert "iCloud" in script
 
 
 # ===========================================================================
@@ -465,17 +484,14 @@ class TestCmdThreadEdgeCases:
 class TestCmdReplyEdgeCases:
     """Edge cases for cmd_reply."""
 
-    def test_reply_already_has_re_prefix(self, monkeypatch, capsys):
-        """If subject already starts with Re:, don't double-prefix."""
-        from mxctl.commands.mail.composite import cmd_reply
+    RUN_TARGET = "mxctl.commands.mail.composite.run"
 
-        mock_run = Mock(
-            side_effect=[
-                f"Re: Original{chr(0x1F)}sender@example.com{chr(0x1F)}Monday{chr(0x1F)}Body text",
-                "draft created",
-            ]
-        )
-        monkeypatch.setattr("mxctl.commands.mail.composite.run", mock_run)
+    def test_reply_already_has_re_prefix(self, patched_run, capsys):
+        """If subject already starts with Re:, don't double-prefix."""
+        patched_run.side_effect = [
+            f"Re: Original{FIELD_SEPARATOR}sender@example.com{FIELD_SEPARATOR}Monday{FIELD_SEPARATOR}Body text",
+            "draft created",
+        ]
 
         args = _args(id=100, body="Thanks!", json=False)
         cmd_reply(args)
@@ -484,24 +500,18 @@ class TestCmdReplyEdgeCases:
         assert "Re: Re:" not in captured.out
         assert "Re: Original" in captured.out
 
-    def test_reply_bad_sender_dies(self, monkeypatch):
+    def test_reply_bad_sender_dies(self, patched_run):
         """If sender has no extractable email address, die() is called."""
-        from mxctl.commands.mail.composite import cmd_reply
-
-        mock_run = Mock(return_value=(f"Subject{chr(0x1F)}NotAnEmail{chr(0x1F)}Monday{chr(0x1F)}Body"))
-        monkeypatch.setattr("mxctl.commands.mail.composite.run", mock_run)
+        patched_run.return_value = f"Subject{FIELD_SEPARATOR}NotAnEmail{FIELD_SEPARATOR}Monday{FIELD_SEPARATOR}Body"
 
         args = _args(id=42, body="Hello", json=False)
         with pytest.raises(SystemExit) as exc_info:
             cmd_reply(args)
         assert exc_info.value.code == 1
 
-    def test_reply_insufficient_fields_dies(self, monkeypatch):
+    def test_reply_insufficient_fields_dies(self, patched_run):
         """If AppleScript returns fewer than 4 fields, die()."""
-        from mxctl.commands.mail.composite import cmd_reply
-
-        mock_run = Mock(return_value="OnlySubject")
-        monkeypatch.setattr("mxctl.commands.mail.composite.run", mock_run)
+        patched_run.return_value = "OnlySubject"
 
         args = _args(id=42, body="Hello", json=False)
         with pytest.raises(SystemExit) as exc_info:
@@ -517,17 +527,14 @@ class TestCmdReplyEdgeCases:
 class TestCmdForwardEdgeCases:
     """Edge cases for cmd_forward."""
 
-    def test_forward_already_has_fwd_prefix(self, monkeypatch, capsys):
-        """Subject already starting with Fwd: is not double-prefixed."""
-        from mxctl.commands.mail.composite import cmd_forward
+    RUN_TARGET = "mxctl.commands.mail.composite.run"
 
-        mock_run = Mock(
-            side_effect=[
-                f"Fwd: Original{chr(0x1F)}sender@example.com{chr(0x1F)}Monday{chr(0x1F)}Body",
-                "draft created",
-            ]
-        )
-        monkeypatch.setattr("mxctl.commands.mail.composite.run", mock_run)
+    def test_forward_already_has_fwd_prefix(self, patched_run, capsys):
+        """Subject already starting with Fwd: is not double-prefixed."""
+        patched_run.side_effect = [
+            f"Fwd: Original{FIELD_SEPARATOR}sender@example.com{FIELD_SEPARATOR}Monday{FIELD_SEPARATOR}Body",
+            "draft created",
+        ]
 
         args = _args(id=55, to="fwd@example.com", json=False)
         cmd_forward(args)
@@ -536,41 +543,30 @@ class TestCmdForwardEdgeCases:
         assert "Fwd: Fwd:" not in captured.out
         assert "Fwd: Original" in captured.out
 
-    def test_forward_bad_to_address_dies(self, monkeypatch):
+    def test_forward_bad_to_address_dies(self, patched_run):
         """If --to has no valid email address, die()."""
-        from mxctl.commands.mail.composite import cmd_forward
-
-        mock_run = Mock(return_value=(f"Subject{chr(0x1F)}sender@example.com{chr(0x1F)}Monday{chr(0x1F)}Body"))
-        monkeypatch.setattr("mxctl.commands.mail.composite.run", mock_run)
+        patched_run.return_value = f"Subject{FIELD_SEPARATOR}sender@example.com{FIELD_SEPARATOR}Monday{FIELD_SEPARATOR}Body"
 
         args = _args(id=42, to="not-a-valid-address", json=False)
         with pytest.raises(SystemExit) as exc_info:
             cmd_forward(args)
         assert exc_info.value.code == 1
 
-    def test_forward_insufficient_fields_dies(self, monkeypatch):
+    def test_forward_insufficient_fields_dies(self, patched_run):
         """If AppleScript returns fewer than 4 fields, die()."""
-        from mxctl.commands.mail.composite import cmd_forward
-
-        mock_run = Mock(return_value="OnlySubject")
-        monkeypatch.setattr("mxctl.commands.mail.composite.run", mock_run)
+        patched_run.return_value = "OnlySubject"
 
         args = _args(id=42, to="someone@example.com", json=False)
         with pytest.raises(SystemExit) as exc_info:
             cmd_forward(args)
         assert exc_info.value.code == 1
 
-    def test_forward_formatted_to_address(self, monkeypatch, capsys):
+    def test_forward_formatted_to_address(self, patched_run, capsys):
         """--to can be a formatted 'Name <email>' string."""
-        from mxctl.commands.mail.composite import cmd_forward
-
-        mock_run = Mock(
-            side_effect=[
-                f"Subject{chr(0x1F)}sender@example.com{chr(0x1F)}Monday{chr(0x1F)}Body",
-                "draft created",
-            ]
-        )
-        monkeypatch.setattr("mxctl.commands.mail.composite.run", mock_run)
+        patched_run.side_effect = [
+            f"Subject{FIELD_SEPARATOR}sender@example.com{FIELD_SEPARATOR}Monday{FIELD_SEPARATOR}Body",
+            "draft created",
+        ]
 
         args = _args(id=42, to="Alice Smith <alice@example.com>", json=False)
         cmd_forward(args)
@@ -589,38 +585,11 @@ class TestCmdForwardEdgeCases:
 class TestCmdTopSendersEdgeCases:
     """Edge cases for cmd_top_senders."""
 
-    def test_empty_result_shows_no_messages(self, monkeypatch, capsys):
-        from mxctl.commands.mail.analytics import cmd_top_senders
-
-        mock_run = Mock(return_value="")
-        monkeypatch.setattr("mxctl.commands.mail.analytics.run", mock_run)
-
-        args = _args(days=30, limit=10, json=False)
-        cmd_top_senders(args)
-
-        captured = capsys.readouterr()
-        assert "No messages found" in captured.out
-
-    def test_empty_result_json(self, monkeypatch, capsys):
-        from mxctl.commands.mail.analytics import cmd_top_senders
-
-        mock_run = Mock(return_value="")
-        monkeypatch.setattr("mxctl.commands.mail.analytics.run", mock_run)
-
-        args = _args(days=30, limit=10, json=True)
-        cmd_top_senders(args)
-
-        captured = capsys.readouterr()
-        data = json.loads(captured.out)
-        assert data["senders"] == []
-        assert data["days"] == 30
-
-    def test_senders_sorted_by_frequency(self, monkeypatch, capsys):
-        from mxctl.commands.mail.analytics import cmd_top_senders
+    RUN_TARGET = "mxctl.commands.mail.analytics.run"
 
+    def test_senders_sorted_by_frequency(self, patched_run, capsys):
         # alice appears 3x, bob 1x — alice should be first
-        mock_run = Mock(return_value=("alice@example.com\nbob@example.com\nalice@example.com\nalice@example.com\n"))
-        monkeypatch.setattr("mxctl.commands.mail.analytics.run", mock_run)
+        patched_run.return_value = "alice@example.com\nbob@example.com\nalice@example.com\nalice@example.com\n"
 
         args = _args(days=7, limit=5, json=False)
         cmd_top_senders(args)
@@ -630,13 +599,10 @@ class TestCmdTopSendersEdgeCases:
         bob_pos = captured.out.find("bob@example.com")
         assert alice_pos < bob_pos  # alice listed before bob
 
-    def test_limit_respected(self, monkeypatch, capsys):
-        from mxctl.commands.mail.analytics import cmd_top_senders
-
+    def test_limit_respected(self, patched_run, capsys):
         # 5 unique senders but limit=3
         senders = "\n".join(["a@x.com", "b@x.com", "c@x.com", "d@x.com", "e@x.com"])
-        mock_run = Mock(return_value=senders)
-        monkeypatch.setattr("mxctl.commands.mail.analytics.run", mock_run)
+        patched_run.return_value = senders
 
         args = _args(days=30, limit=3, json=False)
         cmd_top_senders(args)
@@ -653,14 +619,25 @@ class TestCmdTopSendersEdgeCases:
 # ===========================================================================
 
 
+# Unread rows (account, id, subject, sender, date): two messages from the same
+# domain, one from a different one
+_DIGEST_ROWS = "".join(
+    FIELD_SEPARATOR.join(row) + "\n"
+    for row in [
+        ("iCloud", "1", "Newsletter", "news@example.com", "Monday"),
+        ("iCloud", "2", "Promo", "promo@example.com", "Tuesday"),
+        ("iCloud", "3", "Alert", "noreply@other.org", "Wednesday"),
+    ]
+)
+
+
 class TestCmdDigestEdgeCases:
     """Edge cases for cmd_digest."""
 
-    def test_empty_result_inbox_zero(self, monkeypatch, capsys):
-        from mxctl.commands.mail.analytics import cmd_digest
+    RUN_TARGET = "mxctl.commands.mail.analytics.run"
 
-        mock_run = Mock(return_value="")
-        monkeypatch.setattr("mxctl.commands.mail.analytics.run", mock_run)
+    def test_empty_result_inbox_zero(self, patched_run, capsys):
+        patched_run.return_value = ""
 
         args = _args(json=False)
         cmd_digest(args)
@@ -668,18 +645,8 @@ class TestCmdDigestEdgeCases:
         captured = capsys.readouterr()
         assert "inbox zero" in captured.out.lower() or "No unread" in captured.out
 
-    def test_groups_by_domain(self, monkeypatch, capsys):
-        from mxctl.commands.mail.analytics import cmd_digest
-
-        # Two messages from same domain, one from different
-        mock_run = Mock(
-            return_value=(
-                f"iCloud{chr(0x1F)}1{chr(0x1F)}Newsletter{chr(0x1F)}news@example.com{chr(0x1F)}Monday\n"
-                f"iCloud{chr(0x1F)}2{chr(0x1F)}Promo{chr(0x1F)}promo@example.com{chr(0x1F)}Tuesday\n"
-                f"iCloud{chr(0x1F)}3{chr(0x1F)}Alert{chr(0x1F)}noreply@other.org{chr(0x1F)}Wednesday\n"
-            )
-        )
-        monkeypatch.setattr("mxctl.commands.mail.analytics.run", mock_run)
+    def test_groups_by_domain(self, patched_run, capsys):
+        patched_run.return_value = _DIGEST_ROWS
 
         args = _args(json=False)
         cmd_digest(args)
@@ -689,13 +656,10 @@ class TestCmdDigestEdgeCases:
         assert "other.org" in captured.out
         assert "3 messages" in captured.out
 
-    def test_skips_malformed_lines(self, monkeypatch, capsys):
-        from mxctl.commands.mail.analytics import cmd_digest
-
-        good = f"iCloud{chr(0x1F)}5{chr(0x1F)}Hello{chr(0x1F)}friend@example.com{chr(0x1F)}Friday"
+    def test_skips_malformed_lines(self, patched_run, capsys):
+        good = f"iCloud{FIELD_SEPARATOR}5{FIELD_SEPARATOR}Hello{FIELD_SEPARATOR}friend@example.com{FIELD_SEPARATOR}Friday"
         bad = "malformed"
-        mock_run = Mock(return_value=f"{good}\n{bad}\n")
-        monkeypatch.setattr("mxctl.commands.mail.analytics.run", mock_run)
+        patched_run.return_value = f"{good}\n{bad}\n"
 
         args = _args(json=False)
         cmd_digest(args)
@@ -711,61 +675,36 @@ class TestCmdDigestEdgeCases:
 # ===========================================================================
 
 
-class TestCmdShowFlaggedEdgeCases:
-    """Edge cases for cmd_show_flagged."""
-
-    def test_no_flagged_messages(self, monkeypatch, capsys):
-        from mxctl.commands.mail.analytics import cmd_show_flagged
-
-        mock_run = Mock(return_value="")
-        monkeypatch.setattr("mxctl.commands.mail.analytics.run", mock_run)
+# One flagged row (id, subject, sender, date, mailbox, account)
+_FLAGGED_ROW = FIELD_SEPARATOR.join(["99", "Flagged", "x@y.com", "Monday", "INBOX", "iCloud"]) + "\n"
 
-        args = _args(limit=25, json=False)
-        cmd_show_flagged(args)
-
-        captured = capsys.readouterr()
-        assert "No flagged messages" in captured.out
 
-    def test_no_flagged_messages_json(self, monkeypatch, capsys):
-        from mxctl.commands.mail.analytics import cmd_show_flagged
-
-        mock_run = Mock(return_value="")
-        monkeypatch.setattr("mxctl.commands.mail.analytics.run", mock_run)
-
-        args = _args(limit=25, json=True)
-        cmd_show_flagged(args)
+class TestCmdShowFlaggedEdgeCases:
+    """Edge cases for cmd_show_flagged."""
 
-        captured = capsys.readouterr()
-        data = json.loads(captured.out)
-        assert data["flagged_messages"] == []
+    RUN_TARGET = "mxctl.commands.mail.analytics.run"
 
-    def test_no_account_scopes_all_accounts_script(self, monkeypatch, capsys):
+    def test_no_account_scopes_all_accounts_script(self, monkeypatch, patched_run):
         """When account resolves to None, the script should iterate every account."""
-        from mxctl.commands.mail.analytics import cmd_show_flagged
-
         # Ensure resolve_account returns None so the all-accounts branch is taken
         monkeypatch.setattr("mxctl.commands.mail.analytics.resolve_account", lambda _: None)
 
-        mock_run = Mock(return_value=(f"99{chr(0x1F)}Flagged{chr(0x1F)}x@y.com{chr(0x1F)}Monday{chr(0x1F)}INBOX{chr(0x1F)}iCloud\n"))
-        monkeypatch.setattr("mxctl.commands.mail.analytics.run", mock_run)
+        patched_run.return_value = _FLAGGED_ROW
 
         args = Namespace(json=False, account=None, mailbox="INBOX", limit=25)
         cmd_show_flagged(args)
 
-        script = mock_run.call_args[0][0]
+        script = patched_run.call_args[0][0]
         assert "every account" in script
 
-    def test_with_account_scopes_single_account_script(self, monkeypatch, capsys):
+    def test_with_account_scopes_single_account_script(self, patched_run):
         """When account is set, the script should scope to that account."""
-        from mxctl.commands.mail.analytics import cmd_show_flagged
-
-        mock_run = Mock(return_value=(f"88{chr(0x1F)}Task{chr(0x1F)}z@w.com{chr(0x1F)}Tuesday{chr(0x1F)}INBOX{chr(0x1F)}iCloud\n"))
-        monkeypatch.setattr("mxctl.commands.mail.analytics.run", mock_run)
+        patched_run.return_value = _FLAGGED_ROW
 
         args = _args(limit=25, json=False)
         cmd_show_flagged(args)
 
-        script = mock_run.call_args[0][0]
+        script = patched_run.call_args[0][0]
         assert "every account" not in script
         assert "iCloud" in script
 
@@ -775,16 +714,25 @@ class TestCmdShowFlaggedEdgeCases:
 # ===========================================================================
 
 
+# Minimal parsed-header set; tests append the header they exercise
+_BASE_HEADERS = (
+    "From: sender@example.com\n"
+    "To: recipient@example.com\n"
+    "Subject: Test\n"
+    "Date: Mon, 14 Feb 2026 10:00:00 +0000\n"
+    "Message-Id: <abc@example.com>\n"
+)
+
+
 class TestCmdHeadersEdgeCases:
     """Edge cases for cmd_headers."""
 
-    def test_raw_mode_prints_directly(self, monkeypatch, capsys):
-        """--raw flag prints raw headers without parsing."""
-        from mxctl.commands.mail.system import cmd_headers
+    RUN_TARGET = "mxctl.commands.mail.system.run"
 
+    def test_raw_mode_prints_directly(self, patched_run, capsys):
+        """--raw flag prints raw headers without parsing."""
         raw = "From: raw@example.com\nX-Custom: value"
-        mock_run = Mock(return_value=raw)
-        monkeypatch.setattr("mxctl.commands.mail.system.run", mock_run)
+        patched_run.return_value = raw
 
         args = _args(id=1, json=False, raw=True)
         cmd_headers(args)
@@ -793,20 +741,9 @@ class TestCmdHeadersEdgeCases:
         assert "raw@example.com" in captured.out
         assert "X-Custom: value" in captured.out
 
-    def test_dmarc_fail_detected(self, monkeypatch, capsys):
+    def test_dmarc_fail_detected(self, patched_run, capsys):
         """DMARC fail should show FAIL in auth summary."""
-        from mxctl.commands.mail.system import cmd_headers
-
-        raw_headers = (
-            "From: phish@example.com\n"
-            "To: victim@example.com\n"
-            "Subject: Urgent\n"
-            "Date: Mon, 14 Feb 2026 10:00:00 +0000\n"
-            "Message-Id: <fake@example.com>\n"
-            "Authentication-Results: mx.example.com; spf=fail dkim=fail dmarc=fail\n"
-        )
-        mock_run = Mock(return_value=raw_headers)
-        monkeypatch.setattr("mxctl.commands.mail.system.run", mock_run)
+        patched_run.return_value = _BASE_HEADERS + "Authentication-Results: mx.example.com; spf=fail dkim=fail dmarc=fail\n"
 
         args = _args(id=42, json=False, raw=False)
         cmd_headers(args)
@@ -814,20 +751,9 @@ class TestCmdHeadersEdgeCases:
         captured = capsys.readouterr()
         assert "FAIL" in captured.out
 
-    def test_reply_to_shown_when_present(self, monkeypatch, capsys):
+    def test_reply_to_shown_when_present(self, patched_run, capsys):
         """Reply-To header should appear in output when present."""
-        from mxctl.commands.mail.system import cmd_headers
-
-        raw_headers = (
-            "From: sender@example.com\n"
-            "To: recipient@example.com\n"
-            "Subject: Test\n"
-            "Date: Mon, 14 Feb 2026 10:00:00 +0000\n"
-            "Message-Id: <abc@example.com>\n"
-            "Reply-To: replies@example.com\n"
-        )
-        mock_run = Mock(return_value=raw_headers)
-        monkeypatch.setattr("mxctl.commands.mail.system.run", mock_run)
+        patched_run.return_value = _BASE_HEADERS + "Reply-To: replies@example.com\n"
 
         args = _args(id=10, json=False, raw=False)
         cmd_headers(args)
@@ -835,20 +761,9 @@ class TestCmdHeadersEdgeCases:
         captured = capsys.readouterr()
         assert "Reply-To: replies@example.com" in captured.out
 
-    def test_list_unsubscribe_shown(self, monkeypatch, capsys):
+    def test_list_unsubscribe_shown(self, patched_run, capsys):
         """List-Unsubscribe header should appear truncated in output."""
-        from mxctl.commands.mail.system import cmd_headers
-
-        raw_headers = (
-            "From: news@example.com\n"
-            "To: subscriber@example.com\n"
-            "Subject: Weekly Digest\n"
-            "Date: Mon, 14 Feb 2026 10:00:00 +0000\n"
-            "Message-Id: <digest@example.com>\n"
-            "List-Unsubscribe: <https://example.com/unsub?token=abc123>\n"
-        )
-        mock_run = Mock(return_value=raw_headers)
-        monkeypatch.setattr("mxctl.commands.mail.system.run", mock_run)
+        patched_run.return_value = _BASE_HEADERS + "List-Unsubscribe: <https://example.com/unsub?token=abc123>\n"
 
         args = _args(id=20, json=False, raw=False)
         cmd_headers(args)
@@ -856,19 +771,9 @@ class TestCmdHeadersEdgeCases:
         captured = capsys.readouterr()
         assert "Unsubscribe" in captured.out
 
-    def test_hop_count_with_no_received_headers(self, monkeypatch, capsys):
+    def test_hop_count_with_no_received_headers(self, patched_run, capsys):
         """Messages with no Received: headers should show Hops: 0."""
-        from mxctl.commands.mail.system import cmd_headers
-
-        raw_headers = (
-            "From: sender@example.com\n"
-            "To: recipient@example.com\n"
-            "Subject: Direct\n"
-            "Date: Mon, 14 Feb 2026 10:00:00 +0000\n"
-            "Message-Id: <direct@example.com>\n"
-        )
-        mock_run = Mock(return_value=raw_headers)
-        monkeypatch.setattr("mxctl.commands.mail.system.run", mock_run)
+        patched_run.return_value = _BASE_HEADERS
 
         args = _args(id=30, json=False, raw=False)
         cmd_headers(args)
@@ -885,55 +790,42 @@ class TestCmdHeadersEdgeCases:
 class TestCmdRulesEdgeCases:
     """Edge cases for cmd_rules (toggle enable/disable)."""
 
-    def test_enable_rule(self, monkeypatch, capsys):
-        """cmd_rules enable RULENAME should call toggle with enabled=True."""
-        from mxctl.commands.mail.system import cmd_rules
+    RUN_TARGET = "mxctl.commands.mail.system.run"
 
-        mock_run = Mock(return_value="Move Newsletters")
-        monkeypatch.setattr("mxctl.commands.mail.system.run", mock_run)
+    @pytest.mark.parametrize(
+        ("action", "status", "script_value", "other_value"),
+        [("enable", "enabled", "true", "false"), ("disable", "disabled", "false", "true")],
+    )
+    def test_toggle_rule(self, patched_run, capsys, action, status, script_value, other_value):
+        """enable/disable RULENAME sets the rule's enabled flag and reports the new state."""
+        patched_run.return_value = "Move Newsletters"
 
-        args = _args(json=False, action="enable", rule_name="Move Newsletters")
+        args = _args(json=False, action=action, rule_name="Move Newsletters")
         cmd_rules(args)
 
         captured = capsys.readouterr()
-        assert "enabled" in captured.out
+        assert status in captured.out
         assert "Move Newsletters" in captured.out
+        script = patched_run.call_args[0][0]
+        assert script_value in script
+        assert other_value not in script
 
-    def test_disable_rule(self, monkeypatch, capsys):
-        """cmd_rules disable RULENAME should call toggle with enabled=False."""
-        from mxctl.commands.mail.system import cmd_rules
-
-        mock_run = Mock(return_value="Archive Old Mail")
-        monkeypatch.setattr("mxctl.commands.mail.system.run", mock_run)
-
-        args = _args(json=False, action="disable", rule_name="Archive Old Mail")
-        cmd_rules(args)
-
-        captured = capsys.readouterr()
-        assert "disabled" in captured.out
-        assert "Archive Old Mail" in captured.out
-
-    def test_enable_rule_json(self, monkeypatch, capsys):
-        """cmd_rules enable --json returns JSON with status."""
-        from mxctl.commands.mail.system import cmd_rules
+    @pytest.mark.parametrize(("action", "status"), [("enable", "enabled"), ("disable", "disabled")])
+    def test_toggle_rule_json(self, patched_run, capsys, action, status):
+        """cmd_rules enable/disable --json returns JSON with status."""
+        patched_run.return_value = "Newsletter Rule"
 
-        mock_run = Mock(return_value="Newsletter Rule")
-        monkeypatch.setattr("mxctl.commands.mail.system.run", mock_run)
-
-        args = _args(json=True, action="enable", rule_name="Newsletter Rule")
+        args = _args(json=True, action=action, rule_name="Newsletter Rule")
         cmd_rules(args)
 
         captured = capsys.readouterr()
         data = json.loads(captured.out)
-        assert data["status"] == "enabled"
+        assert data["status"] == status
         assert data["rule"] == "Newsletter Rule"
 
-    def test_no_rules_found(self, monkeypatch, capsys):
+    def test_no_rules_found(self, patched_run, capsys):
         """When rules list is empty, a friendly message is shown."""
-        from mxctl.commands.mail.system import cmd_rules
-
-        mock_run = Mock(return_value="")
-        monkeypatch.setattr("mxctl.commands.mail.system.run", mock_run)
+        patched_run.return_value = ""
 
         args = _args(json=False, action=None, rule_name=None)
         cmd_rules(args)
@@ -941,33 +833,6 @@ class TestCmdRulesEdgeCases:
         captured = capsys.readouterr()
         assert "No mail rules found" in captured.out
 
-    def test_enable_rule_applescript_uses_true(self, monkeypatch, capsys):
-        """When enabling, AppleScript should set enabled to true (not false)."""
-        from mxctl.commands.mail.system import cmd_rules
-
-        mock_run = Mock(return_value="My Rule")
-        monkeypatch.setattr("mxctl.commands.mail.system.run", mock_run)
-
-        args = _args(json=False, action="enable", rule_name="My Rule")
-        cmd_rules(args)
-
-        script = mock_run.call_args[0][0]
-        assert "true" in script
-        assert "false" not in script
-
-    def test_disable_rule_applescript_uses_false(self, monkeypatch, capsys):
-        """When disabling, AppleScript should set enabled to false."""
-        from mxctl.commands.mail.system import cmd_rules
-
-        mock_run = Mock(return_value="My Rule")
-        monkeypatch.setattr("mxctl.commands.mail.system.run", mock_run)
-
-        args = _args(json=False, action="disable", rule_name="My Rule")
-        cmd_rules(args)
-
-        script = mock_run.call_args[0][0]
-        assert "false" in script
-
 
 # ===========================================================================
 # cmd_attachments edge cases — attachments.py
@@ -977,41 +842,11 @@ class TestCmdRulesEdgeCases:
 class TestCmdAttachmentsEdgeCases:
     """Edge cases for cmd_attachments (list)."""
 
-    def test_no_attachments_shows_friendly_message(self, monkeypatch, capsys):
-        """Message with no attachments should show a friendly message."""
-        from mxctl.commands.mail.attachments import cmd_attachments
-
-        # Only one line = subject, no attachment lines
-        mock_run = Mock(return_value="Email Without Attachments")
-        monkeypatch.setattr("mxctl.commands.mail.attachments.run", mock_run)
-
-        args = _args(id=42, json=False)
-        cmd_attachments(args)
-
-        captured = capsys.readouterr()
-        assert "No attachments" in captured.out
-
-    def test_no_attachments_json(self, monkeypatch, capsys):
-        """Empty attachment list in JSON mode returns empty list."""
-        from mxctl.commands.mail.attachments import cmd_attachments
-
-        mock_run = Mock(return_value="Plain Email")
-        monkeypatch.setattr("mxctl.commands.mail.attachments.run", mock_run)
+    RUN_TARGET = "mxctl.commands.mail.attachments.run"
 
-        args = _args(id=42, json=True)
-        cmd_attachments(args)
-
-        captured = capsys.readouterr()
-        data = json.loads(captured.out)
-        assert data["attachments"] == []
-        assert "Plain Email" in data["subject"]
-
-    def test_multiple_attachments_numbered(self, monkeypatch, capsys):
+    def test_multiple_attachments_numbered(self, patched_run, capsys):
         """Multiple attachments should be listed with numbers."""
-        from mxctl.commands.mail.attachments import cmd_attachments
-
-        mock_run = Mock(return_value=("Contract Email\ncontract.pdf\naddendum.docx\nsignature.png\n"))
-        monkeypatch.setattr("mxctl.commands.mail.attachments.run", mock_run)
+        patched_run.return_value = "Contract Email\ncontract.pdf\naddendum.docx\nsignature.png\n"
 
         args = _args(id=99, json=False)
         cmd_attachments(args)
@@ -1021,12 +856,9 @@ class TestCmdAttachmentsEdgeCases:
         assert "2. addendum.docx" in captured.out
         assert "3. signature.png" in captured.out
 
-    def test_attachments_json_includes_list(self, monkeypatch, capsys):
+    def test_attachments_json_includes_list(self, patched_run, capsys):
         """JSON output includes subject and full attachment list."""
-        from mxctl.commands.mail.attachments import cmd_attachments
-
-        mock_run = Mock(return_value=("Weekly Report\ndata.csv\nsummary.pdf\n"))
-        monkeypatch.setattr("mxctl.commands.mail.attachments.run", mock_run)
+        patched_run.return_value = "Weekly Report\ndata.csv\nsummary.pdf\n"
 
         args = _args(id=10, json=True)
         cmd_attachments(args)
@@ -1036,3 +868,46 @@ class TestCmdAttachmentsEdgeCases:
         assert data["subject"] == "Weekly Report"
         assert "data.csv" in data["attachments"]
         assert "summary.pdf" in data["attachments"]
+
+
+# ===========================================================================
+# Empty results — analytics.py, attachments.py
+# ===========================================================================
+
+
+class TestEmptyResults:
+    """Commands that found nothing print a friendly message or an empty JSON list."""
+
+    @pytest.mark.parametrize(
+        ("cmd", "target", "output", "kwargs", "message"),
+        [
+            pytest.param(cmd_top_senders, "analytics", "", {"days": 30, "limit": 10}, "No messages found", id="top-senders"),
+            pytest.param(cmd_show_flagged, "analytics", "", {"limit": 25}, "No flagged messages", id="show-flagged"),
+            # Only one line = subject, no attachment lines
+            pytest.param(cmd_attachments, "attachments", "Email Without Attachments", {"id": 42}, "No attachments", id="attachments"),
+        ],
+    )
+    def test_text_shows_friendly_message(self, monkeypatch, capsys, cmd, target, output, kwargs, message):
+        monkeypatch.setattr(f"mxctl.commands.mail.{target}.run", Mock(return_value=output))
+
+        cmd(_args(json=False, **kwargs))
+
+        assert message in capsys.readouterr().out
+
+    @pytest.mark.parametrize(
+        ("cmd", "target", "output", "kwargs", "expected"),
+        [
+            pytest.param(cmd_top_senders, "analytics", "", {"days": 30, "limit": 10}, {"senders": [], "days": 30}, id="top-senders"),
+            pytest.param(cmd_show_flagged, "analytics", "", {"limit": 25}, {"flagged_messages": []}, id="show-flagged"),
+            pytest.param(
+                cmd_attachments, "attachments", "Plain Email", {"id": 42}, {"attachments": [], "subject": "Plain Email"}, id="attachments"
+            ),
+        ],
+    )
+    def test_json_has_empty_list(self, monkeypatch, capsys, cmd, target, output, kwargs, expected):
+        monkeypatch.setattr(f"mxctl.commands.mail.{target}.run", Mock(return_value=output))
+
+        cmd(_args(json=True, **kwargs))
+
+        data = json.loads(capsys.readouterr().out)
+        assert {key: data[key] for key in expected} == expected